@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WordSearchPuzzle, WordSearchAttempt, PuzzleRating
+from .models import LeaderboardEntry, PuzzleJob, WordSearchPuzzle, WordSearchAttempt, PuzzleRating, UserProgress
 
 
 @admin.register(WordSearchPuzzle)
@@ -7,7 +7,7 @@ class WordSearchPuzzleAdmin(admin.ModelAdmin):
     list_display = ['title', 'created_by', 'difficulty', 'word_count', 'play_count', 'is_public', 'created_at']
     list_filter = ['difficulty', 'is_public', 'created_at']
     search_fields = ['title', 'description', 'created_by__username']
-    readonly_fields = ['created_at', 'updated_at', 'play_count']
+    readonly_fields = ['grid_data', 'created_at', 'updated_at', 'play_count']
     
     fieldsets = (
         (None, {
@@ -17,7 +17,7 @@ class WordSearchPuzzleAdmin(admin.ModelAdmin):
             'fields': ('width', 'height', 'difficulty')
         }),
         ('Puzzle Data', {
-            'fields': ('grid_data', 'words_data'),
+            'fields': ('recipe', 'grid_data', 'words_data'),
             'classes': ('collapse',)
         }),
         ('Statistics', {
@@ -45,3 +45,25 @@ class PuzzleRatingAdmin(admin.ModelAdmin):
     list_filter = ['rating', 'created_at']
     search_fields = ['user__username', 'puzzle__title']
     readonly_fields = ['created_at']
+
+
+@admin.register(PuzzleJob)
+class PuzzleJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'created_by', 'status', 'puzzle', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['created_by__username']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'highest_level', 'completed_count', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(UserProgress)
+class UserProgressAdmin(admin.ModelAdmin):
+    list_display = ['user', 'next_level', 'progress_count', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['completed_levels', 'updated_at']
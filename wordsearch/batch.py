@@ -0,0 +1,125 @@
+"""Batch puzzle generation over a process pool.
+
+Workers only run the grid engine; they never touch the ORM, so results can
+be bulk-inserted by the caller in whatever chunk size suits the database.
+"""
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .engine import (
+    DEFAULT_TIME_BUDGET,
+    build_words_data,
+    generate_grid_backtracking,
+)
+from .dictionary import DictionaryError, get_dictionary
+from .metrics import DEFAULT_CANDIDATES, generate_grid_for_difficulty
+from .recipes import generate_from_recipe, generate_puzzle, new_recipe
+
+
+DEFAULT_GRID_SIZE = 15
+# Words drawn from the dictionary for specs that name a category instead
+DEFAULT_WORD_COUNT = 10
+DEFAULT_MIN_LENGTH = 3
+# Specs kept in flight per worker, so memory stays flat on huge spec files
+PREFETCH_PER_WORKER = 4
+
+
+def generate_from_spec(spec):
+    """Generate one puzzle from a spec dict and return it as a plain dict.
+
+    A spec needs ``words``, or a dictionary ``category`` to draw
+    ``word_count`` words of ``min_length`` to ``max_length`` letters from,
+    and may set ``grid_size``, ``seed`` and ``time_budget``. With ``target_difficulty`` (a score or a difficulty
+    label) ``candidates`` grids are built and the closest one is kept. Any
+    other keys (title, difficulty, ...) are passed through untouched.
+    Without a seed each call draws fresh OS entropy, so forked workers never
+    repeat each other's puzzles.
+    """
+    grid_size = spec.get('grid_size', DEFAULT_GRID_SIZE)
+    rng = random.Random(spec.get('seed'))
+    words = spec.get('words') or sample_words(spec, grid_size, rng)
+    generator = partial(
+        generate_grid_backtracking,
+        time_budget=spec.get('time_budget', DEFAULT_TIME_BUDGET)
+    )
+    if spec.get('target_difficulty') is None:
+        result = generator(words, grid_size, rng=rng)
+    else:
+        result = generate_grid_for_difficulty(
+            words, grid_size, spec['target_difficulty'], rng=rng,
+            candidates=spec.get('candidates', DEFAULT_CANDIDATES), generator=generator
+        )
+    return {
+        **spec,
+        'words': words,
+        'grid_size': grid_size,
+        'grid_data': result['grid'],
+        'words_data': build_words_data(result['placed_words']),
+        'unplaced': result['unplaced'],
+        'difficulty_score': result.get('score'),
+    }
+
+
+def generate_from_job(spec):
+    """Generate the puzzle for a queued job's spec (see ``jobs.puzzle_spec``).
+
+    Returns ``{'recipe', 'grid_data'}`` or ``{'grid_data', 'words_data'}``
+    for the puzzle's storage mode, plus ``unplaced``. A recipe's grid is not
+    stored; it is returned so the thumbnail can be drawn without a rebuild.
+    """
+    if spec['storage'] == 'recipe':
+        recipe = new_recipe(spec['words'], spec['grid_size'], spec['difficulty'],
+                            candidates=spec['candidates'], time_budget=spec['time_budget'])
+        result = generate_from_recipe(recipe)
+        placed = set(recipe['words'])
+        unplaced = [word for word in spec['words'] if word not in placed]
+        return {'recipe': recipe, 'grid_data': result['grid'], 'unplaced': unplaced}
+
+    result = generate_puzzle(
+        spec['words'], spec['grid_size'], spec['difficulty'],
+        candidates=spec['candidates'], time_budget=spec['time_budget']
+    )
+    return {
+        'grid_data': result['grid'],
+        'words_data': build_words_data(result['placed_words']),
+        'unplaced': result['unplaced'],
+    }
+
+
+def sample_words(spec, grid_size, rng):
+    """Draw the words for a spec from its dictionary ``category``."""
+    dictionary = get_dictionary()
+    if dictionary is None:
+        raise DictionaryError('No dictionary is installed; run build_dictionary')
+    return dictionary.sample(
+        rng, spec.get('word_count', DEFAULT_WORD_COUNT), category=spec['category'],
+        min_length=spec.get('min_length', DEFAULT_MIN_LENGTH),
+        max_length=min(spec.get('max_length', grid_size), grid_size)
+    )
+
+
+def generate_puzzles_batch(specs, workers=None):
+    """Generate puzzles for ``specs``, yielding results in input order.
+
+    ``specs`` may be any iterable, including a lazy one; only a bounded
+    window of specs is submitted ahead of the result being yielded. With
+    ``workers=1`` everything runs in the current process.
+    """
+    if workers == 1:
+        for spec in specs:
+            yield generate_from_spec(spec)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = workers * PREFETCH_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for spec in specs:
+            pending.append(executor.submit(generate_from_spec, spec))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
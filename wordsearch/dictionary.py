@@ -0,0 +1,324 @@
+"""Indexed, memory-mapped word dictionary.
+
+Large themed word files are compiled once (see ``build_dictionary``) into
+an index that every worker maps read-only, so a 100k-word dictionary costs
+each process a file descriptor and a few page-cache pages, not a Python
+set per worker.
+
+File layout (all integers little-endian ``u32`` unless noted):
+
+* header: magic, format version (u16), longest word (u16), word count and
+  category count
+* ``length_starts``: for each length ``0..max_length + 1``, the id of the
+  first word of that length; ids run through the words sorted by
+  ``(length, word)``
+* ``length_offsets``: byte offset of each length's words in the word area
+* ``letter_masks``: one 26-bit mask of the letters used by each word
+* per category: its name (NUL padded) and ``category_starts``, offsets into
+  the category's id list of the first word of each length
+* category id lists, each sorted by ``(length, word)``
+* the word area: words of each length back to back, without separators
+
+Words of one length are fixed width, so word ``id`` is found with one
+multiplication; the words of a category in a length range are one
+contiguous run of its id list, so sampling them is a single random index.
+"""
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_right
+
+import numpy as np
+from django.conf import settings
+
+from .engine import FIRST_LETTER
+
+
+MAGIC = b'WSDX'
+FORMAT_VERSION = 1
+
+# magic, format version, longest word, word count, category count
+HEADER = struct.Struct('<4sHHII')
+CATEGORY_NAME_SIZE = 32
+UINT32 = np.dtype('<u4')
+
+
+class DictionaryError(Exception):
+    """Raised when a dictionary index is missing or malformed."""
+
+
+def normalize_word(word):
+    """Return ``word`` upper-cased, or ``None`` if it is not plain A-Z."""
+    word = word.strip().upper()
+    if word.isascii() and word.isalpha():
+        return word
+    return None
+
+
+def letter_mask(word):
+    """Return the 26-bit mask of the letters in an upper-case word."""
+    mask = 0
+    for letter in word:
+        mask |= 1 << (ord(letter) - FIRST_LETTER)
+    return mask
+
+
+def write_dictionary(path, categories):
+    """Write a dictionary index for ``{category: iterable of words}``.
+
+    Words are normalized with ``normalize_word`` and anything else is
+    skipped; a word may belong to several categories but is stored once.
+    Returns ``(word_count, skipped)``.
+    """
+    members = {}
+    skipped = 0
+    for category, words in categories.items():
+        if len(category.encode('utf-8')) > CATEGORY_NAME_SIZE:
+            raise DictionaryError(f'Category name too long: {category}')
+        normalized = set()
+        for word in words:
+            word = normalize_word(word)
+            if word is None:
+                skipped += 1
+            else:
+                normalized.add(word)
+        members[category] = normalized
+
+    words = sorted(set().union(*members.values()), key=lambda word: (len(word), word))
+    ids = {word: index for index, word in enumerate(words)}
+    max_length = len(words[-1]) if words else 0
+    lengths = [len(word) for word in words]
+
+    length_starts = [bisect_right(lengths, length - 1) for length in range(max_length + 2)]
+    length_offsets = [0] * (max_length + 2)
+    for length in range(1, max_length + 2):
+        count = length_starts[length] - length_starts[length - 1]
+        length_offsets[length] = length_offsets[length - 1] + count * (length - 1)
+
+    category_entries = []
+    category_ids = []
+    for category in sorted(members):
+        category_words = sorted(ids[word] for word in members[category])
+        category_lengths = [lengths[index] for index in category_words]
+        starts = [
+            len(category_ids) + bisect_right(category_lengths, length - 1)
+            for length in range(max_length + 2)
+        ]
+        category_entries.append((category, starts))
+        category_ids.extend(category_words)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as index_file:
+            index_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, max_length, len(words), len(members)))
+            index_file.write(np.asarray(length_starts, dtype=UINT32).tobytes())
+            index_file.write(np.asarray(length_offsets, dtype=UINT32).tobytes())
+            index_file.write(np.fromiter(map(letter_mask, words), dtype=UINT32, count=len(words)).tobytes())
+            for category, starts in category_entries:
+                index_file.write(category.encode('utf-8').ljust(CATEGORY_NAME_SIZE, b'\0'))
+                index_file.write(np.asarray(starts, dtype=UINT32).tobytes())
+            index_file.write(np.asarray(category_ids, dtype=UINT32).tobytes())
+            index_file.write(''.join(words).encode('ascii'))
+        # mkstemp creates the file owner-only; workers may run as another user
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(words), skipped
+
+
+class Dictionary:
+    """Read-only, memory-mapped view of a dictionary index."""
+
+    def __init__(self, path):
+        try:
+            with open(path, 'rb') as index_file:
+                self._mmap = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise DictionaryError(f'Cannot open dictionary {path}: {e}')
+
+        self.path = path
+        if len(self._mmap) < HEADER.size:
+            raise DictionaryError(f'{path} is too small to be a dictionary')
+        magic, format_version, self.max_length, self.word_count, category_count = (
+            HEADER.unpack_from(self._mmap)
+        )
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise DictionaryError(f'{path} is not a version {FORMAT_VERSION} dictionary')
+
+        offset = HEADER.size
+        table_size = self.max_length + 2
+
+        def table(count):
+            nonlocal offset
+            values = np.frombuffer(self._mmap, dtype=UINT32, count=count, offset=offset)
+            offset += count * UINT32.itemsize
+            return values
+
+        try:
+            self._length_starts = table(table_size).tolist()
+            self._length_offsets = table(table_size).tolist()
+            self.letter_masks = table(self.word_count)
+            self._categories = {}
+            for _ in range(category_count):
+                name = self._mmap[offset:offset + CATEGORY_NAME_SIZE].rstrip(b'\0').decode('utf-8')
+                offset += CATEGORY_NAME_SIZE
+                self._categories[name] = table(table_size).tolist()
+            self._category_ids = table(
+                max((starts[-1] for starts in self._categories.values()), default=0)
+            )
+        except ValueError:
+            raise DictionaryError(f'{path} is truncated')
+
+        self._words_offset = offset
+        expected = offset + self._length_offsets[-1]
+        if len(self._mmap) != expected:
+            raise DictionaryError(f'{path} is {len(self._mmap)} bytes, expected {expected}')
+
+    def __len__(self):
+        return self.word_count
+
+    @property
+    def categories(self):
+        return sorted(self._categories)
+
+    def word(self, word_id):
+        """Return the word with id ``word_id``."""
+        length = bisect_right(self._length_starts, word_id) - 1
+        start = (
+            self._words_offset + self._length_offsets[length]
+            + (word_id - self._length_starts[length]) * length
+        )
+        return self._mmap[start:start + length].decode('ascii')
+
+    def __contains__(self, word):
+        """Binary search among the words of the same length."""
+        word = normalize_word(word) if isinstance(word, str) else None
+        if not word or len(word) > self.max_length:
+            return False
+
+        length = len(word)
+        target = word.encode('ascii')
+        base = self._words_offset + self._length_offsets[length]
+        low, high = 0, self._length_starts[length + 1] - self._length_starts[length]
+        while low < high:
+            middle = (low + high) // 2
+            start = base + middle * length
+            candidate = self._mmap[start:start + length]
+            if candidate == target:
+                return True
+            if candidate < target:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def _first_id(self, length, target):
+        """Return the id of the first word of ``length`` not below ``target`` (bytes)."""
+        base = self._words_offset + self._length_offsets[length]
+        first = low = self._length_starts[length]
+        high = self._length_starts[length + 1]
+        while low < high:
+            middle = (low + high) // 2
+            start = base + (middle - first) * length
+            if self._mmap[start:start + length] < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def id_range(self, category=None, min_length=1, max_length=None):
+        """Return ``(ids, start, end)``: the ids in a category and length range.
+
+        ``ids`` is ``None`` for the whole dictionary, where ids are simply
+        ``start..end - 1``; otherwise the matching ids are ``ids[start:end]``.
+        """
+        max_length = self.max_length if max_length is None else min(max_length, self.max_length)
+        min_length = max(min_length, 0)
+        if min_length > max_length:
+            return None, 0, 0
+        if category is None:
+            return None, self._length_starts[min_length], self._length_starts[max_length + 1]
+        try:
+            starts = self._categories[category]
+        except KeyError:
+            raise DictionaryError(f'Unknown category: {category}')
+        return self._category_ids, starts[min_length], starts[max_length + 1]
+
+    def count(self, category=None, min_length=1, max_length=None):
+        """Return how many words match a category and length range."""
+        ids, start, end = self.id_range(category, min_length, max_length)
+        return end - start
+
+    def sample(self, rng, count, category=None, min_length=1, max_length=None):
+        """Return up to ``count`` distinct random words in O(count).
+
+        ``rng`` is a ``random.Random`` (or the ``random`` module).
+        """
+        ids, start, end = self.id_range(category, min_length, max_length)
+        picks = rng.sample(range(start, end), min(count, end - start))
+        if ids is not None:
+            picks = ids[picks].tolist()
+        return [self.word(word_id) for word_id in picks]
+
+    def words_within(self, letters, category=None, min_length=1, max_length=None):
+        """Return every matching word spelled only with ``letters``."""
+        ids, start, end = self.id_range(category, min_length, max_length)
+        allowed = letter_mask(''.join(filter(str.isalpha, letters.upper())))
+        candidates = np.arange(start, end) if ids is None else ids[start:end]
+        masks = self.letter_masks.take(candidates)
+        matches = candidates[(masks & ~np.uint32(allowed)) == 0]
+        return [self.word(word_id) for word_id in matches.tolist()]
+
+    def words_with_prefix(self, prefix, category=None, min_length=1, max_length=None):
+        """Return every matching word starting with ``prefix``, shortest first.
+
+        Words of one length are sorted, so each length is two binary searches.
+        """
+        prefix = prefix.strip().upper()
+        if prefix and normalize_word(prefix) is None:
+            return []
+        min_length = max(min_length, len(prefix), 1)
+        max_length = self.max_length if max_length is None else min(max_length, self.max_length)
+        ids, start, end = self.id_range(category, min_length, max_length)
+        low, high = prefix.encode('ascii'), (prefix + '[').encode('ascii')
+        matches = []
+        for length in range(min_length, max_length + 1):
+            first, last = self._first_id(length, low), self._first_id(length, high)
+            if ids is None:
+                matches.extend(range(first, last))
+            else:
+                # A category's ids are sorted, so its matches are one run too
+                run = ids[start:end]
+                matches.extend(run[np.searchsorted(run, first):np.searchsorted(run, last)].tolist())
+        return [self.word(word_id) for word_id in matches]
+
+    def close(self):
+        self.letter_masks = self._category_ids = None
+        self._mmap.close()
+
+
+_dictionary = None
+_dictionary_loaded = False
+
+
+def get_dictionary():
+    """Return the configured ``Dictionary``, or ``None`` if there isn't one.
+
+    The index is opened once per process, on first use, so workers that
+    never need it never map it.
+    """
+    global _dictionary, _dictionary_loaded
+    if not _dictionary_loaded:
+        _dictionary_loaded = True
+        path = getattr(settings, 'WORDSEARCH_DICTIONARY_PATH', None)
+        if path and os.path.exists(path):
+            try:
+                _dictionary = Dictionary(path)
+            except DictionaryError:
+                _dictionary = None
+    return _dictionary
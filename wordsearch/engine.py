@@ -0,0 +1,786 @@
+"""NumPy-backed word search grid engine.
+
+The grid is kept as a flat ``uint8`` array (0 = empty, otherwise the ASCII
+code of the letter). For every word length we precompute the flat cell
+indices of every in-bounds (direction, row, col) candidate, so testing
+placements is a vectorized comparison over many candidates at once instead
+of one ``can_place_word`` call per guess.
+"""
+import random
+import time
+from functools import lru_cache
+
+import numpy as np
+
+
+# Same direction order as views.generate_word_search_grid
+DIRECTIONS = [
+    (0, 1),   # right
+    (1, 0),   # down
+    (1, 1),   # diagonal down-right
+    (1, -1),  # diagonal down-left
+    (0, -1),  # left
+    (-1, 0),  # up
+    (-1, -1), # diagonal up-left
+    (-1, 1),  # diagonal up-right
+]
+
+# Bump whenever the same seed and words would produce a different grid, so
+# anything caching generated levels knows to rebuild them. wordsearch.tests
+# pins a few levels per version, so a change that forgets to bump fails there.
+#   1  vectorized placement engine
+#   2  accidental copies re-rolled; levels past 15 later grew beyond 20x20
+#      under this same number, so version-2 packs and exports are ambiguous
+#   3  trigram letter-model filler and near-miss decoys
+#   4  copies spelled by placed letters alone: the word moves onto one, or
+#      is dropped; levels 1-60 came out unchanged
+#   5  level grids stop growing at levels.MAX_LEVEL_GRID_SIZE
+GENERATOR_VERSION = 5
+
+EMPTY = 0
+# Candidates scored per word before falling back to a full scan
+SAMPLE_SIZE = 32
+# Backtracking: placements tried per word, and how many upcoming words must
+# still have somewhere to go after each placement
+BRANCH_LIMIT = 8
+LOOKAHEAD = 3
+DEFAULT_TIME_BUDGET = 0.5
+# Re-roll rounds allowed to remove accidental copies of target words
+REPAIR_ROUNDS = 20
+# Longest word whose 5-bit letter codes fit in one uint64
+PACKED_WORD_LENGTH = 12
+# Above this many words, searching packed windows beats str.find per word
+STRING_SEARCH_WORDS = 40
+# Packed-window search: only text positions whose first few letters start
+# some word (or reversed word) are looked at, found with one table lookup
+PATTERN_PREFIX_LENGTH = 3
+FIRST_LETTER = ord('A')
+LAST_LETTER = ord('Z')
+
+
+class GeneratorStats:
+    """Running totals of generator work in this process.
+
+    Every generator adds to ``generator_stats``, so benchmarks and
+    production monitoring read the same numbers: ``attempts`` counts
+    candidate placements tried, ``failures`` words left out and
+    ``fill_seconds`` time spent filling and repairing grids.
+    """
+
+    FIELDS = ('grids', 'words', 'attempts', 'failures', 'fill_seconds')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+generator_stats = GeneratorStats()
+
+
+@lru_cache(maxsize=64)
+def candidate_table(grid_size, length):
+    """Return ``(starts, cells)`` for every in-bounds placement of a word.
+
+    ``starts`` has shape (K, 3) holding (direction index, row, col) and
+    ``cells`` has shape (length, K) holding the flat grid index of each
+    letter, so each letter position is one contiguous row. Both arrays are
+    read-only because they are shared via the cache.
+    """
+    rows, cols = np.meshgrid(
+        np.arange(grid_size), np.arange(grid_size), indexing='ij'
+    )
+    rows = rows.ravel()
+    cols = cols.ravel()
+    steps = np.arange(length)
+
+    starts = []
+    cells = []
+    for index, (dr, dc) in enumerate(DIRECTIONS):
+        end_rows = rows + (length - 1) * dr
+        end_cols = cols + (length - 1) * dc
+        inside = (
+            (end_rows >= 0) & (end_rows < grid_size)
+            & (end_cols >= 0) & (end_cols < grid_size)
+        )
+        r = rows[inside]
+        c = cols[inside]
+        starts.append(np.column_stack([np.full(len(r), index), r, c]))
+        cell_rows = r[None, :] + steps[:, None] * dr
+        cell_cols = c[None, :] + steps[:, None] * dc
+        cells.append(cell_rows * grid_size + cell_cols)
+
+    starts = np.concatenate(starts).astype(np.int32)
+    cells = np.ascontiguousarray(np.concatenate(cells, axis=1), dtype=np.intp)
+    starts.flags.writeable = False
+    cells.flags.writeable = False
+    return starts, cells
+
+
+def placement_fits(flat_grid, word_codes, cells):
+    """Return a boolean mask of the candidate columns ``word_codes`` fits."""
+    current = flat_grid.take(cells)
+    fits = (current == EMPTY) | (current == word_codes[:, None])
+    return np.logical_and.reduce(fits, axis=0)
+
+
+def valid_placements(flat_grid, word_codes, grid_size):
+    """Return every candidate index where ``word_codes`` fits."""
+    starts, cells = candidate_table(grid_size, len(word_codes))
+    return np.flatnonzero(placement_fits(flat_grid, word_codes, cells))
+
+
+def random_uints(rng, count):
+    """Return ``count`` random ``uint32`` values drawn from ``rng``."""
+    return np.frombuffer(rng.randbytes(4 * count), dtype=np.uint32)
+
+
+def find_placement(flat_grid, word_codes, grid_size, rng, noise):
+    """Return a random candidate index where the word fits, or ``None``.
+
+    ``noise`` is a batch of ``SAMPLE_SIZE`` random ``uint32`` values used to
+    pick the candidates scored first, which is almost always enough on a
+    sparse grid. Only when the whole batch collides do we score every
+    candidate, so a word is never dropped while a valid spot exists.
+    """
+    starts, cells = candidate_table(grid_size, len(word_codes))
+    sample = noise % cells.shape[1]
+    hits = placement_fits(flat_grid, word_codes, cells[:, sample])
+    first = hits.argmax()
+    if hits[first]:
+        # As many tries as a one-at-a-time random placer would have needed
+        generator_stats.attempts += int(first) + 1
+        return int(sample[first])
+
+    generator_stats.attempts += len(sample) + cells.shape[1]
+    valid = valid_placements(flat_grid, word_codes, grid_size)
+    if not len(valid):
+        return None
+    return int(valid[rng.randrange(len(valid))])
+
+
+def encode_word(word):
+    """Return a word as a ``uint8`` array of ASCII codes."""
+    return np.frombuffer(word.encode('ascii'), dtype=np.uint8)
+
+
+def fill_empty(flat_grid, rng):
+    """Fill every empty cell with a random letter in place."""
+    empty = np.flatnonzero(flat_grid == EMPTY)
+    letters = random_uints(rng, len(empty)) % (LAST_LETTER - FIRST_LETTER + 1)
+    flat_grid[empty] = letters + FIRST_LETTER
+
+
+@lru_cache(maxsize=16)
+def line_layout(grid_size):
+    """Return the flat cell index of every character of the grid's line text.
+
+    The line text is every row, column and diagonal (both ways) of the grid
+    read forwards, with a separator between lines; separators are stored as
+    ``grid_size * grid_size``, one past the last cell.
+    """
+    cells = np.arange(grid_size * grid_size).reshape(grid_size, grid_size)
+    flipped = np.fliplr(cells)
+    offsets = range(-(grid_size - 1), grid_size)
+    lines = (
+        list(cells) + list(cells.T)
+        + [np.diagonal(cells, offset) for offset in offsets]
+        + [np.diagonal(flipped, offset) for offset in offsets]
+    )
+    separator = np.array([grid_size * grid_size])
+    layout = np.concatenate([part for line in lines for part in (line, separator)])
+    layout.flags.writeable = False
+    return layout
+
+
+@lru_cache(maxsize=16)
+def line_index(grid_size):
+    """Return ``(bounds, cell_lines)`` for the lines of ``line_layout``.
+
+    Line ``i`` and its separator are ``layout[bounds[i]:bounds[i + 1]]``;
+    ``cell_lines`` has shape (cells, 4) holding the four lines (row, column
+    and both diagonals) through each cell.
+    """
+    layout = line_layout(grid_size)
+    ends = np.flatnonzero(layout == grid_size * grid_size) + 1
+    bounds = np.concatenate([[0], ends])
+    line_of = np.repeat(np.arange(len(ends)), np.diff(bounds))
+    letters = np.flatnonzero(layout != grid_size * grid_size)
+    order = np.argsort(layout[letters], kind='stable')
+    cell_lines = line_of[letters][order].reshape(-1, 4)
+    bounds.flags.writeable = False
+    cell_lines.flags.writeable = False
+    return bounds, cell_lines
+
+
+def lines_layout(grid_size, lines):
+    """Return the part of ``line_layout`` holding only ``lines``, in the same format."""
+    bounds = line_index(grid_size)[0]
+    starts, lengths = bounds[lines], bounds[lines + 1] - bounds[lines]
+    # Position in the layout of every character of the chosen lines
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    return line_layout(grid_size)[offsets]
+
+
+def string_word_hits(text, words):
+    """Return ``(word, position, length)`` for every match of ``words``.
+
+    ``text`` is the line text as 1..26 letter codes; each word and its
+    reverse gets one ``str.find`` pass over it in C.
+    """
+    line_text = (text + (FIRST_LETTER - 1)).tobytes().decode('latin-1')
+    hits = []
+    for word in words:
+        for pattern in {word, word[::-1]}:
+            position = line_text.find(pattern)
+            while position != -1:
+                hits.append((word, position, len(word)))
+                position = line_text.find(pattern, position + 1)
+    return hits
+
+
+def pack_letters(letters):
+    """Return the 5-bit packed code of a word's letters."""
+    code = 0
+    for letter in letters:
+        code = (code << 5) | (ord(letter) - FIRST_LETTER + 1)
+    return code
+
+
+def packed_patterns(words):
+    """Return ``(prefix_length, starts, lengths)`` for ``packed_word_hits``.
+
+    ``starts`` marks the packed code of the first ``prefix_length`` letters
+    of every word and reversed word, and ``lengths`` maps each word length
+    to ``(codes, words)``: the sorted packed codes of the words of that
+    length and their reverses, and the word each code belongs to.
+    """
+    patterns = {}
+    for word in words:
+        for pattern in (word, word[::-1]):
+            patterns.setdefault(len(word), {})[pack_letters(pattern)] = word
+    prefix_length = min([PATTERN_PREFIX_LENGTH, *patterns])
+    starts = np.zeros(1 << (5 * prefix_length), dtype=bool)
+    lengths = {}
+    for length, codes in patterns.items():
+        targets = np.fromiter(codes, dtype=np.uint64, count=len(codes))
+        starts[(targets >> np.uint64(5 * (length - prefix_length))).astype(np.intp)] = True
+        order = np.argsort(targets)
+        words_by_code = list(codes.values())
+        lengths[length] = (targets[order], [words_by_code[index] for index in order.tolist()])
+    return prefix_length, starts, lengths
+
+
+def packed_word_hits(text, patterns):
+    """Return ``(word, position, length)`` for every match of ``patterns``.
+
+    Letter codes take 5 bits, so every window of up to
+    ``PACKED_WORD_LENGTH`` letters packs exactly into one ``uint64``. One
+    table lookup of every position's first letters (see
+    ``packed_patterns``) keeps only the positions where some word or
+    reversed word could start, typically a few percent of them; windows
+    are packed only there and looked up by binary search. The cost is one
+    vectorized pass over the text however many words there are.
+    """
+    prefix_length, starts, lengths = patterns
+    if not lengths:
+        return []
+    prefix = text[:len(text) - prefix_length + 1].astype(np.intp)
+    for offset in range(1, prefix_length):
+        prefix = (prefix << 5) | text[offset:len(text) - prefix_length + 1 + offset]
+    candidates = np.flatnonzero(starts[prefix])
+
+    # Letters from each candidate on; separators and the padding are 0,
+    # which no word contains, so no window running past a line matches
+    longest = max(lengths)
+    padded = np.concatenate([text, np.zeros(longest, dtype=text.dtype)]).astype(np.uint64)
+    letters = padded[candidates[:, None] + np.arange(longest)]
+
+    hits = []
+    windows = np.zeros(len(candidates), dtype=np.uint64)
+    for length in range(1, longest + 1):
+        windows = (windows << np.uint64(5)) | letters[:, length - 1]
+        if length in lengths:
+            targets, words = lengths[length]
+            found = np.minimum(np.searchsorted(targets, windows), len(targets) - 1)
+            matches = np.flatnonzero(targets[found] == windows)
+            for position, index in zip(candidates[matches].tolist(), found[matches].tolist()):
+                hits.append((words[index], position, length))
+    return hits
+
+
+class CopyFinder:
+    """Finds unintended copies of placed words in a grid.
+
+    The grid's line text is searched for every word forwards and backwards.
+    A handful of words is cheapest with ``str.find``; beyond
+    ``STRING_SEARCH_WORDS`` the packed-window search is used, since its
+    cost depends on the grid area and not on the number of words. Build
+    one per set of words; ``move`` records a word placed somewhere else.
+    """
+
+    def __init__(self, grid_size, placed_words):
+        self.grid_size = grid_size
+        # Palindromes match in either reading order, so placements are
+        # keyed by their end cells as an unordered pair
+        self.expected = {copy_key(grid_size, item) for item in placed_words}
+        words = {item['word'] for item in placed_words}
+        packed = set()
+        if len(words) > STRING_SEARCH_WORDS:
+            packed = {word for word in words if len(word) <= PACKED_WORD_LENGTH}
+        self.patterns = packed_patterns(packed)
+        self.words = words - packed
+
+    def move(self, old_key, item):
+        self.expected.discard(old_key)
+        self.expected.add(copy_key(self.grid_size, item))
+
+    def find(self, flat_grid, lines=None):
+        """Return ``{(word, end cells): cells}`` for every unintended copy.
+
+        With ``lines`` (indices into ``line_index``), only those lines are
+        searched.
+        """
+        layout = line_layout(self.grid_size) if lines is None else lines_layout(self.grid_size, lines)
+        # Letters become 1..26 and line separators 0, which no word contains
+        text = np.append(flat_grid - (FIRST_LETTER - 1), np.uint8(0)).take(layout)
+        hits = packed_word_hits(text, self.patterns) + string_word_hits(text, self.words)
+
+        extra = {}
+        for word, position, length in hits:
+            cells = layout[position:position + length]
+            key = (word, frozenset([int(cells[0]), int(cells[-1])]))
+            if key not in self.expected:
+                extra[key] = cells
+        return extra
+
+
+def copy_key(grid_size, item):
+    """Return the ``CopyFinder`` key of a ``placed_words`` entry."""
+    first, last = item['positions'][0], item['positions'][-1]
+    return (item['word'], frozenset([
+        first['row'] * grid_size + first['col'],
+        last['row'] * grid_size + last['col'],
+    ]))
+
+
+def find_extra_occurrences(flat_grid, grid_size, placed_words):
+    """Return the cell indices of every unintended copy of a placed word."""
+    return list(CopyFinder(grid_size, placed_words).find(flat_grid).values())
+
+
+def placement_cells(grid_size, item):
+    """Return the flat cell indices of a ``placed_words`` entry."""
+    return np.array([cell['row'] * grid_size + cell['col'] for cell in item['positions']])
+
+
+def move_to_copy(flat_grid, grid_size, item, cells):
+    """Point ``item`` at the copy of its word at ``cells``; return its old cells."""
+    old = placement_cells(grid_size, item)
+    if flat_grid[cells].tobytes().decode('ascii') != item['word']:
+        cells = cells[::-1]
+    rows, cols = np.divmod(cells, grid_size)
+    item['positions'] = [{'row': row, 'col': col} for row, col in zip(rows.tolist(), cols.tolist())]
+    if len(cells) > 1:
+        item['direction'] = (int(np.sign(rows[1] - rows[0])), int(np.sign(cols[1] - cols[0])))
+    return old
+
+
+def repair_fill(flat_grid, grid_size, placed_words, filler, rng):
+    """Re-roll filler letters until every placed word occurs exactly once.
+
+    Random filler can spell a second copy of a target word, forwards or
+    backwards. Each round re-rolls only the filler cells of the extra
+    copies and searches again only the lines through those cells, until
+    none are left or ``REPAIR_ROUNDS`` runs out. ``filler`` is a boolean
+    mask of the cells that hold filler letters; it is updated in place.
+
+    A copy made entirely of placed letters (a word inside a longer one, or
+    spelled across crossing words) cannot be re-rolled away, so the word
+    moves onto that copy and its old cells go back to the filler. A word
+    that still has a copy when the rounds are over is removed from
+    ``placed_words``, so no grid ever has two answers for one word.
+    Returns the removed words.
+    """
+    finder = CopyFinder(grid_size, placed_words)
+    cell_lines = line_index(grid_size)[1]
+    extra = finder.find(flat_grid)
+    moved = set()
+    # How many placed words cover each cell
+    used = [placement_cells(grid_size, item) for item in placed_words]
+    covering = np.bincount(np.concatenate(used or [[]]).astype(np.intp), minlength=len(flat_grid))
+    for _ in range(REPAIR_ROUNDS):
+        if not extra:
+            break
+        for key, cells in list(extra.items()):
+            word = key[0]
+            if filler[cells].any() or word in moved:
+                continue
+            # Only moved once, so two copies of placed letters cannot make
+            # the word hop back and forth
+            moved.add(word)
+            item = next(item for item in placed_words if item['word'] == word)
+            old_key = copy_key(grid_size, item)
+            old = move_to_copy(flat_grid, grid_size, item, cells)
+            finder.move(old_key, item)
+            del extra[key]
+            covering[cells] += 1
+            covering[old] -= 1
+            filler[old[covering[old] == 0]] = True
+            # The old placement is a copy now, re-rolled below
+            extra[old_key] = old
+
+        cells = np.unique(np.concatenate(list(extra.values())))
+        cells = cells[filler[cells]]
+        if not len(cells):
+            break
+
+        letters = random_uints(rng, len(cells)) % (LAST_LETTER - FIRST_LETTER + 1)
+        flat_grid[cells] = letters + FIRST_LETTER
+        # Copies of placed letters only are still there; every other copy
+        # lost a letter, and any new one is on a line through a re-rolled cell
+        extra = {key: copy for key, copy in extra.items() if not filler[copy].any()}
+        extra.update(finder.find(flat_grid, np.unique(cell_lines[cells])))
+
+    removed = {key[0] for key in extra}
+    placed_words[:] = [item for item in placed_words if item['word'] not in removed]
+    return sorted(removed)
+
+
+def seed_decoys(flat_grid, grid_size, words, count, rng):
+    """Write up to ``count`` near misses of ``words`` into empty cells.
+
+    A near miss is a proper prefix of a word (at least two letters) in any
+    direction, which players have to read past. Only fully empty lines of
+    cells are used, so placed words are never touched. Returns the
+    ``[prefix, direction index, row, col]`` of each one, for ``lay_decoys``.
+    """
+    words = [word for word in words if len(word) > 2]
+    seeded = []
+    for _ in range(count if words else 0):
+        word = rng.choice(words)
+        prefix = word[:rng.randrange(2, len(word))]
+        starts, cells = candidate_table(grid_size, len(prefix))
+        free = np.flatnonzero(np.logical_and.reduce(flat_grid.take(cells) == EMPTY, axis=0))
+        if len(free):
+            choice = free[rng.randrange(len(free))]
+            flat_grid[cells[:, choice]] = encode_word(prefix)
+            seeded.append([prefix, *starts[choice].tolist()])
+    return seeded
+
+
+def lay_decoys(flat_grid, grid_size, decoys):
+    """Write near misses recorded by ``seed_decoys`` back into empty cells.
+
+    Raises ValueError if one no longer fits.
+    """
+    for prefix, direction, row, col in decoys:
+        dr, dc = DIRECTIONS[direction]
+        steps = np.arange(len(prefix))
+        rows, cols = row + steps * dr, col + steps * dc
+        if rows.min() < 0 or cols.min() < 0 or max(rows.max(), cols.max()) >= grid_size:
+            raise ValueError(f'Decoy {prefix} does not fit the grid at {row}, {col}')
+        cells = rows * grid_size + cols
+        if np.any(flat_grid[cells] != EMPTY):
+            raise ValueError(f'Decoy {prefix} overlaps a word at {row}, {col}')
+        flat_grid[cells] = encode_word(prefix)
+
+
+def finish_grid(flat_grid, grid_size, placed_words, rng, letter_model=None, decoys=0,
+                decoy_placements=None):
+    """Fill the empty cells, then remove accidental copies of the words.
+
+    ``decoys`` near misses are seeded first (see ``seed_decoys``), or the
+    recorded ``decoy_placements`` are laid instead, then the rest is filled
+    from ``letter_model`` (a ``letters.LetterModel``) or uniformly at random
+    without one. ``placed_words`` is updated in place by ``repair_fill``.
+    Returns the decoys' placements.
+    """
+    started = time.perf_counter()
+    filler = flat_grid == EMPTY
+    if decoy_placements is None:
+        decoy_placements = seed_decoys(
+            flat_grid, grid_size, [item['word'] for item in placed_words], decoys, rng
+        )
+    else:
+        lay_decoys(flat_grid, grid_size, decoy_placements)
+    if letter_model is None:
+        fill_empty(flat_grid, rng)
+    else:
+        letter_model.fill(flat_grid, grid_size, rng)
+    repair_fill(flat_grid, grid_size, placed_words, filler, rng)
+    generator_stats.fill_seconds += time.perf_counter() - started
+    return decoy_placements
+
+
+def grid_to_rows(flat_grid, grid_size):
+    """Convert a flat ``uint8`` grid back to a list of lists of letters."""
+    text = flat_grid.tobytes().decode('ascii')
+    return [
+        list(text[start:start + grid_size])
+        for start in range(0, grid_size * grid_size, grid_size)
+    ]
+
+
+def describe_placement(word, grid_size, choice):
+    """Return the ``placed_words`` entry for candidate ``choice``."""
+    starts, cells = candidate_table(grid_size, len(word))
+    direction_index, row, col = starts[choice].tolist()
+    dr, dc = DIRECTIONS[direction_index]
+    return {
+        'word': word,
+        'positions': [
+            {'row': row + i * dr, 'col': col + i * dc}
+            for i in range(len(word))
+        ],
+        'direction': (dr, dc)
+    }
+
+
+def build_words_data(placed_words):
+    """Convert ``placed_words`` to the stored ``words_data`` format."""
+    return [
+        {
+            'word': item['word'],
+            'start_row': item['positions'][0]['row'],
+            'start_col': item['positions'][0]['col'],
+            'direction': list(item['direction']),
+            'found': False
+        } for item in placed_words
+    ]
+
+
+def generate_grid(words, grid_size, rng=None, letter_model=None, decoys=0):
+    """Generate a word search grid using the vectorized placement engine.
+
+    Returns the same ``{'grid', 'words', 'placed_words'}`` structure as
+    ``views.generate_word_search_grid``. ``rng`` may be any object with the
+    ``random.Random`` interface and defaults to the global ``random`` module.
+    ``letter_model`` and ``decoys`` control the filler (see ``finish_grid``).
+    """
+    rng = rng or random
+    words = [word.upper() for word in words]
+    flat_grid = np.zeros(grid_size * grid_size, dtype=np.uint8)
+    placed_words = []
+    noise = random_uints(rng, len(words) * SAMPLE_SIZE).reshape(-1, SAMPLE_SIZE)
+
+    for word, word_noise in zip(words, noise):
+        if not word or len(word) > grid_size:
+            continue
+
+        word_codes = encode_word(word)
+        choice = find_placement(
+            flat_grid, word_codes, grid_size, rng, word_noise
+        )
+        if choice is None:
+            # Same behaviour as the legacy engine: skip words that don't fit
+            continue
+
+        starts, cells = candidate_table(grid_size, len(word))
+        flat_grid[cells[:, choice]] = word_codes
+        placed_words.append(describe_placement(word, grid_size, choice))
+
+    decoy_placements = finish_grid(flat_grid, grid_size, placed_words, rng, letter_model, decoys)
+    generator_stats.grids += 1
+    generator_stats.words += len(words)
+    generator_stats.failures += len(words) - len(placed_words)
+
+    return {
+        'grid': grid_to_rows(flat_grid, grid_size),
+        'words': [item['word'] for item in placed_words],
+        'placed_words': placed_words,
+        'decoys': decoy_placements
+    }
+
+
+def replay_grid(words, placements, grid_size, rng=None, letter_model=None, decoys=()):
+    """Lay ``words`` out at known ``placements`` and fill in the rest.
+
+    ``placements`` holds a ``(direction index, row, col)`` start for each
+    word and ``decoys`` the near misses, both as recorded from an earlier
+    generator run (see ``recipes.new_recipe``). Nothing is searched, so the
+    cost is one fill of the grid whatever its size. Raises ValueError if a
+    word runs off the grid or clashes with another. Returns the
+    ``generate_grid_backtracking`` structure.
+    """
+    rng = rng or random
+    flat_grid = np.zeros(grid_size * grid_size, dtype=np.uint8)
+    placed_words = []
+    for word, (direction, row, col) in zip(words, placements, strict=True):
+        if not 0 <= direction < len(DIRECTIONS):
+            raise ValueError(f'Unknown direction {direction} for {word}')
+        dr, dc = DIRECTIONS[direction]
+        steps = np.arange(len(word))
+        rows, cols = row + steps * dr, col + steps * dc
+        if not len(word) or rows.min() < 0 or cols.min() < 0 or max(rows.max(), cols.max()) >= grid_size:
+            raise ValueError(f'{word} does not fit the grid at {row}, {col}')
+
+        cells = rows * grid_size + cols
+        word_codes = encode_word(word)
+        current = flat_grid[cells]
+        if np.any((current != EMPTY) & (current != word_codes)):
+            raise ValueError(f'{word} clashes with another word at {row}, {col}')
+        flat_grid[cells] = word_codes
+        placed_words.append({
+            'word': word,
+            'positions': [{'row': r, 'col': c} for r, c in zip(rows.tolist(), cols.tolist())],
+            'direction': (dr, dc)
+        })
+
+    finish_grid(flat_grid, grid_size, placed_words, rng, letter_model, decoy_placements=decoys)
+    generator_stats.grids += 1
+    generator_stats.words += len(words)
+
+    return {
+        'grid': grid_to_rows(flat_grid, grid_size),
+        'words': [item['word'] for item in placed_words],
+        'placed_words': placed_words,
+        'decoys': list(decoys),
+        'unplaced': [word for word in words if word not in {item['word'] for item in placed_words}]
+    }
+
+
+def ranked_placements(flat_grid, word_codes, grid_size, rng):
+    """Return up to ``BRANCH_LIMIT`` valid candidates, best first.
+
+    Candidates that reuse more letters already on the grid come first, since
+    they leave more empty cells for the words still to place. Ties are
+    broken randomly so the layout still varies between runs.
+    """
+    starts, cells = candidate_table(grid_size, len(word_codes))
+    valid = valid_placements(flat_grid, word_codes, grid_size)
+    if not len(valid):
+        return []
+
+    overlap = (flat_grid.take(cells[:, valid]) != EMPTY).sum(axis=0)
+    tiebreak = random_uints(rng, len(valid))
+    order = np.lexsort((tiebreak, -overlap))[:BRANCH_LIMIT]
+    return valid[order].tolist()
+
+
+class _SearchExhausted(Exception):
+    """Unwinds the whole backtracking search once its budget has run out."""
+
+
+def generate_grid_backtracking(words, grid_size, rng=None,
+                               time_budget=DEFAULT_TIME_BUDGET,
+                               letter_model=None, decoys=0, max_attempts=None):
+    """Generate a grid that places every word if at all possible.
+
+    Words are placed longest-first with a depth-first search over the best
+    few candidates per word, backtracking whenever one of the next
+    ``LOOKAHEAD`` words would have nowhere left to go. If ``time_budget``
+    seconds pass before every word is placed, the deepest layout found so
+    far is kept and any remaining words that still fit are added greedily.
+    ``max_attempts`` caps the placements tried instead (or as well); unlike
+    the time budget it gives the same grid for the same ``rng`` on any
+    machine, so pass ``time_budget=None`` when the grid must be reproducible.
+
+    Returns the ``generate_grid`` structure plus an ``unplaced`` list of the
+    words that could not be placed. ``letter_model`` and ``decoys`` are as
+    for ``generate_grid``.
+    """
+    rng = rng or random
+    words = list(dict.fromkeys(word.upper() for word in words))
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    attempts = 0
+    flat_grid = np.zeros(grid_size * grid_size, dtype=np.uint8)
+
+    # Longest words are the hardest to fit, so they go first
+    order = sorted(
+        (word for word in words if word and len(word) <= grid_size),
+        key=len, reverse=True
+    )
+    codes = [encode_word(word) for word in order]
+    placements = []
+    best = []
+
+    def has_room(index):
+        for word_codes in codes[index:index + LOOKAHEAD]:
+            check_budget()
+            if not len(valid_placements(flat_grid, word_codes, grid_size)):
+                return False
+        return True
+
+    def check_budget():
+        # Raised rather than returned, so no frame up the stack goes on to
+        # try (and scan room for) its remaining candidates
+        if deadline is not None and time.monotonic() > deadline:
+            raise _SearchExhausted
+        if max_attempts is not None and attempts >= max_attempts:
+            raise _SearchExhausted
+
+    def search(index):
+        nonlocal best, attempts
+        if len(placements) > len(best):
+            best = list(placements)
+        if index == len(order):
+            return True
+
+        word_codes = codes[index]
+        starts, cells = candidate_table(grid_size, len(word_codes))
+        for choice in ranked_placements(flat_grid, word_codes, grid_size, rng):
+            check_budget()
+            attempts += 1
+            generator_stats.attempts += 1
+            cell_indices = cells[:, choice]
+            previous = flat_grid[cell_indices]
+            flat_grid[cell_indices] = word_codes
+            placements.append((index, choice))
+
+            if has_room(index + 1) and search(index + 1):
+                return True
+
+            placements.pop()
+            flat_grid[cell_indices] = previous
+        return False
+
+    try:
+        solved = search(0)
+    except _SearchExhausted:
+        solved = False
+    if not solved:
+        # Rebuild the deepest partial layout, then add what still fits
+        flat_grid[:] = EMPTY
+        placed_indices = set()
+        for index, choice in best:
+            starts, cells = candidate_table(grid_size, len(codes[index]))
+            flat_grid[cells[:, choice]] = codes[index]
+            placed_indices.add(index)
+
+        placements = list(best)
+        for index, word_codes in enumerate(codes):
+            if index in placed_indices:
+                continue
+            choice = find_placement(
+                flat_grid, word_codes, grid_size, rng,
+                random_uints(rng, SAMPLE_SIZE)
+            )
+            if choice is not None:
+                starts, cells = candidate_table(grid_size, len(word_codes))
+                flat_grid[cells[:, choice]] = word_codes
+                placements.append((index, choice))
+
+    # Report words in the order they were given, not the order placed
+    placed = {order[index]: choice for index, choice in placements}
+    placed_words = [
+        describe_placement(word, grid_size, placed[word])
+        for word in words if word in placed
+    ]
+    decoy_placements = finish_grid(flat_grid, grid_size, placed_words, rng, letter_model, decoys)
+    generator_stats.grids += 1
+    generator_stats.words += len(words)
+    generator_stats.failures += len(words) - len(placed_words)
+
+    return {
+        'grid': grid_to_rows(flat_grid, grid_size),
+        'words': [item['word'] for item in placed_words],
+        'placed_words': placed_words,
+        'decoys': decoy_placements,
+        'unplaced': [word for word in words if word not in {item['word'] for item in placed_words}]
+    }
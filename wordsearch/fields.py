@@ -0,0 +1,149 @@
+"""Packed letter grid model field.
+
+A JSON list of lists spends about five bytes per cell on disk and a Python
+string per cell after every load. ``PackedGridField`` stores the grid as a
+small header (width, height) followed by one byte per cell in row-major
+order, and loads it as a ``PackedGrid``: a read-only 2D view over those
+bytes that only builds a row string when a row is read.
+"""
+import base64
+import struct
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+# width, height
+GRID_HEADER = struct.Struct('<HH')
+
+
+class PackedGrid:
+    """Read-only letter grid over row-major bytes.
+
+    Behaves like a sequence of row strings, so ``len(grid)``, ``grid[r]``,
+    ``grid[r][c]`` and ``for row in grid`` all work the way they did on a
+    list of lists of letters.
+    """
+
+    __slots__ = ('width', 'height', 'data')
+
+    def __init__(self, width, height, data):
+        if len(data) != width * height:
+            raise ValueError(f'{len(data)} bytes cannot be a {width}x{height} grid')
+        self.width = width
+        self.height = height
+        self.data = bytes(data)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a grid from rows of letters (lists of characters or strings)."""
+        rows = [''.join(row) for row in rows]
+        width = len(rows[0]) if rows else 0
+        if any(len(row) != width for row in rows):
+            raise ValueError('Grid rows must all be the same length')
+        return cls(width, len(rows), ''.join(rows).encode('ascii'))
+
+    @classmethod
+    def from_bytes(cls, packed):
+        """Inverse of ``to_bytes``."""
+        if len(packed) < GRID_HEADER.size:
+            raise ValueError('Packed grid is truncated')
+        width, height = GRID_HEADER.unpack_from(packed)
+        return cls(width, height, packed[GRID_HEADER.size:])
+
+    def to_bytes(self):
+        return GRID_HEADER.pack(self.width, self.height) + self.data
+
+    def __len__(self):
+        return self.height
+
+    def __bool__(self):
+        return self.height > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[row] for row in range(self.height)[index]]
+        start = range(self.height)[index] * self.width
+        return self.data[start:start + self.width].decode('ascii')
+
+    def __iter__(self):
+        for start in range(0, self.height * self.width, self.width):
+            yield self.data[start:start + self.width].decode('ascii')
+
+    @property
+    def rows(self):
+        """The grid as one string per row."""
+        return list(self)
+
+    def to_list(self):
+        """The grid as a list of lists of letters (the JSON format)."""
+        return [list(row) for row in self]
+
+    def __eq__(self, other):
+        if isinstance(other, PackedGrid):
+            return (self.width, self.height, self.data) == (other.width, other.height, other.data)
+        if isinstance(other, (list, tuple)):
+            try:
+                return self == PackedGrid.from_rows(other)
+            except (TypeError, ValueError):
+                return False
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.width, self.height, self.data))
+
+    def __str__(self):
+        return '\n'.join(self)
+
+    def __repr__(self):
+        return f'<PackedGrid {self.width}x{self.height}>'
+
+
+def to_packed_grid(value):
+    """Coerce a stored or submitted grid to a ``PackedGrid``, or ``None``.
+
+    Accepts a ``PackedGrid``, packed bytes, or rows of letters; empty
+    values (``None``, ``{}``, ``[]``) mean no grid.
+    """
+    if isinstance(value, PackedGrid) or value is None:
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return PackedGrid.from_bytes(bytes(value))
+    if not value:
+        return None
+    if isinstance(value, (list, tuple)):
+        return PackedGrid.from_rows(value)
+    raise TypeError(f'Cannot store {type(value).__name__} as a grid')
+
+
+class PackedGridDescriptor(DeferredAttribute):
+    """Converts anything assigned to the field to a ``PackedGrid``."""
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = to_packed_grid(value)
+
+
+class PackedGridField(models.BinaryField):
+    """Stores a letter grid as packed row-major bytes; see ``PackedGrid``."""
+
+    description = 'Letter grid packed as row-major bytes'
+    descriptor_class = PackedGridDescriptor
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return PackedGrid.from_bytes(bytes(value))
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            # Serialized fixtures hold the packed bytes as base64
+            value = base64.b64decode(value.encode('ascii'))
+        return to_packed_grid(value)
+
+    def get_prep_value(self, value):
+        grid = to_packed_grid(value)
+        return None if grid is None else grid.to_bytes()
+
+    def value_to_string(self, obj):
+        grid = self.value_from_object(obj)
+        return None if grid is None else base64.b64encode(grid.to_bytes()).decode('ascii')
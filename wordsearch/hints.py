@@ -0,0 +1,68 @@
+"""Server-side hints.
+
+A hint is the first cell of a word the player has not found yet. Hints are
+answered from a ``HintIndex`` built once per puzzle (or level) and kept in
+a per-process LRU cache, so the page never needs the answers and a hint
+costs a dict walk, not a pass over ``words_data`` or the grid. Puzzle
+indexes are keyed by ``updated_at`` as well as the id, so editing a puzzle
+never serves hints for its old grid.
+"""
+from functools import lru_cache
+
+from .engine import GENERATOR_VERSION
+from .levels import level_solution
+from .models import WordSearchPuzzle
+from .solver import locate_words
+
+
+HINT_CACHE_SIZE = 1024
+
+
+class HintIndex:
+    """First cell of each word of one puzzle, in the order hints are given."""
+
+    __slots__ = ('starts',)
+
+    def __init__(self, answers):
+        """``answers`` yields ``(word, start, end)``, as in ``levels.solution_set``."""
+        self.starts = {word: start for word, start, end in answers}
+
+    def __len__(self):
+        return len(self.starts)
+
+    def hint(self, found):
+        """Return ``(word, (row, col))`` for the first word not in ``found``, or ``None``."""
+        for word, start in self.starts.items():
+            if word not in found:
+                return word, start
+        return None
+
+
+@lru_cache(maxsize=HINT_CACHE_SIZE)
+def _puzzle_hint_index(puzzle_id, updated_at):
+    puzzle = WordSearchPuzzle.objects.get(pk=puzzle_id)
+    located = locate_words(puzzle.grid_rows, puzzle.words_data or [])
+    return HintIndex((word, start, end) for word, (start, end) in located.items())
+
+
+def puzzle_hint_index(puzzle):
+    """Return the ``HintIndex`` for ``puzzle``; only its id and ``updated_at`` are read."""
+    return _puzzle_hint_index(puzzle.pk, puzzle.updated_at)
+
+
+@lru_cache(maxsize=HINT_CACHE_SIZE)
+def _level_hint_index(level, generator_version):
+    # Solutions are sets, so hints go through the words alphabetically
+    return HintIndex(sorted(level_solution(level)))
+
+
+def level_hint_index(level):
+    """Return the ``HintIndex`` for ``level``."""
+    return _level_hint_index(level, GENERATOR_VERSION)
+
+
+def found_words(found):
+    """Return the set of upper-cased words in a submitted ``found`` list."""
+    if not isinstance(found, list):
+        raise ValueError('found words must be a list')
+    return {str(word).upper() for word in found}
@@ -0,0 +1,186 @@
+"""Database-backed queue for puzzle generation.
+
+Web requests validate a puzzle request, store it as a pending ``PuzzleJob``
+and return straight away; the ``run_puzzle_worker`` command claims pending
+jobs, generates them on a local process pool and saves the puzzles. The
+database is the only broker: a job is claimed with a conditional UPDATE
+from ``pending`` to ``running``, so any number of workers can share a queue
+without handing the same job to two of them.
+
+The pool runs ``batch.generate_from_job``, which never touches the ORM or
+settings; everything it needs is in the spec.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .batch import generate_from_job
+from .dictionary import get_dictionary
+from .models import MAX_GRID_SIZE, PuzzleJob, WordSearchPuzzle
+
+
+# Grid side for each difficulty; extreme puzzles may ask for more
+GRID_SIZES = {'easy': 8, 'medium': 12, 'hard': 16, 'extreme': 20}
+MIN_WORDS = 3
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 12
+
+
+class SpecError(ValueError):
+    """A puzzle request that cannot be generated; the message is for the user."""
+
+
+def puzzle_spec(title, difficulty, words, description='', grid_size=None, is_public=True):
+    """Validate a puzzle request and return the spec to queue.
+
+    ``words`` must already be stripped and upper-cased. ``grid_size`` is
+    only honoured for extreme puzzles. Raises ``SpecError``.
+    """
+    if not title:
+        raise SpecError('Title is required.')
+    if not difficulty:
+        raise SpecError('Difficulty level is required.')
+    if len(words) < MIN_WORDS:
+        raise SpecError(f'At least {MIN_WORDS} words are required.')
+
+    for word in words:
+        if not (word.isascii() and word.isalpha()) or not MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH:
+            raise SpecError(f'Word "{word}" must be {MIN_WORD_LENGTH}-{MAX_WORD_LENGTH} letters only.')
+
+    # With a dictionary installed, only words in it are accepted
+    dictionary = get_dictionary()
+    if dictionary is not None:
+        unknown = [word for word in words if word not in dictionary]
+        if unknown:
+            raise SpecError(f'Not in the dictionary: {", ".join(unknown)}.')
+
+    if len(words) != len(set(words)):
+        raise SpecError('Duplicate words are not allowed.')
+
+    # Extreme puzzles may ask for anything from the default up to MAX_GRID_SIZE
+    default_size = GRID_SIZES.get(difficulty, GRID_SIZES['medium'])
+    if difficulty == 'extreme' and grid_size is not None:
+        if not default_size <= grid_size <= MAX_GRID_SIZE:
+            raise SpecError(f'Extreme grids must be {default_size} to {MAX_GRID_SIZE} cells wide.')
+    else:
+        grid_size = default_size
+
+    return {
+        'title': title,
+        'description': description,
+        'difficulty': difficulty,
+        'words': list(words),
+        'grid_size': grid_size,
+        'is_public': is_public,
+        'storage': settings.WORDSEARCH_PUZZLE_STORAGE,
+        'candidates': settings.WORDSEARCH_DIFFICULTY_CANDIDATES,
+        'time_budget': settings.WORDSEARCH_PLACEMENT_TIME_BUDGET,
+    }
+
+
+def enqueue_puzzle(user, spec):
+    """Queue a spec from ``puzzle_spec`` and return its ``PuzzleJob``."""
+    return PuzzleJob.objects.create(created_by=user, spec=spec)
+
+
+def claim_job(job):
+    """Mark a pending ``job`` as running under a new claim; return False if it was taken."""
+    claim = uuid.uuid4().hex
+    started_at = timezone.now()
+    # Another worker may have claimed it since it was read
+    if not PuzzleJob.objects.filter(id=job.id, status=PuzzleJob.PENDING).update(
+        status=PuzzleJob.RUNNING, started_at=started_at, claim=claim
+    ):
+        return False
+    job.status, job.started_at, job.claim = PuzzleJob.RUNNING, started_at, claim
+    return True
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` pending jobs as running and return them, oldest first."""
+    candidates = PuzzleJob.objects.filter(status=PuzzleJob.PENDING).select_related('created_by')
+    return [job for job in candidates[:limit] if claim_job(job)]
+
+
+def requeue_stale_jobs(max_age):
+    """Return jobs running for over ``max_age`` seconds to the queue.
+
+    A worker that dies mid-job leaves it running forever otherwise. The
+    job's claim is dropped, so if the old worker was only slow its result
+    is discarded rather than saved twice. Returns how many were requeued.
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return PuzzleJob.objects.filter(status=PuzzleJob.RUNNING, started_at__lt=cutoff).update(
+        status=PuzzleJob.PENDING, started_at=None, claim=''
+    )
+
+
+def release_jobs(jobs):
+    """Return claimed jobs that will not be finished to the queue."""
+    for job in jobs:
+        held_by(job).update(status=PuzzleJob.PENDING, started_at=None, claim='')
+
+
+def prune_jobs(max_age):
+    """Delete jobs finished over ``max_age`` seconds ago; returns how many.
+
+    Their puzzles are kept; only the job records go.
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    deleted, _ = PuzzleJob.objects.filter(
+        status__in=[PuzzleJob.DONE, PuzzleJob.FAILED], finished_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def held_by(job):
+    """Return a queryset of ``job`` if its claim still holds it, else empty."""
+    return PuzzleJob.objects.filter(id=job.id, status=PuzzleJob.RUNNING, claim=job.claim)
+
+
+def finish_job(job, result):
+    """Save the puzzle generated for ``job`` and mark the job done.
+
+    Returns False, saving nothing, if the job was requeued and claimed
+    again while this result was being generated.
+    """
+    spec = job.spec
+    stored = {key: result[key] for key in ('recipe', 'grid_data', 'words_data') if key in result}
+    finished_at = timezone.now()
+    with transaction.atomic():
+        if not held_by(job).update(status=PuzzleJob.DONE, unplaced=result['unplaced'], finished_at=finished_at):
+            return False
+        puzzle = WordSearchPuzzle.objects.create(
+            title=spec['title'],
+            description=spec['description'],
+            difficulty=spec['difficulty'],
+            width=spec['grid_size'],
+            height=spec['grid_size'],
+            created_by=job.created_by,
+            is_public=spec['is_public'],
+            **stored
+        )
+        PuzzleJob.objects.filter(id=job.id).update(puzzle=puzzle)
+    job.puzzle, job.unplaced = puzzle, result['unplaced']
+    job.status, job.finished_at = PuzzleJob.DONE, finished_at
+    return True
+
+
+def run_job(job):
+    """Generate a pending ``job`` in this process, when no worker is running."""
+    if not claim_job(job):
+        return
+    try:
+        finish_job(job, generate_from_job(job.spec))
+    except Exception as e:
+        fail_job(job, e)
+
+
+def fail_job(job, error):
+    """Mark ``job`` failed with ``error``, if its claim still holds it."""
+    finished_at = timezone.now()
+    if held_by(job).update(status=PuzzleJob.FAILED, error=str(error), finished_at=finished_at):
+        job.status, job.error, job.finished_at = PuzzleJob.FAILED, str(error), finished_at
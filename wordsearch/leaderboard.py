@@ -0,0 +1,121 @@
+"""Incrementally maintained leaderboard.
+
+Each player has a ``LeaderboardEntry`` holding their highest completed
+puzzle id and how many attempts they have completed. An attempt becoming
+completed bumps the entry with one UPDATE using ``F`` and ``Greatest``, so
+concurrent completions never lose a count and the home page never
+aggregates the attempt table. Rarer changes (an attempt un-completed or
+deleted) recount just that player.
+
+The top ``LEADERBOARD_SIZE`` is cached in the shared cache under a key
+that carries a version counter, and a change that could reorder it (the
+player is already on it, or now outranks its last place) bumps the
+counter once the change is committed. A reader that computed the list
+before a bump stores it under the old version, where nobody looks, so a
+stale list can never be cached over a newer one; ``CACHE_TIMEOUT`` bounds
+anything the counter misses. ``rebuild_leaderboard`` recomputes every
+entry from the attempts, for backfills and repairs.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import LeaderboardEntry, WordSearchAttempt
+
+
+LEADERBOARD_SIZE = 10
+CACHE_KEY = 'wordsearch:leaderboard'
+VERSION_KEY = 'wordsearch:leaderboard:version'
+CACHE_TIMEOUT = 300
+
+
+def cache_key():
+    """Return the cache key of the current top players."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A lost counter restarts from the clock, so it never returns to a
+        # version something was cached under before
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return f'{CACHE_KEY}:{version}'
+
+
+def drop_top_players():
+    """Stop serving the cached top players, once the current transaction commits."""
+    def bump():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            # No counter: the next read starts a new one
+            pass
+    transaction.on_commit(bump)
+
+
+def top_players():
+    """Return the top players as dicts with ``username``, ``highest_level`` and ``completed_count``."""
+    key = cache_key()
+    players = cache.get(key)
+    if players is None:
+        entries = LeaderboardEntry.objects.filter(completed_count__gt=0).order_by('-highest_level', 'user_id')
+        players = [
+            {'user_id': user_id, 'username': username, 'highest_level': level, 'completed_count': count}
+            for user_id, username, level, count in entries.values_list(
+                'user_id', 'user__username', 'highest_level', 'completed_count'
+            )[:LEADERBOARD_SIZE]
+        ]
+        cache.set(key, players, timeout=CACHE_TIMEOUT)
+    return players
+
+
+def invalidate_top_players(user_id, highest_level):
+    """Drop the cached top players if ``user_id`` at ``highest_level`` could change them."""
+    players = cache.get(cache_key())
+    # Nothing cached may mean a reader is computing the list right now, so
+    # its result must not be served either
+    if (players is None
+            or len(players) < LEADERBOARD_SIZE
+            or highest_level >= players[-1]['highest_level']
+            or any(player['user_id'] == user_id for player in players)):
+        drop_top_players()
+
+
+def record_completion(user_id, puzzle_id):
+    """Count an attempt at ``puzzle_id`` that has just become completed.
+
+    Call it once per completion; callers make sure of that by flipping
+    ``is_completed`` with a conditional UPDATE.
+    """
+    LeaderboardEntry.objects.get_or_create(user_id=user_id)
+    LeaderboardEntry.objects.filter(user_id=user_id).update(
+        highest_level=Greatest('highest_level', puzzle_id),
+        completed_count=F('completed_count') + 1,
+        updated_at=timezone.now()
+    )
+    invalidate_top_players(user_id, puzzle_id)
+
+
+def recount_user(user_id):
+    """Recompute one player's entry from their attempts."""
+    totals = completed_totals(WordSearchAttempt.objects.filter(user_id=user_id))
+    highest_level, completed_count = totals.get(user_id, (0, 0))
+    LeaderboardEntry.objects.get_or_create(user_id=user_id)
+    LeaderboardEntry.objects.filter(user_id=user_id).update(
+        highest_level=highest_level,
+        completed_count=completed_count,
+        updated_at=timezone.now()
+    )
+    # The player may have dropped off the board, so always recompute it
+    drop_top_players()
+
+
+def completed_totals(attempts):
+    """Return ``{user_id: (highest_level, completed_count)}`` for players with completed ``attempts``."""
+    rows = attempts.order_by().values('user_id').annotate(
+        highest_level=Max('puzzle_id', filter=Q(is_completed=True)),
+        completed_count=Count('id', filter=Q(is_completed=True)),
+    ).filter(completed_count__gt=0)
+    return {row['user_id']: (row['highest_level'], row['completed_count']) for row in rows}
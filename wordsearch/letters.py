@@ -0,0 +1,78 @@
+"""Trigram letter model for filler cells.
+
+Uniform filler makes real words stand out, because random letters rarely
+look like English. ``LetterModel`` learns trigram, bigram and letter
+frequencies from a word list and fills empty cells with letters that follow
+the same statistics, so the words blend in.
+
+All probabilities live in one cumulative table indexed by the two letters
+to the left, so filling a grid is one vectorized draw per column: every
+empty cell in the column picks its letter at once from its row's context.
+"""
+import numpy as np
+
+from .engine import EMPTY, FIRST_LETTER, random_uints
+
+
+ALPHABET_SIZE = 26
+# Context code for "no letter" (the left edge of the grid or a word start)
+EDGE = 0
+# Interpolation weights for the trigram, bigram, letter and uniform
+# estimates; the uniform share keeps every letter possible
+MIX_WEIGHTS = (0.5, 0.3, 0.15, 0.05)
+
+
+class LetterModel:
+    """Interpolated trigram model over A-Z, trained on a word list."""
+
+    def __init__(self, words):
+        contexts = ALPHABET_SIZE + 1
+        trigrams = np.zeros((contexts, contexts, ALPHABET_SIZE))
+        for word in words:
+            codes = [EDGE, EDGE] + [ord(letter) - FIRST_LETTER + 1 for letter in word.upper()]
+            for first, second, third in zip(codes, codes[1:], codes[2:]):
+                trigrams[first, second, third - 1] += 1
+
+        def normalize(counts):
+            totals = counts.sum(axis=-1, keepdims=True)
+            uniform = np.full_like(counts, 1 / ALPHABET_SIZE)
+            return np.divide(counts, totals, out=uniform, where=totals > 0)
+
+        trigram, bigram, unigram, uniform = MIX_WEIGHTS
+        probabilities = (
+            trigram * normalize(trigrams)
+            + bigram * normalize(trigrams.sum(axis=0))[np.newaxis]
+            + unigram * normalize(trigrams.sum(axis=(0, 1)))
+            + uniform / ALPHABET_SIZE
+        )
+
+        # Row ``first * 27 + second`` holds the cumulative distribution of
+        # the letter after ``first second``; the last column is exactly 1 so
+        # a draw in [0, 1) always lands on a letter
+        cumulative = np.cumsum(probabilities, axis=-1).reshape(contexts * contexts, ALPHABET_SIZE)
+        cumulative[:, -1] = 1.0
+        cumulative.flags.writeable = False
+        self.cumulative = cumulative
+
+    def fill(self, flat_grid, grid_size, rng):
+        """Fill every empty cell in place, left to right along each row."""
+        grid = flat_grid.reshape(grid_size, grid_size)
+        empty = grid == EMPTY
+        if not empty.any():
+            return
+
+        # Letter codes with two EDGE columns on the left, so every column's
+        # context is the two columns before it
+        codes = np.zeros((grid_size, grid_size + 2), dtype=np.intp)
+        codes[:, 2:] = grid
+        codes[:, 2:] -= FIRST_LETTER - 1
+        # One batch of uniform draws in [0, 1) for the whole grid
+        draws = (random_uints(rng, grid_size * grid_size) >> 8) * (1.0 / (1 << 24))
+        draws = draws.reshape(grid_size, grid_size, 1)
+
+        for col in np.flatnonzero(empty.any(axis=0)).tolist():
+            context = codes[:, col] * (ALPHABET_SIZE + 1) + codes[:, col + 1]
+            letters = (self.cumulative.take(context, axis=0) < draws[:, col]).sum(axis=1)
+            np.copyto(codes[:, col + 2], letters + 1, where=empty[:, col])
+
+        grid[empty] = codes[:, 2:][empty] + (FIRST_LETTER - 1)
@@ -0,0 +1,264 @@
+"""Binary "level pack" of pre-generated level puzzles.
+
+A pack is one header followed by fixed-size records for levels 1..N, so
+level ``n`` lives at a computable offset. Workers ``mmap`` the file
+read-only; the OS page cache then holds a single copy shared by every
+gunicorn worker, and reading a level is a couple of slices, not a
+generator run.
+
+Record layout (all integers little-endian):
+
+* text fields ``title``, ``description`` and ``difficulty``, NUL padded
+* ``word_count`` (u8)
+* the level's own ``size`` (u8), at most the header's ``grid_size``
+* the grid, ``size * size`` ASCII bytes in row-major order, padded to
+  ``grid_size * grid_size``
+* ``max_words`` word entries: letter offset (u16), length (u8), start row
+  (u8), start col (u8), direction index (u8)
+* ``letters_size`` bytes holding the words back to back
+"""
+import mmap
+import os
+import struct
+import tempfile
+
+from django.conf import settings
+
+from .engine import DIRECTIONS, GENERATOR_VERSION
+
+
+MAGIC = b'WSLP'
+FORMAT_VERSION = 2
+
+# magic, format version, generator version, largest grid size, max words,
+# letters size, level count
+HEADER = struct.Struct('<4sHHHHHI')
+WORD_ENTRY = struct.Struct('<HBBBB')
+TEXT_FIELDS = (('title', 32), ('description', 64), ('difficulty', 10))
+TEXT_SIZE = sum(size for name, size in TEXT_FIELDS)
+
+
+class LevelPackError(Exception):
+    """Raised when a level pack is missing, stale or malformed."""
+
+
+def record_size(grid_size, max_words, letters_size):
+    """Return the size in bytes of one level record."""
+    return (
+        TEXT_SIZE + 2 + grid_size * grid_size
+        + max_words * WORD_ENTRY.size + letters_size
+    )
+
+
+def pack_level(data, grid_size, max_words, letters_size):
+    """Encode one ``generate_random_puzzle`` dict as a record."""
+    record = bytearray(record_size(grid_size, max_words, letters_size))
+    offset = 0
+    for name, size in TEXT_FIELDS:
+        encoded = data[name].encode('utf-8')
+        if len(encoded) > size:
+            raise LevelPackError(f'{name} too long for level {data["id"]}')
+        record[offset:offset + len(encoded)] = encoded
+        offset += size
+
+    placed_words = data['placed_words']
+    if len(placed_words) > max_words:
+        raise LevelPackError(f'Too many words for level {data["id"]}')
+    record[offset] = len(placed_words)
+    offset += 1
+
+    if data['grid_size'] > grid_size:
+        raise LevelPackError(f'Grid too big for level {data["id"]}')
+    record[offset] = data['grid_size']
+    offset += 1
+
+    grid = ''.join(''.join(row) for row in data['grid_data']).encode('ascii')
+    record[offset:offset + len(grid)] = grid
+    offset += grid_size * grid_size
+
+    letters_start = offset + max_words * WORD_ENTRY.size
+    letter_offset = 0
+    for item in placed_words:
+        word = item['word'].encode('ascii')
+        if letter_offset + len(word) > letters_size:
+            raise LevelPackError(f'Words too long for level {data["id"]}')
+        start = item['positions'][0]
+        WORD_ENTRY.pack_into(
+            record, offset, letter_offset, len(word),
+            start['row'], start['col'], DIRECTIONS.index(tuple(item['direction']))
+        )
+        record[letters_start + letter_offset:letters_start + letter_offset + len(word)] = word
+        letter_offset += len(word)
+        offset += WORD_ENTRY.size
+
+    return bytes(record)
+
+
+def write_level_pack(path, puzzles, grid_size, max_words, letters_size):
+    """Write ``puzzles`` (levels 1..N, in order) to a pack at ``path``.
+
+    The pack is written to a temporary file and moved into place, so
+    workers that already have the old pack mapped keep reading it safely.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(handle, 'wb') as pack_file:
+            pack_file.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, GENERATOR_VERSION,
+                grid_size, max_words, letters_size, 0
+            ))
+            for data in puzzles:
+                count += 1
+                if data['id'] != count:
+                    raise LevelPackError(f'Expected level {count}, got {data["id"]}')
+                pack_file.write(pack_level(data, grid_size, max_words, letters_size))
+
+            # Now that the count is known, rewrite the header
+            pack_file.seek(0)
+            pack_file.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, GENERATOR_VERSION,
+                grid_size, max_words, letters_size, count
+            ))
+        # mkstemp creates the file owner-only; workers may run as another user
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return count
+
+
+class LevelPack:
+    """Read-only, memory-mapped view of a level pack file."""
+
+    def __init__(self, path):
+        try:
+            with open(path, 'rb') as pack_file:
+                self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise LevelPackError(f'Cannot open level pack {path}: {e}')
+
+        self.path = path
+        self._view = memoryview(self._mmap)
+        if len(self._view) < HEADER.size:
+            raise LevelPackError(f'{path} is too small to be a level pack')
+
+        (magic, format_version, self.generator_version, self.grid_size,
+         self.max_words, self.letters_size, self.level_count) = HEADER.unpack_from(self._view)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise LevelPackError(f'{path} is not a version {FORMAT_VERSION} level pack')
+
+        self.record_size = record_size(self.grid_size, self.max_words, self.letters_size)
+        expected = HEADER.size + self.level_count * self.record_size
+        if len(self._view) != expected:
+            raise LevelPackError(f'{path} is {len(self._view)} bytes, expected {expected}')
+
+    def __len__(self):
+        return self.level_count
+
+    def __contains__(self, level):
+        return 1 <= level <= self.level_count
+
+    @property
+    def is_current(self):
+        """Whether the pack was built by the running generator version."""
+        return self.generator_version == GENERATOR_VERSION
+
+    def record(self, level):
+        """Return the raw record for ``level`` as a zero-copy memoryview."""
+        if level not in self:
+            raise KeyError(level)
+        start = HEADER.size + (level - 1) * self.record_size
+        return self._view[start:start + self.record_size]
+
+    def level_grid_size(self, level):
+        """Return the side length of ``level``'s grid."""
+        return self.record(level)[TEXT_SIZE + 1]
+
+    def grid_bytes(self, level):
+        """Return the row-major grid bytes for ``level`` without copying."""
+        size = self.level_grid_size(level)
+        start = TEXT_SIZE + 2
+        return self.record(level)[start:start + size * size]
+
+    def placements(self, level):
+        """Return ``(word, start_row, start_col, (dr, dc))`` for each word."""
+        record = self.record(level)
+        word_count = record[TEXT_SIZE]
+        entries_start = TEXT_SIZE + 2 + self.grid_size * self.grid_size
+        letters_start = entries_start + self.max_words * WORD_ENTRY.size
+
+        placements = []
+        for index in range(word_count):
+            letter_offset, length, row, col, direction = WORD_ENTRY.unpack_from(
+                record, entries_start + index * WORD_ENTRY.size
+            )
+            start = letters_start + letter_offset
+            word = bytes(record[start:start + length]).decode('ascii')
+            placements.append((word, row, col, DIRECTIONS[direction]))
+        return placements
+
+    def level_data(self, level):
+        """Return ``level`` in the same shape as ``generate_random_puzzle``."""
+        record = self.record(level)
+        data = {'id': level}
+        offset = 0
+        for name, size in TEXT_FIELDS:
+            data[name] = bytes(record[offset:offset + size]).rstrip(b'\0').decode('utf-8')
+            offset += size
+
+        size = self.level_grid_size(level)
+        grid = bytes(self.grid_bytes(level)).decode('ascii')
+        placements = self.placements(level)
+        words = [word for word, row, col, direction in placements]
+        data.update({
+            'grid_data': [list(grid[start:start + size]) for start in range(0, size * size, size)],
+            'words_data': [{'word': word, 'found': False} for word in words],
+            'grid_size': size,
+            'words_list': words,
+            'placed_words': [
+                {
+                    'word': word,
+                    'positions': [
+                        {'row': row + i * dr, 'col': col + i * dc}
+                        for i in range(len(word))
+                    ],
+                    'direction': (dr, dc)
+                } for word, row, col, (dr, dc) in placements
+            ],
+        })
+        return data
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+
+
+_pack = None
+_pack_loaded = False
+
+
+def get_level_pack():
+    """Return the configured ``LevelPack``, or ``None`` if there isn't one.
+
+    The pack is opened once per process. A missing, malformed or stale pack
+    (built by another ``GENERATOR_VERSION``) is treated as absent so callers
+    fall back to generating levels.
+    """
+    global _pack, _pack_loaded
+    if not _pack_loaded:
+        _pack_loaded = True
+        path = getattr(settings, 'WORDSEARCH_LEVEL_PACK_PATH', None)
+        if path and os.path.exists(path):
+            try:
+                pack = LevelPack(path)
+            except LevelPackError:
+                pack = None
+            if pack is not None and pack.is_current:
+                _pack = pack
+            elif pack is not None:
+                pack.close()
+    return _pack
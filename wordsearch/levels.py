@@ -0,0 +1,315 @@
+"""Deterministic level puzzles and their in-process cache."""
+import json
+import math
+import random
+from functools import lru_cache
+from types import MappingProxyType
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from .engine import GENERATOR_VERSION, generate_grid
+from .letters import LetterModel
+from .levelpack import get_level_pack
+
+
+# Cached levels per worker process; a 20x20 level is a few KB and even the
+# biggest (MAX_LEVEL_GRID_SIZE) is only ~10 KB of row strings
+LEVEL_CACHE_SIZE = 512
+
+# Levels up to LEVEL_GROWTH_START are LEVEL_GRID_SIZE square; after that
+# the grid gains a row and a column every LEVELS_PER_GROWTH levels, up to
+# MAX_LEVEL_GRID_SIZE (below the word lists)
+LEVEL_GRID_SIZE = 20
+LEVEL_GROWTH_START = 15
+LEVELS_PER_GROWTH = 10
+
+# Static export of level puzzles (see export_levels)
+STATIC_LEVELS_DIR = 'levels'
+STATIC_LEVELS_MANIFEST = f'{STATIC_LEVELS_DIR}/manifest.json'
+
+# Common word lists for random selection
+WORD_LISTS = [
+    ['PYTHON', 'DJANGO', 'CODE', 'WEB', 'APP', 'DATA', 'API', 'JSON', 'HTML', 'CSS'],
+    ['OCEAN', 'MOUNTAIN', 'FOREST', 'RIVER', 'BEACH', 'VALLEY', 'DESERT', 'LAKE', 'HILL', 'CAVE'],
+    ['MUSIC', 'GUITAR', 'PIANO', 'DRUMS', 'VIOLIN', 'SONG', 'RHYTHM', 'MELODY', 'HARMONY', 'BEAT'],
+    ['SCIENCE', 'ATOM', 'MOLECULE', 'ENERGY', 'FORCE', 'GRAVITY', 'LIGHT', 'MATTER', 'SPACE', 'TIME'],
+    ['FOOD', 'PIZZA', 'PASTA', 'BURGER', 'SALAD', 'SOUP', 'BREAD', 'CHEESE', 'FRUIT', 'MEAT'],
+    ['SPORT', 'SOCCER', 'TENNIS', 'BASKETBALL', 'FOOTBALL', 'BASEBALL', 'HOCKEY', 'GOLF', 'SWIM', 'RUN'],
+    ['ANIMAL', 'LION', 'TIGER', 'ELEPHANT', 'GIRAFFE', 'ZEBRA', 'MONKEY', 'BEAR', 'WOLF', 'EAGLE'],
+    ['COLOR', 'RED', 'BLUE', 'GREEN', 'YELLOW', 'PURPLE', 'ORANGE', 'BLACK', 'WHITE', 'PINK', 'BROWN'],
+    ['WEATHER', 'SUNNY', 'RAINY', 'CLOUDY', 'WINDY', 'STORMY', 'FOGGY', 'SNOWY', 'HOT', 'COLD', 'WARM'],
+    ['TRAVEL', 'PLANE', 'TRAIN', 'CAR', 'BOAT', 'BIKE', 'WALK', 'HOTEL', 'BEACH', 'CITY', 'COUNTRY']
+]
+
+# Every distinct word, for levels too big for a single word list
+VOCABULARY = sorted({word for words in WORD_LISTS for word in words})
+
+# Bigger grids keep the word density of a 20x20 level by topping up from
+# VOCABULARY, so growth stops at the biggest grid it can still fill (60)
+MAX_LEVEL_GRID_SIZE = math.isqrt(
+    len(VOCABULARY) * LEVEL_GRID_SIZE * LEVEL_GRID_SIZE // max(map(len, WORD_LISTS))
+)
+
+
+@lru_cache(maxsize=1)
+def letter_model():
+    """Return the filler ``LetterModel`` trained on every word list."""
+    return LetterModel(VOCABULARY)
+
+
+def level_grid_size(level):
+    """Return the side length of the grid for ``level``."""
+    if level <= LEVEL_GROWTH_START:
+        return LEVEL_GRID_SIZE
+    growth = (level - LEVEL_GROWTH_START) // LEVELS_PER_GROWTH
+    return min(LEVEL_GRID_SIZE + growth, MAX_LEVEL_GRID_SIZE)
+
+
+def generate_random_puzzle(level):
+    """Generate a random word search puzzle for a given level."""
+    # Use level as seed for consistent puzzles per level, on a private RNG
+    # so the global random module is left alone
+    rng = random.Random(level)
+
+    # Select random word list
+    words = rng.choice(WORD_LISTS).copy()
+
+    # Adjust difficulty based on level
+    if level <= 5:
+        num_words = min(6, len(words))
+    elif level <= 10:
+        num_words = min(8, len(words))
+    elif level <= 15:
+        num_words = min(10, len(words))
+    else:
+        num_words = len(words)
+
+    # Select random words
+    selected_words = rng.sample(words, num_words)
+
+    # Bigger grids keep the word density of a 20x20 level, topping up
+    # from the other word lists
+    grid_size = level_grid_size(level)
+    if grid_size > LEVEL_GRID_SIZE:
+        others = [word for word in VOCABULARY if word not in selected_words]
+        wanted = num_words * grid_size * grid_size // (LEVEL_GRID_SIZE * LEVEL_GRID_SIZE)
+        selected_words += rng.sample(others, min(wanted - num_words, len(others)))
+        num_words = len(selected_words)
+
+    # Filler follows the word lists' letter statistics; past the easy
+    # levels it also hides near misses of the words
+    decoys = 0 if level <= 5 else num_words // 2 if level <= 15 else num_words
+
+    # Generate grid
+    grid_result = generate_grid(
+        selected_words, grid_size, rng=rng,
+        letter_model=letter_model(), decoys=decoys
+    )
+
+    # Create puzzle data structure
+    puzzle_data = {
+        'id': level,
+        'title': f'Level {level}',
+        'description': f'Find {num_words} hidden words',
+        'difficulty': (
+            'easy' if level <= 5 else 'medium' if level <= 15
+            else 'hard' if grid_size == LEVEL_GRID_SIZE else 'extreme'
+        ),
+        'grid_data': grid_result['grid'],
+        'words_data': [
+            {
+                'word': word,
+                'found': False
+            } for word in grid_result['words']
+        ],
+        'grid_size': grid_size,
+        'words_list': grid_result['words'],
+        'placed_words': grid_result['placed_words']
+    }
+
+    return puzzle_data
+
+
+def solution_set(answers):
+    """Return the set of ``(word, start, end)`` answers a level is checked against.
+
+    ``answers`` yields a word with its first and last cells, each a
+    ``(row, col)`` pair or a ``{'row', 'col'}`` dict.
+    """
+    def cell(position):
+        if isinstance(position, dict):
+            return (position['row'], position['col'])
+        return tuple(position)
+    return frozenset((word.upper(), cell(start), cell(end)) for word, start, end in answers)
+
+
+class LevelPuzzle:
+    """Read-only level puzzle shared between requests via the level cache.
+
+    Exposes the same attributes as the ``generate_random_puzzle`` dict, with
+    the grid as a tuple of row strings (templates iterate them cell by cell)
+    and every other container frozen.
+    """
+
+    __slots__ = (
+        'id', 'title', 'description', 'difficulty', 'grid_data',
+        'words_data', 'grid_size', 'words_list', 'solution',
+    )
+
+    def __init__(self, data):
+        values = {
+            'id': data['id'],
+            'title': data['title'],
+            'description': data['description'],
+            'difficulty': data['difficulty'],
+            'grid_data': tuple(''.join(row) for row in data['grid_data']),
+            'words_data': tuple(MappingProxyType(dict(item)) for item in data['words_data']),
+            'grid_size': data['grid_size'],
+            'words_list': tuple(data['words_list']),
+            'solution': solution_set(
+                (item['word'], item['positions'][0], item['positions'][-1])
+                for item in data['placed_words']
+            ),
+        }
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __delattr__(self, key):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __repr__(self):
+        return f'<LevelPuzzle {self.id}>'
+
+
+@lru_cache(maxsize=LEVEL_CACHE_SIZE)
+def _cached_level(level, generator_version):
+    return LevelPuzzle(generate_random_puzzle(level))
+
+
+@lru_cache(maxsize=LEVEL_CACHE_SIZE)
+def _packed_level(pack, level):
+    return LevelPuzzle(pack.level_data(level))
+
+
+def get_level_puzzle(level):
+    """Return the ``LevelPuzzle`` for ``level``.
+
+    Levels in the shared level pack are decoded from it, anything else is
+    generated; either way the result is kept in an LRU cache, so a popular
+    level is built once per worker. The generated levels' key includes
+    ``GENERATOR_VERSION`` so a generator change can never serve a level
+    built by the old code (a stale pack is never opened).
+    """
+    pack = get_level_pack()
+    if pack is not None and level in pack:
+        return _packed_level(pack, level)
+    return _cached_level(level, GENERATOR_VERSION)
+
+
+@lru_cache(maxsize=LEVEL_CACHE_SIZE)
+def _pack_solution(pack, level):
+    return solution_set(
+        (word, (row, col), (row + (len(word) - 1) * dr, col + (len(word) - 1) * dc))
+        for word, row, col, (dr, dc) in pack.placements(level)
+    )
+
+
+def level_solution(level):
+    """Return the ``solution_set`` for ``level``.
+
+    Pack levels are read from the pack's placement table and cached on
+    their own, without decoding the grid; generated levels share the level
+    cache. Either way checking a completion never regenerates a level that
+    is already cached.
+    """
+    pack = get_level_pack()
+    if pack is not None and level in pack:
+        return _pack_solution(pack, level)
+    return _cached_level(level, GENERATOR_VERSION).solution
+
+
+def parse_found_words(found):
+    """Parse a submitted list of found words into ``(word, start, end)`` tuples.
+
+    ``found`` is a list of ``{'word', 'start': [row, col], 'end': [row, col]}``
+    as sent by the level page. Raises ``ValueError`` if it is malformed.
+    """
+    if not isinstance(found, list):
+        raise ValueError('found words must be a list')
+    try:
+        return [
+            (str(item['word']).upper(),
+             (int(item['start'][0]), int(item['start'][1])),
+             (int(item['end'][0]), int(item['end'][1])))
+            for item in found
+        ]
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f'malformed found word: {e}')
+
+
+def verify_solution(level, found):
+    """Return whether ``found`` answers every word of ``level``.
+
+    ``found`` holds ``(word, start, end)`` tuples from ``parse_found_words``;
+    a word selected end to start counts too. Costs one set lookup per word.
+    """
+    solution = level_solution(level)
+    answered = set()
+    for word, start, end in found:
+        if (word, start, end) in solution:
+            answered.add((word, start, end))
+        elif (word, end, start) in solution:
+            answered.add((word, end, start))
+        else:
+            return False
+    return len(answered) == len(solution)
+
+
+def level_static_data(puzzle_data):
+    """Return the public JSON body for a level's static file.
+
+    Only what the page needs to draw the level is included; placements stay
+    on the server.
+    """
+    return {
+        'id': puzzle_data['id'],
+        'title': puzzle_data['title'],
+        'description': puzzle_data['description'],
+        'difficulty': puzzle_data['difficulty'],
+        'grid_size': puzzle_data['grid_size'],
+        'grid': [''.join(row) for row in puzzle_data['grid_data']],
+        'words': list(puzzle_data['words_list']),
+    }
+
+
+@lru_cache(maxsize=1)
+def _static_level_names():
+    path = finders.find(STATIC_LEVELS_MANIFEST)
+    if not path:
+        return {}
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    # Files from another generator version would not match what the server
+    # checks completions against, so ignore them
+    if manifest.get('generator_version') != GENERATOR_VERSION:
+        return {}
+    return manifest.get('levels', {})
+
+
+def get_static_level_url(level):
+    """Return the static URL of an exported level, or ``None``."""
+    name = _static_level_names().get(str(level))
+    if not name:
+        return None
+    try:
+        return static(name)
+    except ValueError:
+        # Exported after the last collectstatic, so not in its manifest yet
+        return None
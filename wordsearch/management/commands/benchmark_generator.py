@@ -0,0 +1,165 @@
+from django.core.management.base import BaseCommand, CommandError
+from wordsearch.engine import generate_grid, generate_grid_backtracking, generator_stats
+from wordsearch.levels import generate_random_puzzle, level_grid_size
+from wordsearch.views import generate_word_search_grid
+import gc
+import json
+import random
+import string
+import time
+import tracemalloc
+
+import numpy as np
+
+GENERATORS = {
+    'legacy': lambda words, size, rng: generate_word_search_grid(words, size),
+    'engine': lambda words, size, rng: generate_grid(words, size, rng=rng),
+    'backtracking': lambda words, size, rng: generate_grid_backtracking(words, size, rng=rng),
+}
+# Latency metrics compared against a baseline, relative to it
+LATENCY_METRICS = ('mean_ms', 'p50_ms', 'p99_ms')
+# Latency changes smaller than this are noise, whatever the tolerance
+LATENCY_SLACK_MS = 0.05
+# Extra unplaced-word rate allowed before a comparison fails
+UNPLACED_SLACK = 0.01
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the grid generators and level puzzles, optionally against a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--generators', nargs='+', choices=sorted(GENERATORS),
+                            default=['legacy', 'engine'])
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 50],
+                            help='Grid sizes')
+        parser.add_argument('--word-counts', type=int, nargs='+', default=[5, 10, 20],
+                            help='Words per grid')
+        parser.add_argument('--lengths', nargs='+', default=['3-5', '6-8', '9-12'],
+                            help='Word length ranges as MIN-MAX')
+        parser.add_argument('--levels', type=int, nargs='+', default=[1, 10, 20, 100, 300],
+                            help='Levels to time generate_random_puzzle on')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Timed runs per case')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the results as a JSON baseline')
+        parser.add_argument('--compare', help='Fail if results regress against this baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative slowdown when comparing (default 25%%)')
+
+    def handle(self, *args, **options):
+        try:
+            lengths = [tuple(int(part) for part in spec.split('-')) for spec in options['lengths']]
+        except ValueError:
+            raise CommandError('--lengths must look like 3-5')
+
+        results = {}
+        for name in options['generators']:
+            generate = GENERATORS[name]
+            for size in options['sizes']:
+                for count in options['word_counts']:
+                    for low, high in lengths:
+                        if low > size:
+                            continue
+                        high = min(high, size)
+                        key = f'{name} {size}x{size} {count} words {low}-{high}'
+                        # Seeded per case, so a subset of cases sees the same words
+                        rng = random.Random(f'{options["seed"]} {key}')
+                        words = [
+                            ''.join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(low, high)))
+                            for _ in range(count)
+                        ]
+                        results[key] = self.measure(
+                            lambda: generate(words, size, rng), options['repeat']
+                        )
+                        self.report(key, results[key])
+
+        for level in options['levels']:
+            random.seed(f'{options["seed"]} level {level}')
+            key = f'level {level} ({level_grid_size(level)}x{level_grid_size(level)})'
+            results[key] = self.measure(lambda: generate_random_puzzle(level), options['repeat'])
+            self.report(key, results[key])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump({'cases': results}, output_file, indent=2, sort_keys=True)
+            self.stdout.write(f'Wrote {len(results)} cases to {options["output"]}')
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def measure(self, func, repeat):
+        """Time repeat runs of func and collect its generator counters"""
+        # Warm caches (letter model, vocabulary, NumPy tables) outside the timings
+        func()
+        generator_stats.reset()
+        timings = []
+        # Like timeit, keep collector pauses out of the percentiles
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        stats = generator_stats.as_dict()
+
+        # One extra run under tracemalloc, which would skew the timings
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        timings = np.array(timings) * 1000
+        words = max(stats['words'], 1)
+        return {
+            'mean_ms': float(timings.mean()),
+            'p50_ms': float(np.percentile(timings, 50)),
+            'p99_ms': float(np.percentile(timings, 99)),
+            'attempts_per_word': stats['attempts'] / words,
+            'unplaced_rate': stats['failures'] / words,
+            'fill_ms': stats['fill_seconds'] * 1000 / max(stats['grids'], 1),
+            'peak_kb': peak / 1024,
+        }
+
+    def report(self, key, result):
+        self.stdout.write(
+            f'{key}: mean {result["mean_ms"]:.3f} ms, p50 {result["p50_ms"]:.3f} ms, '
+            f'p99 {result["p99_ms"]:.3f} ms, {result["attempts_per_word"]:.1f} attempts/word, '
+            f'{result["unplaced_rate"]:.1%} unplaced, fill {result["fill_ms"]:.3f} ms, '
+            f'peak {result["peak_kb"]:.0f} KB'
+        )
+
+    def compare(self, results, path, tolerance):
+        """Raise CommandError listing every case that regressed"""
+        try:
+            with open(path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)['cases']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot read baseline {path}: {e}')
+
+        regressions = []
+        for key, result in results.items():
+            before = baseline.get(key)
+            if before is None:
+                continue
+            for metric in LATENCY_METRICS:
+                limit = max(before[metric] * (1 + tolerance), before[metric] + LATENCY_SLACK_MS)
+                if result[metric] > limit:
+                    regressions.append(
+                        f'{key}: {metric} {before[metric]:.3f} -> {result[metric]:.3f}'
+                    )
+            if result['attempts_per_word'] > before['attempts_per_word'] * (1 + tolerance):
+                regressions.append(
+                    f'{key}: attempts/word {before["attempts_per_word"]:.1f} '
+                    f'-> {result["attempts_per_word"]:.1f}'
+                )
+            if result['unplaced_rate'] > before['unplaced_rate'] + UNPLACED_SLACK:
+                regressions.append(
+                    f'{key}: unplaced {before["unplaced_rate"]:.1%} -> {result["unplaced_rate"]:.1%}'
+                )
+
+        if regressions:
+            raise CommandError('Regressions against {}:\n{}'.format(path, '\n'.join(regressions)))
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from wordsearch.engine import generate_grid
+from wordsearch.levels import WORD_LISTS
+from wordsearch.solver import WordSolver
+import random
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the server-side solver on generated grids'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[20, 50, 200],
+                            help='Grid sizes to benchmark')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per size (the best is reported)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = sorted({word for words in WORD_LISTS for word in words})
+
+        for size in options['sizes']:
+            # Scale the word count with the grid area, like a real puzzle
+            count = min(len(vocabulary), max(6, size * size // 40))
+            words = rng.sample(vocabulary, count)
+            grid = generate_grid(words, size, rng=rng)['grid']
+
+            build = self.best_of(options['repeat'], lambda: WordSolver(words))
+            solver = WordSolver(words)
+            scan = self.best_of(options['repeat'], lambda: solver.find_all(grid))
+            found = solver.find_all(grid)
+
+            self.stdout.write(
+                f'{size}x{size}: {len(words)} words, build {build * 1000:.2f} ms, '
+                f'scan {scan * 1000:.2f} ms ({size * size / scan / 1e6:.2f} Mcells/s), '
+                f'{len(found)} occurrences'
+            )
+
+    def best_of(self, repeat, func):
+        """Return the fastest of repeat timed calls, in seconds"""
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
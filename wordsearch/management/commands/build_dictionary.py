@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from wordsearch.dictionary import Dictionary, DictionaryError, write_dictionary
+import os
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped word dictionary from word files (one word per line)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('word_files', nargs='+',
+                            help='Word files; each file name (without extension) is its category')
+        parser.add_argument('--output', default=settings.WORDSEARCH_DICTIONARY_PATH,
+                            help='Index path (default: WORDSEARCH_DICTIONARY_PATH)')
+        parser.add_argument('--min-length', type=int, default=3,
+                            help='Skip shorter words')
+        parser.add_argument('--max-length', type=int, default=None,
+                            help='Skip longer words')
+
+    def handle(self, *args, **options):
+        categories = {}
+        for path in options['word_files']:
+            category = os.path.splitext(os.path.basename(path))[0]
+            try:
+                with open(path, encoding='utf-8') as word_file:
+                    words = [line.strip() for line in word_file if line.strip()]
+            except (OSError, UnicodeDecodeError) as e:
+                raise CommandError(f'Cannot read {path}: {e}')
+            categories.setdefault(category, []).extend(
+                word for word in words
+                if len(word) >= options['min_length']
+                and (options['max_length'] is None or len(word) <= options['max_length'])
+            )
+
+        try:
+            count, skipped = write_dictionary(options['output'], categories)
+            dictionary = Dictionary(options['output'])
+        except DictionaryError as e:
+            raise CommandError(str(e))
+
+        summary = ', '.join(
+            f'{category} {dictionary.count(category)}' for category in dictionary.categories
+        )
+        dictionary.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {count} words to {options["output"]} ({summary}; {skipped} skipped)'
+        ))
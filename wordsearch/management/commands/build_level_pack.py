@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from concurrent.futures import ProcessPoolExecutor
+from wordsearch.levelpack import LevelPack, LevelPackError, write_level_pack
+from wordsearch.levels import (
+    LEVEL_GRID_SIZE,
+    VOCABULARY,
+    WORD_LISTS,
+    generate_random_puzzle,
+    level_grid_size,
+)
+
+
+class Command(BaseCommand):
+    help = 'Build (or verify) the memory-mapped level pack served to all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--levels', type=int, default=1000,
+                            help='Number of levels to pack, starting at level 1')
+        parser.add_argument('--output', default=settings.WORDSEARCH_LEVEL_PACK_PATH,
+                            help='Pack file path (default: WORDSEARCH_LEVEL_PACK_PATH)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Generator processes (default: one per CPU)')
+        parser.add_argument('--verify-only', action='store_true',
+                            help='Only verify an existing pack')
+
+    def handle(self, *args, **options):
+        path = options['output']
+        if not options['verify_only']:
+            if options['levels'] < 1:
+                raise CommandError('--levels must be at least 1')
+
+            # Records are sized for the last (largest) level; levels on the
+            # base grid never hold more than one word list
+            grid_size = level_grid_size(options['levels'])
+            word_lists = [VOCABULARY] if grid_size > LEVEL_GRID_SIZE else WORD_LISTS
+            max_words = max(len(words) for words in word_lists)
+            letters_size = max(sum(len(word) for word in words) for words in word_lists)
+            levels = range(1, options['levels'] + 1)
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                puzzles = executor.map(generate_random_puzzle, levels, chunksize=64)
+                try:
+                    count = write_level_pack(path, puzzles, grid_size, max_words, letters_size)
+                except LevelPackError as e:
+                    raise CommandError(str(e))
+            self.stdout.write(f'Wrote {count} levels to {path}')
+
+        self.verify(path)
+
+    def verify(self, path):
+        """Check every packed level matches the generator and is solvable"""
+        try:
+            pack = LevelPack(path)
+        except LevelPackError as e:
+            raise CommandError(str(e))
+
+        if not pack.is_current:
+            raise CommandError(
+                f'Pack was built by generator version {pack.generator_version}; rebuild it'
+            )
+
+        fields = [
+            'title', 'description', 'difficulty', 'grid_data', 'words_data',
+            'grid_size', 'words_list', 'placed_words',
+        ]
+        for level in range(1, len(pack) + 1):
+            packed = pack.level_data(level)
+            expected = generate_random_puzzle(level)
+            expected['placed_words'] = [
+                {**item, 'direction': tuple(item['direction'])} for item in expected['placed_words']
+            ]
+            for field in fields:
+                if packed[field] != expected[field]:
+                    raise CommandError(f'Level {level}: {field} does not match the generator')
+
+            grid = packed['grid_data']
+            for item in packed['placed_words']:
+                spelled = ''.join(grid[p['row']][p['col']] for p in item['positions'])
+                if spelled != item['word']:
+                    raise CommandError(f'Level {level}: {item["word"]} is not at its placement')
+
+        pack.close()
+        self.stdout.write(self.style.SUCCESS(f'Verified {len(pack)} levels in {path}'))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from wordsearch.models import WordSearchPuzzle
+from wordsearch.thumbnails import thumbnail_for
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+
+class Command(BaseCommand):
+    help = 'Draw list thumbnails for puzzles that have none, on a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Redraw every puzzle, e.g. after a THUMBNAIL_VERSION change')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Drawing processes (default: one per CPU); 1 draws in this process')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Puzzles drawn and updated per round')
+
+    def handle(self, *args, **options):
+        puzzles = WordSearchPuzzle.objects.all()
+        if not options['all']:
+            puzzles = puzzles.filter(thumbnail='')
+        # Plain tuples: the pool gets the packed grid or the recipe, nothing else
+        rows = puzzles.order_by('id').values_list('id', 'grid_data', 'recipe').iterator(
+            chunk_size=options['batch_size']
+        )
+
+        workers = options['workers'] or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        count = 0
+        try:
+            while batch := list(islice(rows, options['batch_size'])):
+                count += self.draw(batch, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'Drew thumbnails for {count} puzzles'))
+
+    def draw(self, batch, executor):
+        """Draw one batch of thumbnails and store their digests"""
+        ids, grids, recipes = zip(*batch)
+        media_root = [str(settings.MEDIA_ROOT)] * len(batch)
+        if executor is None:
+            digests = map(thumbnail_for, grids, recipes, media_root)
+        else:
+            digests = executor.map(thumbnail_for, grids, recipes, media_root)
+        WordSearchPuzzle.objects.bulk_update(
+            [WordSearchPuzzle(id=pk, thumbnail=digest) for pk, digest in zip(ids, digests)],
+            ['thumbnail']
+        )
+        return len(batch)
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from concurrent.futures import ProcessPoolExecutor
+from wordsearch.engine import GENERATOR_VERSION
+from wordsearch.levels import (
+    STATIC_LEVELS_DIR,
+    generate_random_puzzle,
+    level_static_data,
+)
+import hashlib
+import json
+import os
+
+
+def render_level(level):
+    """Return (level, JSON bytes) for one level; runs in a worker process"""
+    body = json.dumps(level_static_data(generate_random_puzzle(level)), separators=(',', ':'))
+    return level, body.encode('utf-8')
+
+
+class Command(BaseCommand):
+    help = 'Export level puzzles as content-hashed static JSON files plus a manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', type=int, default=1,
+                            help='First level to export')
+        parser.add_argument('--to', dest='end', type=int, required=True,
+                            help='Last level to export (inclusive)')
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'static', STATIC_LEVELS_DIR),
+                            help='Directory inside a STATICFILES_DIRS entry')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Generator processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        start, end, output = options['start'], options['end'], options['output']
+        if start < 1 or end < start:
+            raise CommandError('Levels must satisfy 1 <= --from <= --to')
+
+        os.makedirs(output, exist_ok=True)
+        manifest_path = os.path.join(output, 'manifest.json')
+        levels = self.load_manifest(manifest_path)
+
+        written = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for level, body in executor.map(render_level, range(start, end + 1), chunksize=64):
+                filename = f'{level}.{hashlib.sha256(body).hexdigest()[:12]}.json'
+                name = f'{STATIC_LEVELS_DIR}/{filename}'
+                if levels.get(str(level)) != name:
+                    self.remove_stale(output, levels.get(str(level)))
+                    with open(os.path.join(output, filename), 'wb') as level_file:
+                        level_file.write(body)
+                    levels[str(level)] = name
+                    written += 1
+
+        manifest = {'generator_version': GENERATOR_VERSION, 'levels': levels}
+        temp_path = f'{manifest_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, separators=(',', ':'), sort_keys=True)
+        os.replace(temp_path, manifest_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported levels {start}-{end} ({written} files changed) to {output}; '
+            f'run collectstatic to publish them'
+        ))
+
+    def load_manifest(self, manifest_path):
+        """Return existing level entries, deleting files from another generator version"""
+        try:
+            with open(manifest_path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            raise CommandError(f'Existing manifest is not valid JSON: {e}')
+
+        if manifest.get('generator_version') == GENERATOR_VERSION:
+            return manifest.get('levels', {})
+        for name in manifest.get('levels', {}).values():
+            self.remove_stale(os.path.dirname(manifest_path), name)
+        return {}
+
+    def remove_stale(self, output, name):
+        """Delete a level file superseded by a new export"""
+        if name:
+            path = os.path.join(output, os.path.basename(name))
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,137 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from wordsearch.batch import DEFAULT_GRID_SIZE, generate_puzzles_batch
+from wordsearch.dictionary import get_dictionary
+from wordsearch.metrics import difficulty_target
+from wordsearch.models import MAX_GRID_SIZE, WordSearchPuzzle
+import json
+
+
+# Limits the model's validators and columns would otherwise enforce too late
+MIN_GRID_SIZE = 5
+DIFFICULTIES = {value for value, label in WordSearchPuzzle.DIFFICULTY_CHOICES}
+TITLE_LENGTH = WordSearchPuzzle._meta.get_field('title').max_length
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate word search puzzles from a JSONL spec file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('spec_file', help='JSONL file with one puzzle spec per line')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Generator processes (default: one per CPU)')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Puzzles per bulk insert')
+        parser.add_argument('--username', default='admin',
+                            help='User the puzzles are created by')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist')
+
+        try:
+            spec_file = open(options['spec_file'], encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f'Cannot read spec file: {e}')
+
+        created = 0
+        unplaced = 0
+        chunk = []
+        with spec_file:
+            # Check the whole file first, so a bad line never leaves a run half inserted
+            errors = [f'Line {line_number}: {error}'
+                      for line_number, spec, error in self.read_lines(spec_file) if error]
+            if errors:
+                raise CommandError('Invalid specs, nothing was generated:\n' + '\n'.join(errors))
+            spec_file.seek(0)
+
+            specs = (spec for line_number, spec, error in self.read_lines(spec_file))
+            for result in generate_puzzles_batch(specs, workers=options['workers']):
+                unplaced += len(result['unplaced'])
+                chunk.append(self.build_puzzle(result, user))
+                if len(chunk) >= options['chunk_size']:
+                    created += self.flush(chunk)
+
+        created += self.flush(chunk)
+        self.stdout.write(
+            self.style.SUCCESS(f'Created {created} puzzles ({unplaced} words could not be placed); '
+                               'run build_thumbnails to draw their list previews')
+        )
+
+    def read_lines(self, spec_file):
+        """Yield ``(line_number, spec, error)`` lazily so huge files are never held in memory"""
+        for line_number, line in enumerate(spec_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f'invalid JSON ({e})'
+                continue
+            yield line_number, spec, self.spec_error(spec)
+
+    def spec_error(self, spec):
+        """Return why ``spec`` cannot be generated and inserted, or ``None``"""
+        if not isinstance(spec, dict):
+            return 'spec must be a JSON object'
+
+        words = spec.get('words')
+        if words:
+            if not isinstance(words, list) or not all(isinstance(word, str) and word for word in words):
+                return '"words" must be a list of words'
+            bad = [word for word in words if not (word.isascii() and word.isalpha())]
+            if bad:
+                return f'words must be ASCII letters only: {", ".join(bad)}'
+        elif not spec.get('category'):
+            return 'spec has no "words" or "category"'
+        else:
+            dictionary = get_dictionary()
+            if dictionary is None:
+                return 'no dictionary installed for "category"'
+            if spec['category'] not in dictionary.categories:
+                return f'unknown category "{spec["category"]}"'
+
+        grid_size = spec.get('grid_size', DEFAULT_GRID_SIZE)
+        if (not isinstance(grid_size, int) or isinstance(grid_size, bool)
+                or not MIN_GRID_SIZE <= grid_size <= MAX_GRID_SIZE):
+            return f'"grid_size" must be {MIN_GRID_SIZE} to {MAX_GRID_SIZE}'
+        if 'difficulty' in spec and spec['difficulty'] not in DIFFICULTIES:
+            return f'unknown difficulty "{spec["difficulty"]}"'
+        if spec.get('target_difficulty') is not None:
+            try:
+                difficulty_target(spec['target_difficulty'])
+            except ValueError as e:
+                return str(e)
+            candidates = spec.get('candidates', 1)
+            if not isinstance(candidates, int) or isinstance(candidates, bool) or candidates < 1:
+                return '"candidates" must be a positive whole number'
+        title = spec.get('title', '')
+        if not isinstance(title, str) or len(title) > TITLE_LENGTH:
+            return f'"title" must be text of at most {TITLE_LENGTH} characters'
+        return None
+
+    def build_puzzle(self, result, user):
+        """Build an unsaved puzzle from a generated result; build_thumbnails draws its preview"""
+        return WordSearchPuzzle(
+            title=result.get('title') or f'Puzzle ({len(result["words_data"])} words)',
+            description=result.get('description', ''),
+            difficulty=result.get('difficulty', 'medium'),
+            width=result['grid_size'],
+            height=result['grid_size'],
+            grid_data=result['grid_data'],
+            words_data=result['words_data'],
+            is_public=result.get('is_public', True),
+            created_by=user,
+        )
+
+    def flush(self, chunk):
+        """Insert and clear the pending chunk"""
+        count = len(chunk)
+        if count:
+            WordSearchPuzzle.objects.bulk_create(chunk)
+            self.stdout.write(f'Inserted {count} puzzles')
+            chunk.clear()
+        return count
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from wordsearch.models import WordSearchPuzzle
+from wordsearch.recipes import RecipeError, rebuild_puzzle
+
+
+class Command(BaseCommand):
+    help = ('Store the full grid of recipe puzzles and drop their recipes; '
+            'run before deploying a GENERATOR_VERSION change')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Puzzles updated per query')
+
+    def handle(self, *args, **options):
+        batch = []
+        count = 0
+        puzzles = WordSearchPuzzle.objects.filter(recipe__isnull=False).only('id', 'recipe')
+        for puzzle in puzzles.iterator(chunk_size=options['batch_size']):
+            try:
+                data = rebuild_puzzle(puzzle.recipe)
+            except RecipeError as e:
+                # Left as it is; only the generator that made it can rebuild it
+                self.stderr.write(f'Puzzle {puzzle.id}: {e}')
+                continue
+            batch.append(WordSearchPuzzle(
+                id=puzzle.id, recipe=None,
+                grid_data=data['grid_data'], words_data=data['words_data']
+            ))
+            if len(batch) >= options['batch_size']:
+                count += self.flush(batch)
+        count += self.flush(batch)
+        self.stdout.write(self.style.SUCCESS(f'Materialized {count} recipe puzzles'))
+
+    def flush(self, batch):
+        """Write and clear the pending batch"""
+        WordSearchPuzzle.objects.bulk_update(batch, ['recipe', 'grid_data', 'words_data'])
+        count = len(batch)
+        batch.clear()
+        return count
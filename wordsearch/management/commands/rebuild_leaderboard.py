@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from wordsearch.leaderboard import completed_totals, drop_top_players
+from wordsearch.models import LeaderboardEntry, WordSearchAttempt
+
+
+class Command(BaseCommand):
+    help = 'Recompute every leaderboard entry from the completed attempts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Entries inserted per query')
+
+    def handle(self, *args, **options):
+        totals = completed_totals(WordSearchAttempt.objects.all())
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(
+                [
+                    LeaderboardEntry(user_id=user_id, highest_level=level, completed_count=count)
+                    for user_id, (level, count) in totals.items()
+                ],
+                batch_size=options['batch_size']
+            )
+        drop_top_players()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the leaderboard for {len(totals)} players'))
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from wordsearch.models import WordSearchPuzzle
+from wordsearch.render import FORMATS, PDF_RESOLUTION, print_data, render_to_cache
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+import os
+
+
+class Command(BaseCommand):
+    help = 'Render printable puzzle pages into the render cache, optionally as one PDF pack'
+
+    def add_arguments(self, parser):
+        parser.add_argument('puzzle_ids', nargs='*', type=int, help='Puzzles to render')
+        parser.add_argument('--all', action='store_true', help='Render every public puzzle')
+        parser.add_argument('--answers', action='store_true', help='Draw the answer key')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='pdf', help='Page format')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Render processes (default: one per CPU); 1 renders in this process')
+        parser.add_argument('--pack', metavar='FILE.pdf',
+                            help='Also write all pages, in id order, to one multi-page PDF')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            puzzles = WordSearchPuzzle.objects.filter(is_public=True)
+        elif options['puzzle_ids']:
+            puzzles = WordSearchPuzzle.objects.filter(pk__in=options['puzzle_ids'])
+        else:
+            raise CommandError('Give puzzle ids or --all')
+
+        # Packs are assembled from PNG pages; a PDF per page would be re-rasterized
+        fmt = 'png' if options['pack'] else options['format']
+        render = partial(
+            render_to_cache, fmt=fmt, answers=options['answers'],
+            cache_dir=settings.WORDSEARCH_RENDER_CACHE_DIR
+        )
+        # Puzzles are read (and recipes rebuilt) here; the pool only draws
+        pages = (print_data(puzzle) for puzzle in puzzles.order_by('id').iterator())
+
+        workers = options['workers'] or os.cpu_count() or 1
+        if workers == 1:
+            paths = [path for path, _ in map(render, pages)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                paths = [path for path, _ in executor.map(render, pages, chunksize=4)]
+
+        if not paths:
+            raise CommandError('No puzzles to render')
+        if options['pack']:
+            self.write_pack(options['pack'], paths)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(paths)} pages to {options["pack"]}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Rendered {len(paths)} pages into {settings.WORDSEARCH_RENDER_CACHE_DIR}'
+            ))
+
+    def write_pack(self, pack_path, paths):
+        """Write the cached PNG pages to one PDF, opening them one at a time"""
+        first, *rest = paths
+        with Image.open(first) as page:
+            page.save(
+                pack_path, 'PDF', resolution=PDF_RESOLUTION, save_all=True,
+                append_images=(Image.open(path) for path in rest)
+            )
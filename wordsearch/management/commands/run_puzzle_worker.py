@@ -0,0 +1,94 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from wordsearch.batch import generate_from_job
+from wordsearch.jobs import (
+    claim_jobs, fail_job, finish_job, prune_jobs, release_jobs, requeue_stale_jobs
+)
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+import time
+
+
+# Seconds between deletions of old finished jobs
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Generate queued puzzles (see wordsearch.jobs) on a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Generator processes (default: one per CPU); 1 runs jobs in this process')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Requeue jobs left running this many seconds by a dead worker')
+        parser.add_argument('--keep-finished', type=int, default=7 * 24 * 3600,
+                            help='Delete job records this many seconds after they finish (0 keeps them)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for more jobs')
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or os.cpu_count() or 1
+        if workers == 1:
+            self.run(options, workers, executor=None)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self.run(options, workers, executor)
+
+    def run(self, options, workers, executor):
+        """Run queued jobs with up to ``workers`` in flight"""
+        # Finished jobs by whether they succeeded; None for results dropped
+        # because the job was requeued and claimed again meanwhile
+        results = {True: 0, False: 0, None: 0}
+        pending = {}
+        try:
+            self.loop(options, workers, executor, results, pending)
+        finally:
+            # Interrupted jobs go back to the queue for the next worker
+            release_jobs(pending.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {results[True]} puzzles ({results[False]} jobs failed, '
+            f'{results[None]} stale results dropped)'
+        ))
+
+    def loop(self, options, workers, executor, results, pending):
+        pruned_at = None
+        while True:
+            close_old_connections()
+            requeued = requeue_stale_jobs(options['stale_after'])
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale jobs')
+            if options['keep_finished'] and (pruned_at is None or time.monotonic() - pruned_at > PRUNE_INTERVAL):
+                pruned_at = time.monotonic()
+                pruned = prune_jobs(options['keep_finished'])
+                if pruned:
+                    self.stdout.write(f'Deleted {pruned} finished jobs')
+
+            claimed = claim_jobs(workers - len(pending))
+            for job in claimed:
+                if executor is None:
+                    results[self.finish(job, lambda: generate_from_job(job.spec))] += 1
+                else:
+                    pending[executor.submit(generate_from_job, job.spec)] = job
+
+            if pending:
+                finished, _ = wait(pending, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results[self.finish(pending.pop(future), future.result)] += 1
+            elif not claimed:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+    def finish(self, job, get_result):
+        """Save the job's puzzle, or record why it failed; return True, False, or None for a stale result"""
+        try:
+            if finish_job(job, get_result()):
+                return True
+        except Exception as e:
+            fail_job(job, e)
+            self.stderr.write(f'Job {job.pk} failed: {e}')
+            return False
+        self.stdout.write(f'Job {job.pk} was requeued and claimed again; dropped this result')
+        return None
@@ -0,0 +1,149 @@
+"""Objective difficulty features for generated puzzles.
+
+Every feature is computed from the placements and the grid with a handful of
+NumPy operations, so a 20x20 grid scores in about a hundred microseconds
+and the generator can afford to build several candidates and keep the one
+whose score is closest to a target.
+"""
+import random
+
+import numpy as np
+
+from .engine import FIRST_LETTER, generate_grid, line_layout
+
+
+FEATURES = (
+    'reversed_share', 'diagonal_share', 'overlap_density',
+    'near_miss_rate', 'sparsity', 'shortness',
+)
+
+# Weight of each feature in the overall score; they add up to 1
+DIFFICULTY_WEIGHTS = {
+    'reversed_share': 0.2,
+    'diagonal_share': 0.2,
+    'overlap_density': 0.1,
+    'near_miss_rate': 0.2,
+    'sparsity': 0.15,
+    'shortness': 0.15,
+}
+
+# Near misses relative to uniformly random filler that count as the hardest
+# possible grid; uniform filler scores 1 / NEAR_MISS_SCALE
+NEAR_MISS_SCALE = 2.0
+
+# Score each difficulty label aims for
+DIFFICULTY_TARGETS = {'easy': 0.45, 'medium': 0.5, 'hard': 0.55, 'extreme': 0.6}
+DEFAULT_CANDIDATES = 8
+
+
+def as_flat_grid(grid):
+    """Return ``grid`` (rows of letters or a flat array) as flat ``uint8``."""
+    if isinstance(grid, np.ndarray):
+        return grid.reshape(-1)
+    return np.frombuffer(''.join(''.join(row) for row in grid).encode('ascii'), dtype=np.uint8)
+
+
+def difficulty_features(grid, placed_words, grid_size):
+    """Return the difficulty features of a grid, each between 0 and 1.
+
+    ``placed_words`` is the generator's list of placements. Features:
+
+    * ``reversed_share``: placements read right-to-left or upwards
+    * ``diagonal_share``: diagonal placements
+    * ``overlap_density``: share of word cells used by more than one word
+    * ``near_miss_rate``: copies of any word's first two letters (in any
+      direction) that are not a placement, against what uniformly random
+      filler would give, relative to ``NEAR_MISS_SCALE``
+    * ``sparsity``: share of the grid that is filler
+    * ``shortness``: how short the average word is against the grid side
+    """
+    count = len(placed_words)
+    if not count:
+        return dict.fromkeys(FEATURES, 0.0)
+
+    directions = np.array([item['direction'] for item in placed_words], dtype=np.int8)
+    lengths = np.fromiter((len(item['word']) for item in placed_words), dtype=np.intp, count=count)
+    cells = np.fromiter(
+        (p['row'] * grid_size + p['col'] for item in placed_words for p in item['positions']),
+        dtype=np.intp, count=int(lengths.sum())
+    )
+
+    rows, cols = directions[:, 0], directions[:, 1]
+    reversed_share = np.count_nonzero((rows < 0) | ((rows == 0) & (cols < 0))) / count
+    diagonal_share = np.count_nonzero((rows != 0) & (cols != 0)) / count
+
+    uses = np.bincount(cells, minlength=grid_size * grid_size)
+    covered = np.count_nonzero(uses)
+    overlap_density = np.count_nonzero(uses > 1) / covered
+
+    # Bigram codes of the line text; a table lookup flags every bigram that
+    # opens a word in either reading direction
+    text = np.append(as_flat_grid(grid) - (FIRST_LETTER - 1), np.uint8(0)).take(line_layout(grid_size))
+    bigrams = (text[:-1].astype(np.intp) << 5) | text[1:]
+    openers = np.zeros(1 << 10, dtype=bool)
+    for item in placed_words:
+        first, second = (ord(letter) - FIRST_LETTER + 1 for letter in item['word'][:2])
+        openers[(first << 5) | second] = openers[(second << 5) | first] = True
+    # Each placement accounts for one hit of its own opening letters
+    near_misses = max(int(np.count_nonzero(openers.take(bigrams))) - count, 0)
+    # Letter pairs within a line (separators are 0), times the chance a
+    # uniformly random pair is an opener
+    pairs = np.count_nonzero((text[1:] != 0) & (text[:-1] != 0))
+    uniform = pairs * np.count_nonzero(openers) / 26 ** 2
+    near_miss_rate = min(near_misses / uniform / NEAR_MISS_SCALE, 1.0) if uniform else 0.0
+
+    sparsity = 1.0 - covered / (grid_size * grid_size)
+    shortness = 1.0 - min(lengths.mean() / grid_size, 1.0)
+
+    return {
+        'reversed_share': float(reversed_share),
+        'diagonal_share': float(diagonal_share),
+        'overlap_density': float(overlap_density),
+        'near_miss_rate': float(near_miss_rate),
+        'sparsity': float(sparsity),
+        'shortness': float(shortness),
+    }
+
+
+def difficulty_score(features):
+    """Return the weighted difficulty score (0 easiest, 1 hardest)."""
+    return sum(DIFFICULTY_WEIGHTS[name] * features[name] for name in FEATURES)
+
+
+def difficulty_target(target):
+    """Return the score ``target`` aims for: a label of ``DIFFICULTY_TARGETS`` or a score.
+
+    Raises ``ValueError`` for an unknown label or a score outside 0 to 1.
+    """
+    if isinstance(target, str):
+        if target not in DIFFICULTY_TARGETS:
+            raise ValueError(f'unknown target difficulty "{target}"')
+        return DIFFICULTY_TARGETS[target]
+    if isinstance(target, bool) or not isinstance(target, (int, float)) or not 0 <= target <= 1:
+        raise ValueError(
+            f'target difficulty must be one of {", ".join(DIFFICULTY_TARGETS)} or a score from 0 to 1'
+        )
+    return float(target)
+
+
+def generate_grid_for_difficulty(words, grid_size, target, rng=None,
+                                 candidates=DEFAULT_CANDIDATES, generator=generate_grid):
+    """Generate ``candidates`` grids and return the one scoring nearest ``target``.
+
+    ``target`` is a score or a difficulty label (see ``difficulty_target``,
+    checked before anything is generated) and ``generator`` is
+    ``generate_grid`` or anything with its signature. Candidates that leave
+    words out (see ``generate_grid_backtracking``) always lose to ones that
+    don't. The result is the generator's dict plus ``features`` and ``score``.
+    """
+    target = difficulty_target(target)
+    rng = rng or random
+    best = best_key = None
+    for _ in range(max(candidates, 1)):
+        result = generator(words, grid_size, rng=rng)
+        features = difficulty_features(result['grid'], result['placed_words'], grid_size)
+        score = difficulty_score(features)
+        key = (len(result.get('unplaced', ())), abs(score - target))
+        if best is None or key < best_key:
+            best, best_key = {**result, 'features': features, 'score': score}, key
+    return best
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:05
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='wordsearchpuzzle',
+            name='height',
+            field=models.IntegerField(default=15, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(200)]),
+        ),
+        migrations.AlterField(
+            model_name='wordsearchpuzzle',
+            name='width',
+            field=models.IntegerField(default=15, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(200)]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0002_alter_wordsearchpuzzle_grid_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordsearchpuzzle',
+            name='recipe',
+            field=models.JSONField(blank=True, help_text='Seed and spec the grid is rebuilt from; when set, grid_data and words_data are not stored', null=True),
+        ),
+    ]
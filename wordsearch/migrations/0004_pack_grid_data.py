@@ -0,0 +1,70 @@
+# Generated by Django 5.0.7 on 2026-10-18 15:10
+
+from django.db import migrations
+
+import wordsearch.fields
+
+BATCH_SIZE = 500
+
+
+def pack_grids(apps, schema_editor):
+    """Copy every JSON grid into the packed column."""
+    WordSearchPuzzle = apps.get_model('wordsearch', 'WordSearchPuzzle')
+    batch = []
+    unpackable = []
+    for puzzle_id, grid in WordSearchPuzzle.objects.values_list('id', 'grid_data').iterator(chunk_size=BATCH_SIZE):
+        try:
+            packed = wordsearch.fields.to_packed_grid(grid)
+        except (TypeError, ValueError):
+            unpackable.append(puzzle_id)
+            continue
+        if packed is not None:
+            batch.append(WordSearchPuzzle(id=puzzle_id, grid_packed=packed))
+        if len(batch) >= BATCH_SIZE:
+            WordSearchPuzzle.objects.bulk_update(batch, ['grid_packed'])
+            batch.clear()
+    WordSearchPuzzle.objects.bulk_update(batch, ['grid_packed'])
+    if unpackable:
+        # Fix or clear these by hand rather than lose them silently
+        raise RuntimeError(
+            'These puzzles do not have a rectangular grid of ASCII letters: '
+            + ', '.join(map(str, unpackable))
+        )
+
+
+def unpack_grids(apps, schema_editor):
+    """Copy every packed grid back into the JSON column."""
+    WordSearchPuzzle = apps.get_model('wordsearch', 'WordSearchPuzzle')
+    batch = []
+    puzzles = WordSearchPuzzle.objects.filter(grid_packed__isnull=False).only('id', 'grid_packed')
+    for puzzle in puzzles.iterator(chunk_size=BATCH_SIZE):
+        batch.append(WordSearchPuzzle(id=puzzle.id, grid_data=puzzle.grid_packed.to_list()))
+        if len(batch) >= BATCH_SIZE:
+            WordSearchPuzzle.objects.bulk_update(batch, ['grid_data'])
+            batch.clear()
+    WordSearchPuzzle.objects.bulk_update(batch, ['grid_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0003_wordsearchpuzzle_recipe'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordsearchpuzzle',
+            name='grid_packed',
+            field=wordsearch.fields.PackedGridField(blank=True, null=True, help_text='The letter grid, read as a sequence of rows'),
+        ),
+        migrations.RunPython(pack_grids, unpack_grids),
+        migrations.RemoveField(
+            model_name='wordsearchpuzzle',
+            name='grid_data',
+        ),
+        migrations.RenameField(
+            model_name='wordsearchpuzzle',
+            old_name='grid_packed',
+            new_name='grid_data',
+        ),
+    ]
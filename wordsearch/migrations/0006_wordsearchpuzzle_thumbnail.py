@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0005_puzzlejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wordsearchpuzzle',
+            name='thumbnail',
+            field=models.CharField(blank=True, editable=False, help_text='Content hash of the list preview image (see wordsearch.thumbnails)', max_length=64),
+        ),
+    ]
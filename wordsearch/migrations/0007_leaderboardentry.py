@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('wordsearch', '0006_wordsearchpuzzle_thumbnail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('highest_level', models.IntegerField(default=0, help_text='Highest completed puzzle id')),
+                ('completed_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'leaderboard entries',
+                'indexes': [models.Index(fields=['-highest_level', 'user'], name='leaderboard_rank_idx')],
+            },
+        ),
+    ]
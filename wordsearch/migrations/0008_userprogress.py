@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('wordsearch', '0007_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgress',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='level_progress', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('next_level', models.PositiveIntegerField(default=1, help_text='Lowest level not completed yet')),
+                ('progress_count', models.PositiveIntegerField(default=0, help_text='Levels completed within the first PROGRESS_LEVELS')),
+                ('completed_levels', models.BinaryField(default=bytes, help_text='Bitmap of completed levels; bit n - 1 is level n')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'user progress',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0008_userprogress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wordsearchattempt',
+            index=models.Index(fields=['user', '-started_at', '-id'], name='attempt_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wordsearchpuzzle',
+            index=models.Index(fields=['is_public', '-created_at', '-id'], name='puzzle_listing_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.7 on 2026-10-18 13:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wordsearch', '0009_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='puzzlejob',
+            name='claim',
+            field=models.CharField(blank=True, editable=False, help_text='Token of the claim running the job; only that claim may finish it', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='puzzlejob',
+            index=models.Index(fields=['status', 'finished_at'], name='puzzlejob_finished_idx'),
+        ),
+    ]
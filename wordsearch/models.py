@@ -1,9 +1,42 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .fields import PackedGridField
 import json
 
 
+# Largest grid side; "extreme" puzzles and late levels go up to this
+MAX_GRID_SIZE = 200
+
+# Fields a recipe puzzle rebuilds on read instead of storing
+RECIPE_FIELDS = {'grid_data', 'words_data'}
+
+# Fields the list thumbnail is drawn from
+THUMBNAIL_FIELDS = {'grid_data', 'recipe'}
+
+# Columns listings defer; they can be large and lists never show them
+LISTING_DEFERRED_FIELDS = ('grid_data', 'words_data', 'recipe')
+
+
+class JSONArrayLength(models.Func):
+    """Length of a JSON array, computed by the database."""
+    
+    function = 'JSON_ARRAY_LENGTH'
+    output_field = models.IntegerField()
+    
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='JSONB_ARRAY_LENGTH', **extra_context)
+
+
+def word_total():
+    """Expression for a puzzle's word count that leaves its JSON columns in the database."""
+    # Recipe puzzles keep their words in the recipe until materialized
+    return Coalesce(JSONArrayLength(KeyTransform('words', 'recipe')), JSONArrayLength('words_data'))
+
+
 class WordSearchPuzzle(models.Model):
     """Model for word search puzzles."""
     
@@ -22,18 +55,26 @@ class WordSearchPuzzle(models.Model):
     
     # Puzzle configuration
     width = models.IntegerField(
-        validators=[MinValueValidator(5), MaxValueValidator(50)],
+        validators=[MinValueValidator(5), MaxValueValidator(MAX_GRID_SIZE)],
         default=15
     )
     height = models.IntegerField(
-        validators=[MinValueValidator(5), MaxValueValidator(50)],
+        validators=[MinValueValidator(5), MaxValueValidator(MAX_GRID_SIZE)],
         default=15
     )
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default='medium')
     
-    # Puzzle data (stored as JSON)
-    grid_data = models.JSONField(default=dict, help_text="The letter grid as 2D array")
+    # Puzzle data (the grid packed one byte per cell, the words as JSON)
+    grid_data = PackedGridField(null=True, blank=True, help_text="The letter grid, read as a sequence of rows")
     words_data = models.JSONField(default=list, help_text="List of words with positions")
+    recipe = models.JSONField(
+        null=True, blank=True,
+        help_text="Seed and spec the grid is rebuilt from; when set, grid_data and words_data are not stored"
+    )
+    thumbnail = models.CharField(
+        max_length=64, blank=True, editable=False,
+        help_text="Content hash of the list preview image (see wordsearch.thumbnails)"
+    )
     
     # Meta information
     is_public = models.BooleanField(default=True)
@@ -42,20 +83,81 @@ class WordSearchPuzzle(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the public list (see wordsearch.pagination)
+            models.Index(fields=['is_public', '-created_at', '-id'], name='puzzle_listing_idx'),
+        ]
         
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if instance.__dict__.get('recipe'):
+            instance._defer_recipe_fields()
+        return instance
+    
+    def _defer_recipe_fields(self):
+        """Leave the grid unloaded, so the first read rebuilds it."""
+        for name in RECIPE_FIELDS:
+            self.__dict__.pop(name, None)
+    
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        """Load deferred grid fields of a recipe puzzle from the recipe cache."""
+        if fields is not None and self.__dict__.get('recipe'):
+            fields = set(fields)
+            rebuilt = fields & RECIPE_FIELDS
+            if rebuilt:
+                from .recipes import rebuild_puzzle
+                data = rebuild_puzzle(self.recipe)
+                for name in rebuilt:
+                    setattr(self, name, data[name])
+                fields -= rebuilt
+                if not fields:
+                    return
+        super().refresh_from_db(using, fields, **kwargs)
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or THUMBNAIL_FIELDS & set(update_fields):
+            self.update_thumbnail()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'thumbnail'}
+        if not self.__dict__.get('recipe'):
+            return super().save(*args, **kwargs)
+        # Recipe puzzles store no grid or words; both are rebuilt on read
+        self.grid_data, self.words_data = None, []
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._defer_recipe_fields()
+    
+    def update_thumbnail(self):
+        """Write the list preview for the current grid and point ``thumbnail`` at it."""
+        from .thumbnails import thumbnail_for
+        grid, recipe = self.__dict__.get('grid_data'), self.__dict__.get('recipe')
+        if 'grid_data' not in self.__dict__ and not recipe:
+            # Grid deferred and not changed; the stored thumbnail still matches it
+            return
+        self.thumbnail = thumbnail_for(grid, recipe, settings.MEDIA_ROOT)
+    
     @property
     def word_count(self):
         """Return the number of words in the puzzle."""
+        # Listings annotate it (see word_total) so words_data can stay deferred
+        if 'word_total' in self.__dict__:
+            return self.word_total or 0
         return len(self.words_data) if self.words_data else 0
     
     @property
     def grid_size(self):
         """Return the grid size (assuming square grid)."""
-        if self.grid_data and isinstance(self.grid_data, list):
-            return len(self.grid_data)  # Number of rows
+        if self.recipe:
+            # Known without rebuilding the grid
+            return self.recipe['grid_size']
+        if self.grid_data:
+            return self.grid_data.height
         return self.width
     
     @property
@@ -65,23 +167,25 @@ class WordSearchPuzzle(models.Model):
             return [word.get('word', '') for word in self.words_data]
         return []
     
+    @property
+    def grid_rows(self):
+        """Return the grid as one string per row (the compact wire format)."""
+        if self.grid_data:
+            return self.grid_data.rows
+        return []
+    
     @property
     def grid_display(self):
         """Return grid formatted for display."""
         if not self.grid_data:
             return []
-        
-        # If grid_data is a 2D array
-        if isinstance(self.grid_data, list) and len(self.grid_data) > 0:
-            return [' '.join(row) for row in self.grid_data]
-        
-        # If grid_data is a flat array or string, convert to 2D
-        return []
+        return [' '.join(row) for row in self.grid_data]
     
     def increment_play_count(self):
-        """Increment the play count."""
+        """Count a play; it is written behind by wordsearch.playcount."""
+        from .playcount import record_play
+        record_play(self.pk)
         self.play_count += 1
-        self.save(update_fields=['play_count'])
 
 
 class WordSearchAttempt(models.Model):
@@ -100,6 +204,10 @@ class WordSearchAttempt(models.Model):
     class Meta:
         unique_together = ['puzzle', 'user']
         ordering = ['-started_at']
+        indexes = [
+            # Keyset pagination of a player's attempts (see wordsearch.pagination)
+            models.Index(fields=['user', '-started_at', '-id'], name='attempt_listing_idx'),
+        ]
         
     def __str__(self):
         return f"{self.user.username} - {self.puzzle.title}"
@@ -112,6 +220,74 @@ class WordSearchAttempt(models.Model):
         return (len(self.words_found) / self.puzzle.word_count) * 100
 
 
+class LeaderboardEntry(models.Model):
+    """A player's standing, kept up to date as attempts are completed (see wordsearch.leaderboard)."""
+    
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='leaderboard_entry'
+    )
+    highest_level = models.IntegerField(default=0, help_text="Highest completed puzzle id")
+    completed_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'leaderboard entries'
+        indexes = [models.Index(fields=['-highest_level', 'user'], name='leaderboard_rank_idx')]
+        
+    def __str__(self):
+        return f"{self.user.username}: level {self.highest_level} ({self.completed_count} completed)"
+
+
+class UserProgress(models.Model):
+    """A player's level progress, so the home page needs no scan of their attempts (see wordsearch.progress)."""
+    
+    # Levels the home page progress bar counts
+    PROGRESS_LEVELS = 100
+    
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='level_progress'
+    )
+    next_level = models.PositiveIntegerField(default=1, help_text="Lowest level not completed yet")
+    progress_count = models.PositiveIntegerField(
+        default=0, help_text="Levels completed within the first PROGRESS_LEVELS"
+    )
+    completed_levels = models.BinaryField(
+        default=bytes, help_text="Bitmap of completed levels; bit n - 1 is level n"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'user progress'
+        
+    def __str__(self):
+        return f"{self.user.username}: next level {self.next_level}"
+    
+    def has_completed(self, level):
+        index = level - 1
+        bitmap = self.completed_levels
+        return 0 <= index < len(bitmap) * 8 and bool(bitmap[index // 8] & (1 << index % 8))
+    
+    def mark_completed(self, level):
+        """Set ``level``'s bit; return False if it was already set.
+        
+        Only ``next_level`` can need more than a bit flip, and it only moves
+        forward, so this is O(1) amortized.
+        """
+        if level < 1 or self.has_completed(level):
+            return False
+        index = level - 1
+        bitmap = bytearray(self.completed_levels)
+        if index // 8 >= len(bitmap):
+            bitmap.extend(bytes(index // 8 + 1 - len(bitmap)))
+        bitmap[index // 8] |= 1 << index % 8
+        self.completed_levels = bytes(bitmap)
+        if level <= self.PROGRESS_LEVELS:
+            self.progress_count += 1
+        while self.has_completed(self.next_level):
+            self.next_level += 1
+        return True
+
+
 class PuzzleRating(models.Model):
     """Model for user ratings of puzzles."""
     
@@ -128,3 +304,49 @@ class PuzzleRating(models.Model):
         
     def __str__(self):
         return f"{self.user.username} rated {self.puzzle.title}: {self.rating}/5"
+
+
+class PuzzleJob(models.Model):
+    """A queued puzzle generation, run by the ``run_puzzle_worker`` command."""
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='puzzle_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    spec = models.JSONField(help_text="Everything the worker needs to generate the puzzle")
+    puzzle = models.ForeignKey(
+        WordSearchPuzzle, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    unplaced = models.JSONField(default=list, help_text="Words the generator had to leave out")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    claim = models.CharField(
+        max_length=32, blank=True, editable=False,
+        help_text="Token of the claim running the job; only that claim may finish it"
+    )
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            # Pruning finished jobs (see jobs.prune_jobs)
+            models.Index(fields=['status', 'finished_at'], name='puzzlejob_finished_idx'),
+        ]
+        
+    def __str__(self):
+        return f"Job {self.pk} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
@@ -0,0 +1,141 @@
+"""Keyset pagination for puzzle and attempt listings.
+
+Page-number pagination reads and discards ``OFFSET`` rows and counts the
+whole table for every page, so page 5000 of a big listing costs far more
+than page 1. Listings are instead ordered newest first on
+``(-<field>, -id)`` and a page starts after the last row of the one
+before it, which an index on the filter columns plus ``(-<field>, -id)``
+answers by seeking, whatever the depth. The position travels in an
+opaque ``cursor`` query parameter. There is no total count and no jumping
+to page N, only newer and older pages.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPage:
+    """One page of rows, with cursors for its neighbours (``None`` at either end)."""
+
+    __slots__ = ('items', 'next_cursor', 'previous_cursor')
+
+    def __init__(self, items, next_cursor, previous_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+
+def encode_cursor(obj, field, reverse):
+    """Return the cursor for the page after (or, if ``reverse``, before) ``obj``."""
+    position = [int(reverse), getattr(obj, field).isoformat(), obj.pk]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(reverse, value, pk)`` from a cursor; raises ValueError if it is not one."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        reverse, value, pk = json.loads(base64.urlsafe_b64decode(padded))
+        value = parse_datetime(value)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('invalid cursor')
+    if value is None or not isinstance(pk, int) or reverse not in (0, 1):
+        raise ValueError('invalid cursor')
+    return bool(reverse), value, pk
+
+
+def keyset_page(queryset, field, cursor, page_size):
+    """Return the ``KeysetPage`` of ``queryset``, newest ``field`` first, at ``cursor``.
+
+    ``cursor`` is ``None`` for the first page; a malformed one raises ValueError.
+    """
+    reverse, position = False, None
+    if cursor:
+        reverse, value, pk = decode_cursor(cursor)
+        position = (value, pk)
+
+    if reverse:
+        # Walk back towards newer rows, then put them in listing order
+        if position:
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
+        queryset = queryset.order_by(field, 'pk')
+    else:
+        if position:
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+        queryset = queryset.order_by(f'-{field}', '-pk')
+
+    # One row more than the page shows whether there is another page beyond it
+    items = list(queryset[:page_size + 1])
+    more = len(items) > page_size
+    items = items[:page_size]
+    if reverse:
+        items.reverse()
+        has_next, has_previous = True, more
+    else:
+        has_next, has_previous = more, position is not None
+
+    return KeysetPage(
+        items,
+        encode_cursor(items[-1], field, False) if has_next and items else None,
+        encode_cursor(items[0], field, True) if has_previous and items else None
+    )
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination over ``keyset_page``; responses carry ``next``, ``previous`` and ``results``."""
+
+    ordering_field = 'created_at'
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        try:
+            self.page = keyset_page(
+                queryset, self.ordering_field, request.query_params.get(self.cursor_query_param), self.page_size
+            )
+        except ValueError:
+            raise NotFound('Invalid cursor.')
+        return self.page.items
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.get_link(self.page.next_cursor)
+
+    def get_previous_link(self):
+        return self.get_link(self.page.previous_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class AttemptPagination(KeysetPagination):
+    """Keyset pagination of attempts, most recently started first."""
+
+    ordering_field = 'started_at'
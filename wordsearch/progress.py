@@ -0,0 +1,70 @@
+"""Per-player level progress.
+
+``UserProgress`` keeps what the home page shows (the next level to play
+and how many of the first ``PROGRESS_LEVELS`` are done) plus a bitmap of
+every completed level, one bit per level, so the page is one primary-key
+lookup and a completion flips one bit. Players who completed levels before
+the table existed get their row built from their attempts the first time
+it is needed.
+
+Progress and the leaderboard count the same completions: ``complete_level``
+is the only place a completion is recorded and updates both, and deleting
+a completed attempt recounts both.
+"""
+from django.db import transaction
+
+from .models import UserProgress, WordSearchAttempt
+
+
+def build_progress(user_id):
+    """Return an unsaved ``UserProgress`` built from ``user_id``'s completed attempts."""
+    progress = UserProgress(user_id=user_id)
+    levels = WordSearchAttempt.objects.filter(user_id=user_id, is_completed=True).values_list('puzzle_id', flat=True)
+    for level in sorted(levels):
+        progress.mark_completed(level)
+    return progress
+
+
+def get_progress(user):
+    """Return ``user``'s ``UserProgress``, creating it on first use."""
+    try:
+        return UserProgress.objects.get(pk=user.pk)
+    except UserProgress.DoesNotExist:
+        progress = build_progress(user.pk)
+        with transaction.atomic():
+            progress, created = UserProgress.objects.get_or_create(
+                pk=user.pk,
+                defaults={field: getattr(progress, field)
+                          for field in ('next_level', 'progress_count', 'completed_levels')}
+            )
+        return progress
+
+
+def recount_progress(user_id):
+    """Rebuild ``user_id``'s ``UserProgress`` from their attempts, for when one stops being completed."""
+    progress = build_progress(user_id)
+    UserProgress.objects.update_or_create(
+        pk=user_id,
+        defaults={field: getattr(progress, field)
+                  for field in ('next_level', 'progress_count', 'completed_levels')}
+    )
+
+
+def level_unlocked(progress, level):
+    """Return whether a player with ``progress`` may play ``level``.
+
+    Levels unlock in order, so a bogus level number never makes the server
+    generate a level nobody is playing.
+    """
+    return level == 1 or level > 1 and progress.has_completed(level - 1)
+
+
+def record_level(progress, level):
+    """Record ``level`` in ``progress`` (from ``get_progress``); return False if it already was."""
+    with transaction.atomic():
+        # Reread under a lock, so two completions at once cannot lose each other's bit
+        progress = UserProgress.objects.select_for_update().get(pk=progress.pk)
+        if not progress.mark_completed(level):
+            return False
+        progress.save(update_fields=['next_level', 'progress_count', 'completed_levels', 'updated_at'])
+    return True
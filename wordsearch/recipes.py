@@ -0,0 +1,124 @@
+"""Recipe storage: puzzles saved as a seed and placements, rebuilt on read.
+
+With ``WORDSEARCH_PUZZLE_STORAGE = 'recipe'`` new puzzles store only their
+words, where each word and near miss starts and a seed, a few dozen bytes
+per word instead of the whole grid, and ``rebuild_puzzle`` rebuilds them
+on read behind a bounded LRU cache.
+
+The placement search runs once, when the recipe is made. A rebuild only
+lays the recorded placements and near misses out again and refills the
+grid from the seed, so it costs one fill of the grid (under a fifth of a
+second at 200x200) and never depends on machine speed. The filler still
+comes from the generator, so a recipe records the ``GENERATOR_VERSION``
+that made it and will not rebuild under any other; run
+``materialize_recipes`` before deploying a generator change.
+"""
+import json
+import random
+from functools import lru_cache, partial
+
+from .engine import (
+    DEFAULT_TIME_BUDGET,
+    DIRECTIONS,
+    GENERATOR_VERSION,
+    build_words_data,
+    generate_grid_backtracking,
+    replay_grid,
+)
+from .levels import letter_model
+from .metrics import DEFAULT_CANDIDATES, DIFFICULTY_TARGETS, generate_grid_for_difficulty
+
+
+RECIPE_CACHE_SIZE = 256
+
+
+class RecipeError(Exception):
+    """Raised when a stored recipe cannot be rebuilt."""
+
+
+def generate_puzzle(words, grid_size, difficulty, rng=None, candidates=DEFAULT_CANDIDATES,
+                    time_budget=DEFAULT_TIME_BUDGET, max_attempts=None):
+    """Generate a user puzzle the way ``puzzle_create`` does.
+
+    Placement backtracks so no word is dropped, the candidate closest to the
+    difficulty's target score is kept, and hard puzzles also hide near
+    misses of the words in the filler. Returns the
+    ``generate_grid_for_difficulty`` result.
+    """
+    return generate_grid_for_difficulty(
+        words, grid_size,
+        DIFFICULTY_TARGETS.get(difficulty, DIFFICULTY_TARGETS['medium']),
+        rng=rng,
+        candidates=candidates,
+        generator=partial(
+            generate_grid_backtracking,
+            time_budget=time_budget,
+            letter_model=letter_model(),
+            decoys=len(words) if difficulty in ('hard', 'extreme') else 0,
+            max_attempts=max_attempts
+        )
+    )
+
+
+def new_recipe(words, grid_size, difficulty, candidates=DEFAULT_CANDIDATES, seed=None,
+               time_budget=DEFAULT_TIME_BUDGET):
+    """Generate a puzzle and return its recipe, with a random seed by default.
+
+    The recipe keeps the placed words only, in the order given, each with
+    its ``[direction index, row, col]`` start in ``placements``, and the
+    near misses hidden in the filler as ``[prefix, direction index, row, col]``.
+    """
+    seed = random.getrandbits(63) if seed is None else seed
+    result = generate_puzzle(words, grid_size, difficulty, rng=random.Random(seed),
+                             candidates=candidates, time_budget=time_budget)
+    return {
+        'version': GENERATOR_VERSION,
+        'seed': seed,
+        'words': [item['word'] for item in result['placed_words']],
+        'placements': [
+            [DIRECTIONS.index(tuple(item['direction'])), item['positions'][0]['row'], item['positions'][0]['col']]
+            for item in result['placed_words']
+        ],
+        'decoys': result['decoys'],
+        'grid_size': grid_size,
+        'difficulty': difficulty,
+    }
+
+
+def generate_from_recipe(recipe):
+    """Rebuild a recipe's puzzle, uncached; see ``engine.replay_grid``."""
+    version = recipe.get('version') if isinstance(recipe, dict) else None
+    if version != GENERATOR_VERSION:
+        raise RecipeError(
+            f'Recipe was made by generator version {version}, not {GENERATOR_VERSION}; '
+            'materialize recipes before changing the generator'
+        )
+    try:
+        return replay_grid(
+            recipe['words'], recipe['placements'], recipe['grid_size'],
+            rng=random.Random(recipe['seed']),
+            letter_model=letter_model(),
+            decoys=recipe['decoys']
+        )
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise RecipeError(f'Invalid recipe {recipe!r}: {e}')
+
+
+@lru_cache(maxsize=RECIPE_CACHE_SIZE)
+def _rebuilt(recipe_json):
+    # Cached as JSON text so every caller gets its own mutable copy
+    result = generate_from_recipe(json.loads(recipe_json))
+    return json.dumps({
+        'grid_data': result['grid'],
+        'words_data': build_words_data(result['placed_words']),
+        'unplaced': result['unplaced'],
+    })
+
+
+def rebuild_puzzle(recipe):
+    """Return ``{'grid_data', 'words_data', 'unplaced'}`` for a recipe.
+
+    ``grid_data`` and ``words_data`` are in the stored model format.
+    Raises ``RecipeError`` for a recipe from another generator version.
+    """
+    return json.loads(_rebuilt(json.dumps(recipe, sort_keys=True)))
@@ -0,0 +1,205 @@
+"""Printable PNG/PDF pages for puzzles.
+
+Letters are rasterized once per cell size into a glyph atlas, so a page's
+grid is composed with one NumPy gather over the atlas (a blit per cell,
+all at once) instead of laying out text cell by cell; a 200x200 grid costs
+about as much as copying its pixels.
+
+Rendered pages are cached on disk under ``WORDSEARCH_RENDER_CACHE_DIR``,
+named by a hash of everything that appears on the page, so an edited
+puzzle gets a new file and an unchanged one is never drawn twice.
+``render_to_cache`` only needs the plain dict from ``print_data``, so it
+can run in a process pool (see ``render_puzzles``).
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .solver import locate_words
+
+
+# Bump whenever the page layout changes, so cached pages are redrawn
+RENDER_VERSION = 1
+FORMATS = {'png': 'image/png', 'pdf': 'application/pdf'}
+
+# Grid width in pixels the cell size is chosen to fill (A4 at 300 dpi is
+# 2480 pixels wide), and the cell size range allowed
+GRID_PIXELS = 2000
+MIN_CELL_SIZE = 12
+MAX_CELL_SIZE = 96
+MARGIN = 120
+TITLE_SIZE = 64
+WORD_SIZE = 36
+PDF_RESOLUTION = 300
+# Answer highlight colour (RGBA) and its width relative to a cell
+ANSWER_COLOR = (255, 196, 0, 110)
+ANSWER_WIDTH = 0.75
+
+
+def print_data(puzzle):
+    """Return what a printed page of ``puzzle`` shows, as a plain dict."""
+    return {
+        'title': puzzle.title,
+        'rows': list(puzzle.grid_rows),
+        'words_data': list(puzzle.words_data or []),
+    }
+
+
+def content_hash(data, fmt, answers):
+    """Return the cache key for a page."""
+    payload = json.dumps([RENDER_VERSION, fmt, bool(answers), data], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cell_size_for(grid_size):
+    return max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, GRID_PIXELS // max(grid_size, 1)))
+
+
+@lru_cache(maxsize=None)
+def font(size):
+    return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=8)
+def glyph_atlas(cell_size):
+    """Return a read-only ``(27, cell_size, cell_size)`` array of glyph tiles.
+
+    Tile 0 is blank (any cell that is not A-Z) and tile ``n`` is the
+    ``n``-th letter, black on white and centred in its cell.
+    """
+    atlas = np.empty((27, cell_size, cell_size), dtype=np.uint8)
+    glyph_font = font(max(int(cell_size * 0.6), 6))
+    for index in range(27):
+        tile = Image.new('L', (cell_size, cell_size), 255)
+        if index:
+            ImageDraw.Draw(tile).text(
+                (cell_size / 2, cell_size / 2), chr(ord('A') + index - 1),
+                font=glyph_font, fill=0, anchor='mm'
+            )
+        atlas[index] = np.asarray(tile)
+    atlas.flags.writeable = False
+    return atlas
+
+
+def compose_grid(rows, cell_size):
+    """Return the letter grid as an ``L`` image, blitted from the atlas."""
+    height, width = len(rows), len(rows[0]) if rows else 0
+    codes = np.frombuffer(''.join(rows).upper().encode('ascii', 'replace'), dtype=np.uint8)
+    tiles = np.where((codes >= ord('A')) & (codes <= ord('Z')), codes - (ord('A') - 1), 0)
+    # (height, width, cell, cell) tiles laid out as rows of pixels
+    pixels = glyph_atlas(cell_size)[tiles.reshape(height, width)]
+    pixels = pixels.transpose(0, 2, 1, 3).reshape(height * cell_size, width * cell_size)
+    return Image.fromarray(np.ascontiguousarray(pixels), 'L')
+
+
+def answer_segments(rows, words_data):
+    """Return ``(start, end)`` cells of each word, for the answer key."""
+    return list(locate_words(rows, words_data).values())
+
+
+def render_page(data, answers=False):
+    """Return the page for ``data`` (see ``print_data``) as a PIL image."""
+    rows = data['rows']
+    grid_size = max(len(rows), len(rows[0]) if rows else 0)
+    cell_size = cell_size_for(grid_size)
+    grid = compose_grid(rows, cell_size)
+
+    words = [str(item.get('word', '')).upper() for item in data['words_data']]
+    word_font = font(WORD_SIZE)
+    column_width = max([int(word_font.getlength(word)) for word in words] + [1]) + WORD_SIZE
+    columns = max(1, grid.width // column_width)
+    word_rows = -(-len(words) // columns)
+    line_height = int(WORD_SIZE * 1.5)
+
+    title_font = font(TITLE_SIZE)
+    title_height = int(TITLE_SIZE * 1.8)
+    page = Image.new(
+        'RGB',
+        (max(grid.width, int(title_font.getlength(data['title']))) + 2 * MARGIN,
+         MARGIN + title_height + grid.height + line_height * (word_rows + 1) + MARGIN),
+        'white'
+    )
+    draw = ImageDraw.Draw(page)
+    draw.text((page.width / 2, MARGIN), data['title'], font=title_font, fill='black', anchor='mt')
+
+    left = (page.width - grid.width) // 2
+    grid_top = MARGIN + title_height
+    page.paste(grid, (left, grid_top))
+    draw.rectangle(
+        (left - 4, grid_top - 4, left + grid.width + 3, grid_top + grid.height + 3),
+        outline='black', width=3
+    )
+
+    if answers:
+        overlay = Image.new('RGBA', grid.size, (0, 0, 0, 0))
+        overlay_draw = ImageDraw.Draw(overlay)
+        radius = cell_size * ANSWER_WIDTH / 2
+        for (start_row, start_col), (end_row, end_col) in answer_segments(rows, data['words_data']):
+            start = ((start_col + 0.5) * cell_size, (start_row + 0.5) * cell_size)
+            end = ((end_col + 0.5) * cell_size, (end_row + 0.5) * cell_size)
+            overlay_draw.line((start, end), fill=ANSWER_COLOR, width=int(radius * 2))
+            for x, y in (start, end):
+                overlay_draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=ANSWER_COLOR)
+        region = (left, grid_top, left + grid.width, grid_top + grid.height)
+        page.paste(Image.alpha_composite(page.crop(region).convert('RGBA'), overlay).convert('RGB'), region[:2])
+
+    words_top = grid_top + grid.height + line_height
+    for index, word in enumerate(words):
+        column, row = divmod(index, word_rows)
+        draw.text((left + column * column_width, words_top + row * line_height), word, font=word_font, fill='black')
+
+    return page if answers else page.convert('L')
+
+
+def encode_page(page, fmt):
+    """Return ``page`` encoded as ``fmt`` bytes."""
+    buffer = io.BytesIO()
+    if fmt == 'pdf':
+        page.save(buffer, 'PDF', resolution=PDF_RESOLUTION)
+    else:
+        page.save(buffer, 'PNG', optimize=False)
+    return buffer.getvalue()
+
+
+def cache_path(cache_dir, digest, fmt):
+    return os.path.join(cache_dir, digest[:2], f'{digest}.{fmt}')
+
+
+def render_to_cache(data, fmt, answers, cache_dir):
+    """Render a page into the disk cache unless it is there already.
+
+    Returns ``(path, digest)``.
+    """
+    digest = content_hash(data, fmt, answers)
+    path = cache_path(cache_dir, digest, fmt)
+    if os.path.exists(path):
+        return path, digest
+
+    write_cached(path, encode_page(render_page(data, answers), fmt))
+    return path, digest
+
+
+def write_cached(path, content):
+    """Write a content-addressed file, creating its directory.
+
+    Safe to run in several processes at once: the file is written to a
+    temporary name and renamed into place.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as cached_file:
+            cached_file.write(content)
+        # mkstemp creates the file owner-only; workers may run as another user
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
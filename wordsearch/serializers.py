@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import WordSearchPuzzle, WordSearchAttempt, PuzzleRating
+from .fields import PackedGrid
+from .jobs import SpecError, puzzle_spec
+from .models import PuzzleJob, WordSearchPuzzle, WordSearchAttempt, PuzzleRating
+from .solver import WordSolver
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,10 +14,53 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'first_name', 'last_name']
 
 
+def letter_rows(grid):
+    """Return a submitted grid as row strings, or None if it is not one.
+
+    ``grid`` may be a list of lists of single letters or a list of row
+    strings; either way the rows must all be the same length.
+    """
+    if not isinstance(grid, list) or not grid:
+        return None
+    rows = []
+    for row in grid:
+        if isinstance(row, list) and all(isinstance(cell, str) and len(cell) == 1 for cell in row):
+            row = ''.join(row)
+        elif not isinstance(row, str):
+            return None
+        rows.append(row)
+    if any(len(row) != len(rows[0]) for row in rows):
+        return None
+    return rows
+
+
+class GridField(serializers.Field):
+    """Letter grid in either wire format.
+    
+    Emits a list of lists of letters, or one string per row when the
+    request asks for ``?grid_format=rows``, and accepts either.
+    """
+    
+    def to_representation(self, value):
+        request = self.context.get('request')
+        if request is not None and request.query_params.get('grid_format') == 'rows':
+            return value.rows
+        return value.to_list()
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not all(isinstance(row, (list, str)) for row in data):
+            raise serializers.ValidationError("Grid data must be a list of lists or of row strings.")
+        for row in data:
+            if isinstance(row, list) and not all(isinstance(cell, str) and len(cell) == 1 for cell in row):
+                raise serializers.ValidationError("Each grid cell must be a single letter.")
+        return [''.join(row) for row in data]
+
+
 class WordSearchPuzzleSerializer(serializers.ModelSerializer):
     """Serializer for WordSearchPuzzle model."""
     
     created_by = UserSerializer(read_only=True)
+    grid_data = GridField()
     word_count = serializers.ReadOnlyField()
     
     class Meta:
@@ -28,9 +74,6 @@ class WordSearchPuzzleSerializer(serializers.ModelSerializer):
     
     def validate_grid_data(self, value):
         """Validate grid data structure."""
-        if not isinstance(value, list):
-            raise serializers.ValidationError("Grid data must be a list of lists.")
-        
         height = self.initial_data.get('height', 15)
         width = self.initial_data.get('width', 15)
         
@@ -38,10 +81,13 @@ class WordSearchPuzzleSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(f"Grid must have {height} rows.")
         
         for row in value:
-            if not isinstance(row, list) or len(row) != width:
+            if len(row) != width:
                 raise serializers.ValidationError(f"Each row must have {width} columns.")
         
-        return value
+        try:
+            return PackedGrid.from_rows(value)
+        except ValueError:
+            raise serializers.ValidationError("Grid letters must be ASCII.")
     
     def validate_words_data(self, value):
         """Validate words data structure."""
@@ -55,11 +101,78 @@ class WordSearchPuzzleSerializer(serializers.ModelSerializer):
                     f"Each word must have: {', '.join(required_fields)}"
                 )
         
+        # Check the words really are in the submitted grid
+        grid = letter_rows(self.initial_data.get('grid_data'))
+        if grid:
+            words = [str(word_data['word']) for word_data in value]
+            missing = WordSolver(words).missing_words(grid)
+            if missing:
+                raise serializers.ValidationError(
+                    f"Words not found in the grid: {', '.join(missing)}"
+                )
+        
         return value
 
 
+class WordSearchPuzzleListSerializer(serializers.ModelSerializer):
+    """Puzzle summary for listings; the grid and words come from the detail endpoint."""
+    
+    created_by = UserSerializer(read_only=True)
+    word_count = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = WordSearchPuzzle
+        fields = [
+            'id', 'title', 'description', 'created_by', 'created_at', 'updated_at',
+            'width', 'height', 'difficulty', 'is_public', 'is_completed',
+            'play_count', 'word_count', 'thumbnail'
+        ]
+        read_only_fields = fields
+
+
+class PuzzleRequestSerializer(serializers.Serializer):
+    """A puzzle to generate from words; validates into a job spec."""
+    
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    difficulty = serializers.ChoiceField(choices=WordSearchPuzzle.DIFFICULTY_CHOICES)
+    words = serializers.ListField(child=serializers.CharField())
+    grid_size = serializers.IntegerField(required=False)
+    is_public = serializers.BooleanField(required=False, default=True)
+    
+    def validate(self, attrs):
+        words = [word.strip().upper() for word in attrs['words'] if word.strip()]
+        try:
+            return puzzle_spec(
+                attrs['title'].strip(), attrs['difficulty'], words,
+                description=attrs['description'].strip(),
+                grid_size=attrs.get('grid_size'),
+                is_public=attrs['is_public']
+            )
+        except SpecError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class PuzzleJobSerializer(serializers.ModelSerializer):
+    """Serializer for PuzzleJob model."""
+    
+    url = serializers.HyperlinkedIdentityField(view_name='wordsearch:job-detail')
+    
+    class Meta:
+        model = PuzzleJob
+        fields = [
+            'id', 'url', 'status', 'puzzle', 'unplaced', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
 class WordSearchAttemptSerializer(serializers.ModelSerializer):
-    """Serializer for WordSearchAttempt model."""
+    """Serializer for WordSearchAttempt model.
+
+    Completion is read-only: a level only counts once ``complete_level``
+    has checked the found words against it, so the API cannot claim one.
+    """
     
     user = UserSerializer(read_only=True)
     puzzle = WordSearchPuzzleSerializer(read_only=True)
@@ -72,7 +185,18 @@ class WordSearchAttemptSerializer(serializers.ModelSerializer):
             'id', 'puzzle', 'puzzle_id', 'user', 'started_at', 'completed_at',
             'words_found', 'time_taken', 'is_completed', 'completion_percentage'
         ]
-        read_only_fields = ['started_at']
+        read_only_fields = ['started_at', 'completed_at', 'is_completed']
+
+    def validate_puzzle_id(self, value):
+        if self.instance is not None and value != self.instance.puzzle_id:
+            raise serializers.ValidationError('An attempt cannot move to another puzzle.')
+        return value
+
+
+class WordSearchAttemptListSerializer(WordSearchAttemptSerializer):
+    """Attempt for listings, with its puzzle summarized."""
+    
+    puzzle = WordSearchPuzzleListSerializer(read_only=True)
 
 
 class PuzzleRatingSerializer(serializers.ModelSerializer):
@@ -0,0 +1,172 @@
+"""Server-side word search solver.
+
+Builds an Aho-Corasick automaton over the target words and their reverses,
+then feeds it every row, column and diagonal of the grid exactly once.
+Matching a reversed word while reading a line forwards is the same as
+matching the word reading backwards, so four line families cover all
+eight directions in a single linear pass per line.
+"""
+from collections import deque
+
+
+def grid_lines(grid):
+    """Yield ``(start_row, start_col, dr, dc, text)`` for every grid line.
+
+    Lines run left-to-right, top-to-bottom, down-right and down-left, so
+    together they visit each cell once per line family.
+    """
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    rows = [''.join(row).upper() for row in grid]
+
+    for r in range(height):
+        yield r, 0, 0, 1, rows[r]
+    for c in range(width):
+        yield 0, c, 1, 0, ''.join(rows[r][c] for r in range(height))
+
+    # Down-right diagonals start on the top row or the left column
+    for r, c in [(0, c) for c in range(width)] + [(r, 0) for r in range(1, height)]:
+        length = min(height - r, width - c)
+        yield r, c, 1, 1, ''.join(rows[r + i][c + i] for i in range(length))
+
+    # Down-left diagonals start on the top row or the right column
+    for r, c in [(0, c) for c in range(width)] + [(r, width - 1) for r in range(1, height)]:
+        length = min(height - r, c + 1)
+        yield r, c, 1, -1, ''.join(rows[r + i][c - i] for i in range(length))
+
+
+class WordSolver:
+    """Aho-Corasick matcher that finds words in all eight directions."""
+
+    def __init__(self, words):
+        self.words = list(dict.fromkeys(word.upper() for word in words if word))
+        # Per state: transitions, failure link and (word index, reversed)
+        # pairs that end here, including those inherited via failure links
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, word in enumerate(self.words):
+            self._add(word, (index, False))
+            if word[::-1] != word:
+                self._add(word[::-1], (index, True))
+        self._link()
+
+    def _add(self, text, output):
+        state = 0
+        for letter in text:
+            next_state = self._goto[state].get(letter)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][letter] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(output)
+
+    def _link(self):
+        # Alongside the failure links, fold them into a full transition
+        # table so scanning never has to follow failure links
+        self._delta = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for letter, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and letter not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(letter, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def find_all(self, grid):
+        """Return every occurrence of every word in ``grid``.
+
+        Each occurrence is a dict with ``word``, ``start`` and ``end``
+        (``(row, col)`` tuples) and ``direction`` (``(dr, dc)``).
+        """
+        delta, output, words = self._delta, self._output, self.words
+        found = []
+        seen = set()
+
+        for start_row, start_col, dr, dc, text in grid_lines(grid):
+            state = 0
+            for position, letter in enumerate(text):
+                state = delta[state].get(letter, 0)
+                if not output[state]:
+                    continue
+
+                for index, is_reversed in output[state]:
+                    length = len(words[index])
+                    first = position - length + 1
+                    if is_reversed:
+                        begin, step = position, -1
+                    else:
+                        begin, step = first, 1
+                    start = (start_row + begin * dr, start_col + begin * dc)
+                    end = (start_row + (begin + step * (length - 1)) * dr,
+                           start_col + (begin + step * (length - 1)) * dc)
+                    key = (index, start, end)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    found.append({
+                        'word': words[index],
+                        'start': start,
+                        'end': end,
+                        'direction': (dr * step, dc * step),
+                    })
+        return found
+
+    def missing_words(self, grid):
+        """Return the words that do not occur anywhere in ``grid``."""
+        present = {item['word'] for item in self.find_all(grid)}
+        return [word for word in self.words if word not in present]
+
+
+def solve(grid, words):
+    """Return every occurrence of ``words`` in ``grid`` (see ``find_all``)."""
+    return WordSolver(words).find_all(grid)
+
+
+def locate_words(grid, words_data):
+    """Return ``{word: (start, end)}`` for stored word placements.
+
+    Placements are used when they really spell the word in ``grid``;
+    anything else (hand-authored data with named directions, say) is found
+    with the solver instead. Words that are nowhere in the grid are left
+    out. Keys follow the order of ``words_data``.
+    """
+    rows = [''.join(row).upper() for row in grid]
+    height, width = len(rows), len(rows[0]) if rows else 0
+    located = {}
+    missing = []
+    for item in words_data:
+        word = str(item.get('word', '')).upper()
+        if not word or word in located:
+            continue
+        try:
+            row, col = int(item['start_row']), int(item['start_col'])
+            dr, dc = (int(step) for step in item.get('direction'))
+            cells = [(row + i * dr, col + i * dc) for i in range(len(word))]
+            if all(0 <= r < height and 0 <= c < width and rows[r][c] == letter
+                   for (r, c), letter in zip(cells, word)):
+                located[word] = (cells[0], cells[-1])
+                continue
+        except (KeyError, TypeError, ValueError):
+            pass
+        missing.append(word)
+        # Keep the word's place in the order until the solver fills it in
+        located[word] = None
+
+    if missing:
+        found = {}
+        for occurrence in WordSolver(missing).find_all(rows):
+            found.setdefault(occurrence['word'], (occurrence['start'], occurrence['end']))
+        for word in missing:
+            located[word] = found.get(word)
+    return {word: cells for word, cells in located.items() if cells is not None}
@@ -0,0 +1,174 @@
+/*
+ * Canvas renderer for large word search grids.
+ *
+ * A 200x200 grid is 40,000 letters; as one DOM element each the page takes
+ * seconds to lay out and every hover restyles the whole grid. Here the grid
+ * is drawn once onto a canvas from its row strings and only the cells whose
+ * state changes are redrawn afterwards.
+ *
+ * Usage:
+ *   const grid = new CanvasGrid(canvas, rows, {
+ *       onSelect: (word, cells) => true if word was a hit (cells stay found)
+ *   });
+ *   grid.enabled = true;
+ */
+(function () {
+    'use strict';
+
+    const COLORS = {
+        background: '#ffffff',
+        line: '#dee2e6',
+        letter: '#212529',
+        selected: '#2196f3',
+        found: '#4caf50',
+        activeLetter: '#ffffff'
+    };
+    const MIN_CELL = 12;
+    const MAX_CELL = 28;
+
+    class CanvasGrid {
+        constructor(canvas, rows, options = {}) {
+            this.canvas = canvas;
+            this.rows = rows;
+            this.height = rows.length;
+            this.width = rows.length ? rows[0].length : 0;
+            this.onSelect = options.onSelect || (() => false);
+            this.enabled = false;
+
+            // Per-cell state: 0 plain, 1 found
+            this.state = new Uint8Array(this.width * this.height);
+            this.selection = [];
+            this.start = null;
+
+            const available = options.maxWidth || canvas.parentElement.clientWidth || 800;
+            this.cell = Math.max(MIN_CELL, Math.min(MAX_CELL, Math.floor(available / this.width)));
+            this.resize();
+            this.drawAll();
+
+            canvas.addEventListener('pointerdown', event => this.pointerDown(event));
+            canvas.addEventListener('pointermove', event => this.pointerMove(event));
+            canvas.addEventListener('pointerup', event => this.pointerUp(event));
+            canvas.addEventListener('pointercancel', () => this.cancel());
+        }
+
+        resize() {
+            const ratio = window.devicePixelRatio || 1;
+            const cssWidth = this.width * this.cell;
+            const cssHeight = this.height * this.cell;
+            this.canvas.style.width = cssWidth + 'px';
+            this.canvas.style.height = cssHeight + 'px';
+            this.canvas.width = Math.ceil(cssWidth * ratio);
+            this.canvas.height = Math.ceil(cssHeight * ratio);
+            this.context = this.canvas.getContext('2d');
+            this.context.setTransform(ratio, 0, 0, ratio, 0, 0);
+            this.context.textAlign = 'center';
+            this.context.textBaseline = 'middle';
+            this.context.font = `bold ${Math.round(this.cell * 0.6)}px Arial, sans-serif`;
+        }
+
+        drawAll() {
+            const ctx = this.context;
+            ctx.fillStyle = COLORS.background;
+            ctx.fillRect(0, 0, this.width * this.cell, this.height * this.cell);
+            for (let row = 0; row < this.height; row++) {
+                for (let col = 0; col < this.width; col++) {
+                    this.drawCell(row, col);
+                }
+            }
+        }
+
+        drawCell(row, col, selected = false) {
+            const ctx = this.context;
+            const size = this.cell;
+            const x = col * size;
+            const y = row * size;
+            let fill = COLORS.background;
+            if (selected) fill = COLORS.selected;
+            else if (this.state[row * this.width + col]) fill = COLORS.found;
+
+            ctx.fillStyle = fill;
+            ctx.fillRect(x, y, size, size);
+            ctx.strokeStyle = COLORS.line;
+            ctx.strokeRect(x + 0.5, y + 0.5, size - 1, size - 1);
+            ctx.fillStyle = fill === COLORS.background ? COLORS.letter : COLORS.activeLetter;
+            ctx.fillText(this.rows[row][col], x + size / 2, y + size / 2 + 1);
+        }
+
+        cellAt(event) {
+            const bounds = this.canvas.getBoundingClientRect();
+            const col = Math.floor((event.clientX - bounds.left) / this.cell);
+            const row = Math.floor((event.clientY - bounds.top) / this.cell);
+            if (row < 0 || col < 0 || row >= this.height || col >= this.width) return null;
+            return [row, col];
+        }
+
+        // Cells from the start cell to [row, col], or null if they are not
+        // on one of the eight straight lines
+        lineTo(row, col) {
+            const [startRow, startCol] = this.start;
+            const rowDiff = row - startRow;
+            const colDiff = col - startCol;
+            if (rowDiff !== 0 && colDiff !== 0 && Math.abs(rowDiff) !== Math.abs(colDiff)) {
+                return null;
+            }
+            const length = Math.max(Math.abs(rowDiff), Math.abs(colDiff));
+            const dr = Math.sign(rowDiff);
+            const dc = Math.sign(colDiff);
+            const cells = [];
+            for (let i = 0; i <= length; i++) {
+                cells.push([startRow + i * dr, startCol + i * dc]);
+            }
+            return cells;
+        }
+
+        setSelection(cells) {
+            const previous = this.selection;
+            this.selection = cells;
+            previous.forEach(([row, col]) => this.drawCell(row, col));
+            cells.forEach(([row, col]) => this.drawCell(row, col, true));
+        }
+
+        pointerDown(event) {
+            if (!this.enabled) return;
+            const cell = this.cellAt(event);
+            if (!cell) return;
+            event.preventDefault();
+            this.canvas.setPointerCapture(event.pointerId);
+            this.start = cell;
+            this.setSelection([cell]);
+        }
+
+        pointerMove(event) {
+            if (!this.start) return;
+            const cell = this.cellAt(event);
+            if (!cell) return;
+            const line = this.lineTo(cell[0], cell[1]);
+            if (line) this.setSelection(line);
+        }
+
+        pointerUp() {
+            if (!this.start) return;
+            const cells = this.selection;
+            this.start = null;
+            const word = cells.map(([row, col]) => this.rows[row][col]).join('');
+            if (cells.length > 1 && this.onSelect(word, cells)) {
+                cells.forEach(([row, col]) => { this.state[row * this.width + col] = 1; });
+            }
+            this.setSelection([]);
+        }
+
+        cancel() {
+            this.start = null;
+            this.setSelection([]);
+        }
+
+        reset() {
+            this.state.fill(0);
+            this.selection = [];
+            this.start = null;
+            this.drawAll();
+        }
+    }
+
+    window.CanvasGrid = CanvasGrid;
+})();
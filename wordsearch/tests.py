@@ -1,3 +1,1198 @@
-from django.test import TestCase
+import hashlib
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from PIL import Image
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import engine, levelpack, playcount
+from .batch import generate_from_job
+from .dictionary import Dictionary, DictionaryError, write_dictionary
+from .fields import PackedGrid, PackedGridField
+from .jobs import (
+    claim_job,
+    claim_jobs,
+    enqueue_puzzle,
+    finish_job,
+    puzzle_spec,
+    requeue_stale_jobs,
+    run_job,
+)
+from .leaderboard import cache_key, record_completion, recount_user, top_players
+from .levels import (
+    LEVEL_GRID_SIZE,
+    LEVEL_GROWTH_START,
+    MAX_LEVEL_GRID_SIZE,
+    VOCABULARY,
+    WORD_LISTS,
+    generate_random_puzzle,
+    get_level_puzzle,
+    letter_model,
+    level_grid_size,
+    level_solution,
+    parse_found_words,
+    verify_solution,
+)
+from .metrics import DIFFICULTY_TARGETS, difficulty_features, difficulty_target
+from .models import LeaderboardEntry, PuzzleJob, UserProgress, WordSearchAttempt, WordSearchPuzzle
+from .pagination import keyset_page
+from .progress import get_progress, level_unlocked, record_level
+from .recipes import RecipeError, generate_from_recipe, generate_puzzle, new_recipe, rebuild_puzzle
+from .render import cell_size_for, print_data, render_page
+from .serializers import WordSearchPuzzleSerializer
+from .solver import WordSolver, locate_words, solve
+from .throttling import TokenBucket
+from .thumbnails import THUMBNAIL_CELL_SIZE, THUMBNAIL_CELLS, thumbnail_path
+
+
+def random_words(rng, count, shortest=5, longest=15):
+    """Return ``count`` random upper-case words."""
+    return [
+        ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(rng.randrange(shortest, longest)))
+        for _ in range(count)
+    ]
+
+
+class BacktrackingBudgetTests(SimpleTestCase):
+    """The backtracking search stops as soon as its budget runs out."""
+
+    def test_no_candidate_tried_after_deadline(self):
+        rng = random.Random(1)
+        words = random_words(rng, 60)
+        ranked = mock.Mock(wraps=engine.ranked_placements)
+        clock = iter(range(1000))
+        # Every clock read is a second later, so the first check after the
+        # start is already past a half-second budget
+        with mock.patch.object(engine, 'ranked_placements', ranked), \
+                mock.patch.object(engine.time, 'monotonic', lambda: next(clock)):
+            result = engine.generate_grid_backtracking(words, 40, rng=random.Random(2), time_budget=0.5)
+        self.assertEqual(ranked.call_count, 1)
+        self.assertEqual(len(result['words']) + len(result['unplaced']), len(words))
+
+    def test_overrun_is_bounded(self):
+        rng = random.Random(1)
+        words = random_words(rng, 300)
+        # Warm the candidate tables, so only the search itself is timed
+        engine.generate_grid_backtracking(words, 200, rng=random.Random(2), time_budget=0)
+        started = time.monotonic()
+        engine.generate_grid_backtracking(words, 200, rng=random.Random(2), time_budget=0.5)
+        self.assertLess(time.monotonic() - started, 1.5)
+
+
+class GeneratorStatsTests(SimpleTestCase):
+    """Generators report their work to ``generator_stats``."""
+
+    def setUp(self):
+        engine.generator_stats.reset()
+
+    def test_counts_words_and_failures(self):
+        words = ['ALPHA', 'BRAVO', 'CHARLIE', 'TOOLONGFORTHISGRID']
+        result = engine.generate_grid(words, 8, rng=random.Random(1))
+        stats = engine.generator_stats.as_dict()
+        self.assertEqual((stats['grids'], stats['words']), (1, 4))
+        self.assertEqual(stats['failures'], len(words) - len(result['placed_words']))
+        self.assertGreaterEqual(stats['attempts'], len(result['placed_words']))
+        self.assertGreater(stats['fill_seconds'], 0)
+
+    def test_reset(self):
+        engine.generate_grid(['ALPHA'], 8, rng=random.Random(1))
+        engine.generator_stats.reset()
+        self.assertEqual(set(engine.generator_stats.as_dict().values()), {0})
+
+
+class BenchmarkGeneratorTests(SimpleTestCase):
+    """benchmark_generator writes a baseline and compares against one."""
+
+    options = {
+        'generators': ['engine'], 'sizes': [10], 'word_counts': [5], 'lengths': ['3-5'],
+        'levels': [1], 'repeat': 2,
+    }
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baseline = os.path.join(directory.name, 'baseline.json')
+
+    def test_baseline_round_trip(self):
+        call_command('benchmark_generator', output=self.baseline, stdout=StringIO(), **self.options)
+        with open(self.baseline, encoding='utf-8') as baseline_file:
+            cases = json.load(baseline_file)['cases']
+        self.assertEqual(sorted(cases), ['engine 10x10 5 words 3-5', 'level 1 (20x20)'])
+        for result in cases.values():
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertTrue(0 <= result['unplaced_rate'] <= 1)
+
+    def test_regression_fails_comparison(self):
+        call_command('benchmark_generator', output=self.baseline, stdout=StringIO(), **self.options)
+        with open(self.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        for result in baseline['cases'].values():
+            result['p50_ms'] = result['p99_ms'] = result['mean_ms'] = 0.0
+        with open(self.baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(baseline, baseline_file)
+        with self.assertRaisesMessage(CommandError, 'Regressions against'):
+            call_command('benchmark_generator', compare=self.baseline, stdout=StringIO(), **self.options)
+
+
+def occurrences(rows, word):
+    """Return how many runs of cells of ``rows`` read ``word``, in either direction."""
+    size = len(rows)
+    runs = set()
+    for row in range(size):
+        for col in range(size):
+            for dr, dc in engine.DIRECTIONS:
+                end_row, end_col = row + (len(word) - 1) * dr, col + (len(word) - 1) * dc
+                if not (0 <= end_row < size and 0 <= end_col < size):
+                    continue
+                if all(rows[row + i * dr][col + i * dc] == letter for i, letter in enumerate(word)):
+                    # A palindrome reads both ways along the same cells
+                    runs.add(frozenset((row + i * dr, col + i * dc) for i in range(len(word))))
+    return len(runs)
+
+
+class PlacementTests(SimpleTestCase):
+    """Placed words spell themselves and the filler hides no second copy."""
+
+    def assert_placements(self, result, grid_size):
+        rows = [''.join(row) for row in result['grid']]
+        self.assertEqual(len(rows), grid_size)
+        self.assertTrue(all(len(row) == grid_size for row in rows))
+        for item in result['placed_words']:
+            with self.subTest(word=item['word']):
+                dr, dc = item['direction']
+                start = item['positions'][0]
+                self.assertEqual(
+                    [(cell['row'], cell['col']) for cell in item['positions']],
+                    [(start['row'] + i * dr, start['col'] + i * dc) for i in range(len(item['word']))]
+                )
+                self.assertEqual(''.join(rows[cell['row']][cell['col']] for cell in item['positions']), item['word'])
+                self.assertEqual(occurrences(rows, item['word']), 1)
+
+    def test_generate_grid(self):
+        for seed in range(5):
+            words = random_words(random.Random(seed), 12, 3, 8)
+            result = engine.generate_grid(words, 15, rng=random.Random(seed),
+                                          letter_model=letter_model(), decoys=len(words))
+            self.assert_placements(result, 15)
+
+    def test_generate_grid_backtracking(self):
+        for seed in range(5):
+            words = random_words(random.Random(seed), 20, 3, 10)
+            result = engine.generate_grid_backtracking(words, 15, rng=random.Random(seed), decoys=len(words))
+            self.assertEqual(sorted(result['words'] + result['unplaced']), sorted(words))
+            self.assert_placements(result, 15)
+
+    def test_levels(self):
+        for level in (1, 6, 16, 26):
+            with self.subTest(level=level):
+                data = generate_random_puzzle(level)
+                self.assert_placements(
+                    {'grid': data['grid_data'], 'words': data['words_list'], 'placed_words': data['placed_words']},
+                    data['grid_size']
+                )
+
+
+class RepairFillTests(SimpleTestCase):
+    """Copies the filler cannot re-roll away are moved onto or dropped."""
+
+    def place(self, grid_size, words):
+        flat_grid = np.zeros(grid_size * grid_size, dtype=np.uint8)
+        placed_words = []
+        for word, row, col in words:
+            flat_grid[row * grid_size + col:row * grid_size + col + len(word)] = engine.encode_word(word)
+            placed_words.append({
+                'word': word,
+                'direction': (0, 1),
+                'positions': [{'row': row, 'col': col + i} for i in range(len(word))],
+            })
+        filler = flat_grid == engine.EMPTY
+        engine.fill_empty(flat_grid, random.Random(0))
+        return flat_grid, placed_words, filler
+
+    def test_word_inside_longer_word_moves_onto_it(self):
+        flat_grid, placed_words, filler = self.place(12, [('CATALOG', 0, 0), ('CAT', 5, 0)])
+        removed = engine.repair_fill(flat_grid, 12, placed_words, filler, random.Random(0))
+        self.assertEqual(removed, [])
+        self.assertEqual([(cell['row'], cell['col']) for cell in placed_words[1]['positions']],
+                         [(0, 0), (0, 1), (0, 2)])
+        self.assertTrue(filler[5 * 12:5 * 12 + 3].all())
+        rows = [''.join(row) for row in engine.grid_to_rows(flat_grid, 12)]
+        self.assertEqual(occurrences(rows, 'CAT'), 1)
+
+    def test_word_with_two_fixed_copies_is_dropped(self):
+        flat_grid, placed_words, filler = self.place(
+            12, [('CATALOG', 0, 0), ('BOBCAT', 3, 0), ('CAT', 6, 0)]
+        )
+        removed = engine.repair_fill(flat_grid, 12, placed_words, filler, random.Random(0))
+        self.assertEqual(removed, ['CAT'])
+        self.assertEqual([item['word'] for item in placed_words], ['CATALOG', 'BOBCAT'])
+
+
+# sha256 (first 16 hex digits) of a few levels' grid and placements for each
+# GENERATOR_VERSION; bumping the version means adding its row here
+LEVEL_FINGERPRINTS = {
+    3: {
+        1: '6856ca83da5efbe9',
+        6: '7de06d56761e00d8',
+        16: '8f569c3ee077a07e',
+        26: 'bf04181bce690b31',
+        60: 'b51ad8ddf472517f',
+    },
+    4: {
+        1: '6856ca83da5efbe9',
+        6: '7de06d56761e00d8',
+        16: '8f569c3ee077a07e',
+        26: 'bf04181bce690b31',
+        60: 'b51ad8ddf472517f',
+    },
+    5: {
+        1: '6856ca83da5efbe9',
+        6: '7de06d56761e00d8',
+        16: '8f569c3ee077a07e',
+        26: 'bf04181bce690b31',
+        60: 'b51ad8ddf472517f',
+        500: '04c3c7e4a699e868',
+    },
+}
+
+
+def level_fingerprint(level):
+    data = generate_random_puzzle(level)
+    grid = [''.join(row) for row in data['grid_data']]
+    return hashlib.sha256(json.dumps([grid, data['placed_words']]).encode()).hexdigest()[:16]
+
+
+class LevelDeterminismTests(SimpleTestCase):
+    """Level output only changes together with GENERATOR_VERSION."""
+
+    def test_levels_match_generator_version(self):
+        self.assertIn(engine.GENERATOR_VERSION, LEVEL_FINGERPRINTS,
+                      'GENERATOR_VERSION was bumped without pinning its levels')
+        for level, fingerprint in LEVEL_FINGERPRINTS[engine.GENERATOR_VERSION].items():
+            with self.subTest(level=level):
+                self.assertEqual(level_fingerprint(level), fingerprint,
+                                 'level output changed; bump GENERATOR_VERSION')
+
+    def test_levels_are_repeatable(self):
+        self.assertEqual(generate_random_puzzle(26), generate_random_puzzle(26))
+
+
+class LevelSizeTests(SimpleTestCase):
+    """Level grids grow only as far as the vocabulary can fill them."""
+
+    def test_growth_stops_at_max_size(self):
+        self.assertEqual(level_grid_size(LEVEL_GROWTH_START), LEVEL_GRID_SIZE)
+        self.assertEqual(level_grid_size(100000), MAX_LEVEL_GRID_SIZE)
+
+    def test_biggest_level_keeps_word_density(self):
+        shortest = min(map(len, WORD_LISTS))
+        wanted = shortest * MAX_LEVEL_GRID_SIZE * MAX_LEVEL_GRID_SIZE // (LEVEL_GRID_SIZE * LEVEL_GRID_SIZE)
+        longest = max(map(len, WORD_LISTS))
+        self.assertLessEqual(longest * MAX_LEVEL_GRID_SIZE ** 2 // LEVEL_GRID_SIZE ** 2, len(VOCABULARY))
+        data = generate_random_puzzle(100000)
+        self.assertEqual(data['grid_size'], MAX_LEVEL_GRID_SIZE)
+        self.assertGreaterEqual(len(data['words_list']), wanted * 9 // 10)
+
+
+def blank_grid(size):
+    return [['.'] * size for _ in range(size)]
+
+
+def write_word(grid, word, row, col, direction):
+    dr, dc = direction
+    for i, letter in enumerate(word):
+        grid[row + i * dr][col + i * dc] = letter
+
+
+class SolverTests(SimpleTestCase):
+    """The Aho-Corasick solver finds every occurrence in every direction."""
+
+    def occurrences(self, grid, words):
+        return sorted((item['word'], item['start'], item['end'], item['direction']) for item in solve(grid, words))
+
+    def test_all_eight_directions(self):
+        grid = blank_grid(9)
+        for direction in engine.DIRECTIONS:
+            write_word(grid, 'CAT', 4, 4, direction)
+        self.assertEqual(
+            self.occurrences(grid, ['cat']),
+            sorted(('CAT', (4, 4), (4 + 2 * dr, 4 + 2 * dc), (dr, dc)) for dr, dc in engine.DIRECTIONS)
+        )
+
+    def test_palindrome_is_found_once(self):
+        grid = blank_grid(5)
+        write_word(grid, 'LEVEL', 2, 0, (0, 1))
+        self.assertEqual(self.occurrences(grid, ['LEVEL']), [('LEVEL', (2, 0), (2, 4), (0, 1))])
+
+    def test_overlapping_words(self):
+        grid = blank_grid(6)
+        write_word(grid, 'USHERS', 0, 0, (0, 1))
+        write_word(grid, 'SHE', 3, 3, (-1, 0))
+        self.assertEqual(self.occurrences(grid, ['HE', 'SHE', 'HERS']), [
+            ('HE', (0, 2), (0, 3), (0, 1)),
+            # The H of USHERS and the E of the vertical SHE
+            ('HE', (0, 2), (1, 3), (1, 1)),
+            ('HE', (2, 3), (1, 3), (-1, 0)),
+            ('HERS', (0, 2), (0, 5), (0, 1)),
+            ('SHE', (0, 1), (0, 3), (0, 1)),
+            ('SHE', (3, 3), (1, 3), (-1, 0)),
+        ])
+
+    def test_missing_words(self):
+        grid = blank_grid(5)
+        write_word(grid, 'DOG', 1, 1, (1, 1))
+        self.assertEqual(WordSolver(['DOG', 'CAT', 'GOD']).missing_words(grid), ['CAT'])
+
+    def test_locate_words_falls_back_to_the_solver(self):
+        grid = blank_grid(5)
+        write_word(grid, 'DOG', 0, 4, (1, -1))
+        located = locate_words(grid, [
+            {'word': 'dog', 'start_row': 0, 'start_col': 0, 'direction': 'diagonal'},
+            {'word': 'CAT', 'start_row': 0, 'start_col': 0, 'direction': [0, 1]},
+        ])
+        self.assertEqual(located, {'DOG': ((0, 4), (2, 2))})
+
+    def test_serializer_rejects_words_not_in_grid(self):
+        grid = blank_grid(5)
+        write_word(grid, 'DOG', 0, 0, (0, 1))
+        words = [{'word': word, 'start_row': 0, 'start_col': 0, 'direction': [0, 1]} for word in ('DOG', 'CAT')]
+        serializer = WordSearchPuzzleSerializer(data={
+            'title': 'Pets', 'width': 5, 'height': 5, 'difficulty': 'easy',
+            'grid_data': grid, 'words_data': words,
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('Words not found in the grid: CAT', str(serializer.errors['words_data']))
+
+        serializer = WordSearchPuzzleSerializer(data={
+            'title': 'Pets', 'width': 5, 'height': 5, 'difficulty': 'easy',
+            'grid_data': grid, 'words_data': words[:1],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class VerifySolutionTests(SimpleTestCase):
+    """Level completions are checked against the level's placements."""
+
+    def found(self, level, reverse=()):
+        answers = []
+        for item in generate_random_puzzle(level)['placed_words']:
+            start, end = item['positions'][0], item['positions'][-1]
+            if item['word'] in reverse:
+                start, end = end, start
+            answers.append({'word': item['word'].lower(), 'start': [start['row'], start['col']],
+                            'end': [end['row'], end['col']]})
+        return answers
+
+    def test_every_word_forward(self):
+        self.assertTrue(verify_solution(1, parse_found_words(self.found(1))))
+
+    def test_words_selected_backwards(self):
+        words = generate_random_puzzle(1)['words_list']
+        self.assertTrue(verify_solution(1, parse_found_words(self.found(1, reverse=words[::2]))))
+
+    def test_partial_answer_is_rejected(self):
+        self.assertFalse(verify_solution(1, parse_found_words(self.found(1)[1:])))
+
+    def test_wrong_cells_are_rejected(self):
+        found = self.found(1)
+        found[0]['end'] = found[0]['start']
+        self.assertFalse(verify_solution(1, parse_found_words(found)))
+
+    def test_repeated_word_does_not_stand_in_for_another(self):
+        found = self.found(1)
+        self.assertFalse(verify_solution(1, parse_found_words(found[1:] + found[1:2])))
+
+    def test_malformed_found_words(self):
+        for found in ('[]', {'word': 'API'}, [{'word': 'API', 'start': [0]}], [{'word': 'API'}]):
+            with self.subTest(found=found):
+                self.assertRaises(ValueError, parse_found_words, found)
+
+
+class LevelPackTests(SimpleTestCase):
+    """A built level pack reads back as the generator's levels."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'levels.pack')
+        call_command('build_level_pack', levels=17, workers=1, output=cls.path, stdout=StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.pack = levelpack.LevelPack(self.path)
+        self.addCleanup(self.pack.close)
+        # Serve this pack as if it were the configured one
+        patcher = mock.patch.multiple(levelpack, _pack=self.pack, _pack_loaded=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_levels_round_trip(self):
+        self.assertEqual(len(self.pack), 17)
+        self.assertTrue(self.pack.is_current)
+        for level in (1, 6, 16, 17):
+            with self.subTest(level=level):
+                packed = self.pack.level_data(level)
+                generated = generate_random_puzzle(level)
+                for field in ('title', 'difficulty', 'grid_size', 'words_list', 'grid_data'):
+                    self.assertEqual(packed[field], generated[field])
+                self.assertEqual(
+                    [(item['word'], item['positions']) for item in packed['placed_words']],
+                    [(item['word'], item['positions']) for item in generated['placed_words']]
+                )
+
+    def test_pack_levels_are_cached(self):
+        puzzle = get_level_puzzle(6)
+        self.assertIs(get_level_puzzle(6), puzzle)
+        self.assertEqual(list(puzzle.grid_data), [''.join(row) for row in generate_random_puzzle(6)['grid_data']])
+        self.assertEqual(level_solution(6), puzzle.solution)
+
+    def test_verify_only(self):
+        out = StringIO()
+        call_command('build_level_pack', verify_only=True, output=self.path, stdout=out)
+        self.assertIn('Verified 17 levels', out.getvalue())
+
+    def test_level_outside_pack_is_generated(self):
+        self.assertNotIn(18, self.pack)
+        self.assertEqual(get_level_puzzle(18).title, 'Level 18')
+
+
+class DifficultyFeatureTests(SimpleTestCase):
+    """Difficulty features are computed from the grid and placements."""
+
+    def test_near_miss_baseline_counts_every_letter_pair(self):
+        # Neighbouring letters (codes 1, 2, 4 and 8) share no bits, so pairs
+        # must be counted by letter, not by code
+        grid = [''.join('ABDH'[2 * (row % 2) + col % 2] for col in range(10)) for row in range(10)]
+        placed = [{'word': 'ZZ', 'positions': [{'row': 0, 'col': 0}, {'row': 0, 'col': 1}], 'direction': (0, 1)}]
+        self.assertEqual(difficulty_features(grid, placed, 10)['near_miss_rate'], 0.0)
+
+    def test_uniform_filler_scores_near_baseline(self):
+        rng = random.Random(5)
+        rates = []
+        for _ in range(100):
+            result = engine.generate_grid(random_words(rng, 8, 3, 8), 20, rng=rng)
+            rates.append(difficulty_features(result['grid'], result['placed_words'], 20)['near_miss_rate'])
+        # Uniform filler scores 1 / NEAR_MISS_SCALE, plus the words' own letters
+        self.assertAlmostEqual(sum(rates) / len(rates), 0.5, delta=0.15)
+
+    def test_features_stay_in_range(self):
+        result = engine.generate_grid(random_words(random.Random(4), 12, 3, 8), 20, rng=random.Random(4))
+        features = difficulty_features(result['grid'], result['placed_words'], 20)
+        for name, value in features.items():
+            with self.subTest(feature=name):
+                self.assertTrue(0 <= value <= 1)
+
+
+class DictionaryTests(SimpleTestCase):
+    """A built dictionary index answers lookups by category, length and letters."""
+
+    CATEGORIES = {
+        'animals': ['cat', 'Cattle', 'catfish', 'dog', 'horse', 'caterpillar', 'emu', 'rock-hyrax'],
+        'food': ['cake', 'carrot', 'cat', 'bread', 'crêpe', 'rice'],
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, 'words.idx')
+        cls.written = write_dictionary(path, cls.CATEGORIES)
+        cls.dictionary = Dictionary(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dictionary.close()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def test_build(self):
+        # CAT is in both categories but stored once; two words aren't A-Z
+        self.assertEqual(self.written, (11, 2))
+        self.assertEqual(len(self.dictionary), 11)
+        self.assertEqual(self.dictionary.categories, ['animals', 'food'])
+        self.assertEqual(self.dictionary.max_length, len('CATERPILLAR'))
+
+    def test_membership(self):
+        for word in ('CAT', 'cattle', ' Rice ', 'caterpillar'):
+            with self.subTest(word=word):
+                self.assertIn(word, self.dictionary)
+        for word in ('CA', 'CATS', 'rock-hyrax', 'CATERPILLARS', '', None):
+            with self.subTest(word=word):
+                self.assertNotIn(word, self.dictionary)
+
+    def test_count_and_sample_by_category_and_length(self):
+        self.assertEqual(self.dictionary.count('animals'), 7)
+        self.assertEqual(self.dictionary.count('food', min_length=4, max_length=5), 3)
+        self.assertEqual(self.dictionary.count(min_length=12), 0)
+        words = self.dictionary.sample(random.Random(1), 10, 'animals', min_length=5, max_length=7)
+        self.assertEqual(sorted(words), ['CATFISH', 'CATTLE', 'HORSE'])
+        self.assertEqual(len(self.dictionary.sample(random.Random(1), 2, 'food')), 2)
+        with self.assertRaises(DictionaryError):
+            self.dictionary.count('plants')
+
+    def test_prefix_filter(self):
+        self.assertEqual(self.dictionary.words_with_prefix('cat'),
+                         ['CAT', 'CATTLE', 'CATFISH', 'CATERPILLAR'])
+        self.assertEqual(self.dictionary.words_with_prefix('CAT', 'animals', min_length=4, max_length=7),
+                         ['CATTLE', 'CATFISH'])
+        self.assertEqual(self.dictionary.words_with_prefix('ca', 'food'), ['CAT', 'CAKE', 'CARROT'])
+        self.assertEqual(self.dictionary.words_with_prefix('', 'food', max_length=3), ['CAT'])
+        self.assertEqual(self.dictionary.words_with_prefix('catz'), [])
+        self.assertEqual(self.dictionary.words_with_prefix('c-a'), [])
+
+    def test_letter_filter(self):
+        self.assertEqual(self.dictionary.words_within('TACEKL'), ['CAT', 'CAKE', 'CATTLE'])
+        self.assertEqual(self.dictionary.words_within('TACEKL', 'animals', min_length=4), ['CATTLE'])
+
+    def test_malformed_index(self):
+        path = os.path.join(self.directory.name, 'truncated.idx')
+        with open(self.dictionary.path, 'rb') as index_file, open(path, 'wb') as truncated:
+            truncated.write(index_file.read()[:-3])
+        with self.assertRaises(DictionaryError):
+            Dictionary(path)
+        with self.assertRaises(DictionaryError):
+            Dictionary(os.path.join(self.directory.name, 'missing.idx'))
+
+    def test_build_dictionary_command(self):
+        words_path = os.path.join(self.directory.name, 'birds.txt')
+        with open(words_path, 'w', encoding='utf-8') as word_file:
+            word_file.write('owl\nrobin\nkestrel\nox\n')
+        output = os.path.join(self.directory.name, 'birds.idx')
+        out = StringIO()
+        call_command('build_dictionary', words_path, output=output, max_length=5, stdout=out)
+        self.assertIn('Wrote 2 words', out.getvalue())
+        dictionary = Dictionary(output)
+        self.addCleanup(dictionary.close)
+        self.assertEqual(dictionary.words_with_prefix('', 'birds'), ['OWL', 'ROBIN'])
+
+
+class GeneratePuzzlesSpecTests(TestCase):
+    """generate_puzzles rejects a bad target difficulty before inserting anything."""
+
+    def setUp(self):
+        User.objects.create_user('admin')
+        spec_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spec_dir.cleanup)
+        self.spec_file = os.path.join(spec_dir.name, 'specs.jsonl')
+
+    def run_specs(self, *specs):
+        with open(self.spec_file, 'w', encoding='utf-8') as spec_file:
+            spec_file.write('\n'.join(json.dumps(spec) for spec in specs))
+        call_command('generate_puzzles', self.spec_file, workers=1, stdout=StringIO())
+
+    def test_bad_targets_are_rejected_up_front(self):
+        words = ['PYTHON', 'DJANGO', 'CODE']
+        with self.assertRaises(CommandError) as raised:
+            self.run_specs(
+                {'words': words, 'grid_size': 10, 'target_difficulty': 'hard'},
+                {'words': words, 'grid_size': 10, 'target_difficulty': 'brutal'},
+                {'words': words, 'grid_size': 10, 'target_difficulty': 2.5},
+                {'words': words, 'grid_size': 10, 'target_difficulty': 0.5, 'candidates': 'many'},
+            )
+        message = str(raised.exception)
+        self.assertIn('Line 2: unknown target difficulty "brutal"', message)
+        self.assertIn('Line 3: target difficulty must be', message)
+        self.assertIn('Line 4: "candidates"', message)
+        self.assertNotIn('Line 1', message)
+        self.assertFalse(WordSearchPuzzle.objects.exists())
+
+    def test_label_and_score_targets_generate(self):
+        words = ['PYTHON', 'DJANGO', 'CODE']
+        self.run_specs(
+            {'words': words, 'grid_size': 10, 'target_difficulty': 'hard', 'candidates': 2},
+            {'words': words, 'grid_size': 10, 'target_difficulty': 0.7, 'candidates': 2},
+        )
+        self.assertEqual(WordSearchPuzzle.objects.count(), 2)
+
+    def test_difficulty_target(self):
+        self.assertEqual(difficulty_target('easy'), DIFFICULTY_TARGETS['easy'])
+        self.assertEqual(difficulty_target(1), 1.0)
+        for target in ('brutal', -0.1, 1.5, True, [0.5]):
+            with self.subTest(target=target), self.assertRaises(ValueError):
+                difficulty_target(target)
+
+
+class PackedGridTests(SimpleTestCase):
+    """Grids survive every form the field stores them in."""
+
+    rows = ['ABCDE', 'FGHIJ', 'KLMNO']
+
+    def test_bytes_round_trip(self):
+        grid = PackedGrid.from_rows([list(row) for row in self.rows])
+        self.assertEqual(PackedGrid.from_bytes(grid.to_bytes()), grid)
+        self.assertEqual(grid.rows, self.rows)
+        self.assertEqual(grid.to_list(), [list(row) for row in self.rows])
+        self.assertEqual((len(grid), grid[1][2], grid[-1]), (3, 'H', 'KLMNO'))
+        self.assertEqual(grid, self.rows)
+
+    def test_field_round_trip(self):
+        field = PackedGridField()
+        stored = field.get_prep_value([list(row) for row in self.rows])
+        self.assertEqual(field.from_db_value(stored, None, None).rows, self.rows)
+        self.assertIsNone(field.get_prep_value([]))
+        self.assertIsNone(field.from_db_value(None, None, None))
+
+    def test_serialized_round_trip(self):
+        puzzle = WordSearchPuzzle(grid_data=self.rows)
+        field = WordSearchPuzzle._meta.get_field('grid_data')
+        self.assertEqual(field.to_python(field.value_to_string(puzzle)), puzzle.grid_data)
+
+    def test_ragged_rows_are_rejected(self):
+        self.assertRaises(ValueError, PackedGrid.from_rows, ['ABC', 'DE'])
+        self.assertRaises(ValueError, PackedGrid.from_bytes, b'\x01')
+
+
+class RecipeTests(TestCase):
+    """A recipe rebuilds exactly the puzzle it was made from."""
+
+    words = ['OCEAN', 'MOUNTAIN', 'FOREST', 'RIVER', 'BEACH', 'VALLEY', 'DESERT', 'LAKE']
+
+    def spec(self, difficulty):
+        return {'storage': 'recipe', 'words': self.words, 'grid_size': 15, 'difficulty': difficulty,
+                'candidates': 2, 'time_budget': engine.DEFAULT_TIME_BUDGET}
+
+    def test_rebuild_keeps_the_search_result(self):
+        for difficulty in ('easy', 'hard'):
+            with self.subTest(difficulty=difficulty):
+                recipe = new_recipe(self.words, 15, difficulty, seed=11)
+                searched = generate_puzzle(self.words, 15, difficulty, rng=random.Random(11))
+                rebuilt = generate_from_recipe(recipe)
+                self.assertEqual(rebuilt['placed_words'], searched['placed_words'])
+                self.assertEqual(rebuilt['decoys'], searched['decoys'])
+                self.assertEqual(rebuilt, generate_from_recipe(json.loads(json.dumps(recipe))))
+
+    def test_stored_puzzle_matches_generated(self):
+        user = User.objects.create_user('maker')
+        for difficulty in ('easy', 'hard'):
+            with self.subTest(difficulty=difficulty):
+                # The grid the job hands over (for the thumbnail) is the one
+                # every later read of the stored recipe rebuilds
+                generated = generate_from_job(self.spec(difficulty))
+                puzzle, = WordSearchPuzzle.objects.bulk_create(
+                    [WordSearchPuzzle(title=difficulty, created_by=user, recipe=generated['recipe'])]
+                )
+                stored = WordSearchPuzzle.objects.get(pk=puzzle.pk)
+                self.assertEqual(stored.grid_data, generated['grid_data'])
+                self.assertEqual([item['word'] for item in stored.words_data], generated['recipe']['words'])
+
+    def test_other_generator_version_is_refused(self):
+        recipe = new_recipe(self.words, 15, 'medium', seed=11)
+        recipe['version'] = engine.GENERATOR_VERSION - 1
+        self.assertRaises(RecipeError, rebuild_puzzle, recipe)
+
+    def test_damaged_recipe_is_refused(self):
+        recipe = new_recipe(self.words, 15, 'medium', seed=11)
+        recipe['placements'] = recipe['placements'][1:]
+        self.assertRaises(RecipeError, generate_from_recipe, recipe)
+
+
+@override_settings(WORDSEARCH_QUEUE_GENERATION=True)
+class PuzzleJobTests(TestCase):
+    """Generation requests are queued, claimed by one worker and polled for."""
+
+    words = ['PLANE', 'TRAIN', 'BOAT']
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('maker', password='secret')
+        patcher = mock.patch('wordsearch.jobs.get_dictionary', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.spec = puzzle_spec('Trip', 'easy', self.words)
+
+    def test_enqueue(self):
+        job = enqueue_puzzle(self.user, self.spec)
+        self.assertEqual(job.status, PuzzleJob.PENDING)
+        self.assertEqual(PuzzleJob.objects.get().spec, self.spec)
+
+    def test_claim_is_exclusive(self):
+        job = enqueue_puzzle(self.user, self.spec)
+        first, second = PuzzleJob.objects.get(pk=job.pk), PuzzleJob.objects.get(pk=job.pk)
+        self.assertTrue(claim_job(first))
+        self.assertFalse(claim_job(second))
+        self.assertEqual(claim_jobs(10), [])
+        self.assertEqual(PuzzleJob.objects.get().claim, first.claim)
+
+    def test_requeued_claim_cannot_finish(self):
+        job = enqueue_puzzle(self.user, self.spec)
+        claim_job(job)
+        self.assertEqual(requeue_stale_jobs(3600), 0)
+        self.assertEqual(requeue_stale_jobs(0), 1)
+        # The first worker was only slow; the job went to another one
+        retry, = claim_jobs(10)
+        result = generate_from_job(job.spec)
+        self.assertFalse(finish_job(job, result))
+        self.assertTrue(finish_job(retry, result))
+        self.assertEqual(WordSearchPuzzle.objects.count(), 1)
+        self.assertEqual(PuzzleJob.objects.get().status, PuzzleJob.DONE)
+
+    def test_failure_is_recorded(self):
+        job = enqueue_puzzle(self.user, self.spec)
+        with mock.patch('wordsearch.jobs.generate_from_job', side_effect=RuntimeError('out of cells')):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error, job.puzzle), (PuzzleJob.FAILED, 'out of cells', None))
+        self.assertFalse(WordSearchPuzzle.objects.exists())
+
+    def test_api_requires_login(self):
+        for name in ('job-list', 'attempt-list', 'rating-list'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(f'wordsearch:{name}')).status_code, 403)
+
+    def test_api_create_then_poll(self):
+        self.client.login(username='maker', password='secret')
+        response = self.client.post(
+            reverse('wordsearch:wordsearchpuzzle-list'),
+            {'title': 'Trip', 'difficulty': 'easy', 'words': self.words}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], PuzzleJob.PENDING)
+        job_url = response['Location']
+        self.assertEqual(self.client.get(job_url).json()['puzzle'], None)
+
+        run_job(PuzzleJob.objects.get())
+        job = self.client.get(job_url).json()
+        self.assertEqual(job['status'], PuzzleJob.DONE)
+        self.assertEqual(WordSearchPuzzle.objects.get(pk=job['puzzle']).title, 'Trip')
+
+        User.objects.create_user('other', password='secret')
+        self.client.login(username='other', password='secret')
+        self.assertEqual(self.client.get(job_url).status_code, 404)
+
+    # Templates link static files, which have no manifest under test
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_form_create_then_poll(self):
+        self.client.login(username='maker', password='secret')
+        response = self.client.post(
+            reverse('wordsearch:puzzle_create'),
+            {'title': 'Trip', 'difficulty': 'easy', 'words[]': self.words}
+        )
+        self.assertEqual(response.status_code, 202)
+        job = PuzzleJob.objects.get()
+        job_url = reverse('wordsearch:puzzle_job', args=[job.pk])
+        self.assertEqual(self.client.get(job_url).status_code, 202)
+
+        run_job(job)
+        job.refresh_from_db()
+        self.assertRedirects(self.client.get(job_url), reverse('wordsearch:puzzle_detail', args=[job.puzzle_id]),
+                             fetch_redirect_response=False)
+
+
+def make_puzzle(user, words=('PYTHON', 'DJANGO', 'CODE', 'DATA'), grid_size=12, seed=0, **fields):
+    """Save and return a puzzle with a generated grid."""
+    result = engine.generate_grid(list(words), grid_size, rng=random.Random(seed))
+    return WordSearchPuzzle.objects.create(
+        title=fields.pop('title', 'Printable'), created_by=user, width=grid_size, height=grid_size,
+        grid_data=result['grid'], words_data=engine.build_words_data(result['placed_words']), **fields
+    )
+
+
+class PrintRenderTests(TestCase):
+    """Printable pages are served in the asked format and rendered once."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(
+            MEDIA_ROOT=os.path.join(directory.name, 'media'),
+            WORDSEARCH_RENDER_CACHE_DIR=os.path.join(directory.name, 'renders'),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user('printer', password='secret')
+        self.puzzle = make_puzzle(self.user)
+
+    def print_url(self, fmt):
+        return reverse('wordsearch:puzzle_print', args=[self.puzzle.pk, fmt])
+
+    def test_png_page(self):
+        response = self.client.get(self.print_url('png'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        page = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(page.mode, 'L')
+        self.assertEqual(page.size, render_page(print_data(self.puzzle)).size)
+        # The grid is drawn at the cell size for its side
+        self.assertGreaterEqual(page.width, 12 * cell_size_for(12))
+
+    def test_pdf_page(self):
+        response = self.client.get(self.print_url('pdf'))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(self.client.get(self.print_url('svg')).status_code, 404)
+
+    def test_answer_key_page(self):
+        self.client.login(username='printer', password='secret')
+        plain = self.client.get(self.print_url('png'))
+        answers = self.client.get(self.print_url('png'), {'answers': '1'})
+        self.assertNotEqual(plain['ETag'], answers['ETag'])
+        self.assertEqual(Image.open(io.BytesIO(b''.join(answers.streaming_content))).mode, 'RGB')
+
+    def test_answer_key_is_for_creator_and_staff(self):
+        url = self.print_url('png')
+        self.assertEqual(self.client.get(url, {'answers': '1'}).status_code, 403)
+        User.objects.create_user('player', password='secret')
+        User.objects.create_user('editor', password='secret', is_staff=True)
+        for username, status in (('player', 403), ('editor', 200), ('printer', 200)):
+            with self.subTest(username=username):
+                self.client.login(username=username, password='secret')
+                response = self.client.get(url, {'answers': '1'})
+                self.assertEqual(response.status_code, status)
+                response.close()
+
+    def test_cached_page_is_reused(self):
+        with mock.patch('wordsearch.render.render_page', wraps=render_page) as rendered:
+            first = self.client.get(self.print_url('png'))
+            second = self.client.get(self.print_url('png'))
+            not_modified = self.client.get(self.print_url('png'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(rendered.call_count, 1)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class ThumbnailTests(TestCase):
+    """List previews are drawn on save, shared by identical corners and served immutable."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media_root = directory.name
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user('lister')
+
+    def test_thumbnail_drawn_on_save(self):
+        for grid_size, side in ((8, 8), (20, THUMBNAIL_CELLS)):
+            with self.subTest(grid_size=grid_size):
+                puzzle = make_puzzle(self.user, grid_size=grid_size)
+                with Image.open(thumbnail_path(self.media_root, puzzle.thumbnail)) as image:
+                    self.assertEqual(image.size, (side * THUMBNAIL_CELL_SIZE, side * THUMBNAIL_CELL_SIZE))
+
+    def test_same_corner_reuses_the_file(self):
+        first = make_puzzle(self.user, grid_size=20)
+        with mock.patch('wordsearch.thumbnails.compose_grid') as compose:
+            second = make_puzzle(self.user, grid_size=20, title='Copy')
+        compose.assert_not_called()
+        self.assertEqual(first.thumbnail, second.thumbnail)
+
+    def test_served_immutable(self):
+        puzzle = make_puzzle(self.user)
+        response = self.client.get(reverse('wordsearch:puzzle_thumbnail', args=[puzzle.thumbnail]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+        missing = reverse('wordsearch:puzzle_thumbnail', args=['0' * 64])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_build_thumbnails_fills_bulk_inserts(self):
+        source = make_puzzle(self.user)
+        WordSearchPuzzle.objects.bulk_create([WordSearchPuzzle(
+            title='Bulk', created_by=self.user, width=12, height=12,
+            grid_data=source.grid_data, words_data=source.words_data
+        )])
+        call_command('build_thumbnails', workers=1, stdout=StringIO())
+        self.assertEqual(WordSearchPuzzle.objects.get(title='Bulk').thumbnail, source.thumbnail)
+
+
+@override_settings(WORDSEARCH_HINT_BURST=2, WORDSEARCH_HINT_RATE=0.5)
+class LevelHintTests(TestCase):
+    """Level hints give a word's first cell, for unlocked levels, rationed per level."""
+
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user('player', password='secret')
+        self.client.login(username='player', password='secret')
+        self.answers = sorted(level_solution(1))
+
+    def hint(self, level=1, found=()):
+        return self.client.post(reverse('wordsearch:level_hint', args=[level]), {'found': json.dumps(list(found))})
+
+    def test_hint_is_first_cell_of_a_missing_word(self):
+        word, start, end = self.answers[0]
+        self.assertEqual(self.hint().json(), {'word': word, 'row': start[0], 'col': start[1]})
+        # Found words are skipped, whatever their case
+        word, start, end = self.answers[1]
+        self.assertEqual(self.hint(found=[self.answers[0][0].lower()]).json(),
+                         {'word': word, 'row': start[0], 'col': start[1]})
+
+    def test_nothing_left_costs_nothing(self):
+        everything = [word for word, start, end in self.answers]
+        for _ in range(3):
+            self.assertEqual(self.hint(found=everything).json(), {'word': None})
+        self.assertEqual(self.hint().status_code, 200)
+
+    def test_hints_are_rationed(self):
+        self.assertEqual(self.hint().status_code, 200)
+        self.assertEqual(self.hint().status_code, 200)
+        response = self.hint()
+        self.assertEqual(response.status_code, 429)
+        # One hint refills every 1 / WORDSEARCH_HINT_RATE seconds
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_locked_and_bad_requests(self):
+        self.assertEqual(self.hint(level=2).status_code, 403)
+        response = self.client.post(reverse('wordsearch:level_hint', args=[1]), {'found': '{"word": 1}'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(reverse('wordsearch:level_hint', args=[1])).status_code, 405)
+
+
+@override_settings(WORDSEARCH_PLAY_COUNT_MAX_STALENESS=60)
+class PlayCountTests(TestCase):
+    """Plays are buffered in the process and added up when flushed."""
+
+    def setUp(self):
+        user = User.objects.create_user('player')
+        self.first, self.second = WordSearchPuzzle.objects.bulk_create(
+            WordSearchPuzzle(title=title, created_by=user) for title in ('First', 'Second')
+        )
+        self.addCleanup(playcount.flush)
+
+    def play_counts(self):
+        return list(WordSearchPuzzle.objects.order_by('pk').values_list('play_count', flat=True))
+
+    def test_flush_writes_buffered_plays(self):
+        for _ in range(3):
+            playcount.record_play(self.first.pk)
+        playcount.record_play(self.second.pk)
+        self.assertEqual(self.play_counts(), [0, 0])
+        self.assertEqual(playcount.pending_plays(self.first.pk), 3)
+
+        self.assertEqual(playcount.flush(), 2)
+        self.assertEqual(self.play_counts(), [3, 1])
+        self.assertEqual(playcount.pending_plays(self.first.pk), 0)
+        self.assertIsNone(playcount._timer)
+        self.assertEqual(playcount.flush(), 0)
+
+    def test_failed_flush_keeps_plays(self):
+        playcount.record_play(self.first.pk, 2)
+        with mock.patch.object(WordSearchPuzzle.objects, 'filter', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, playcount.flush)
+        self.assertEqual(playcount.pending_plays(self.first.pk), 2)
+        playcount.flush()
+        self.assertEqual(self.play_counts(), [2, 0])
+
+    @override_settings(WORDSEARCH_PLAY_COUNT_MAX_STALENESS=0)
+    def test_zero_staleness_writes_through(self):
+        playcount.record_play(self.second.pk)
+        self.assertEqual(self.play_counts(), [0, 1])
+
+
+class TokenBucketTests(SimpleTestCase):
+    """Charges against a TokenBucket are atomic and refused ones cost nothing."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_charges_never_overspend(self):
+        allowance = TokenBucket('test:concurrent', 50, 1 / 60)
+        results = []
+        start = threading.Barrier(20)
+
+        def spend():
+            start.wait()
+            results.extend(allowance.consume(1) for _ in range(10))
+
+        threads = [threading.Thread(target=spend) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(0.0), 50)
+
+    def test_refused_charge_waits_for_refill(self):
+        allowance = TokenBucket('test:refused', 10, 1)
+        with mock.patch('wordsearch.throttling.time.time', return_value=1003.0):
+            self.assertEqual(allowance.consume(8), 0.0)
+            self.assertEqual(allowance.consume(5), 3.0)
+            # The refused tokens were never taken
+            self.assertEqual(allowance.consume(2), 0.0)
+            self.assertEqual(allowance.consume(1), 1.0)
+
+    def test_bucket_refills_at_rate(self):
+        allowance = TokenBucket('test:refill', 10, 2)
+        with mock.patch('wordsearch.throttling.time.time', return_value=1000.0):
+            self.assertEqual(allowance.consume(10), 0.0)
+        # No window boundary: half a second buys exactly one token
+        with mock.patch('wordsearch.throttling.time.time', return_value=1000.5):
+            self.assertEqual(allowance.consume(1), 0.0)
+            self.assertEqual(allowance.consume(1), 0.5)
+        # Oversized charges cost the whole bucket, once it is full again
+        with mock.patch('wordsearch.throttling.time.time', return_value=1003.0):
+            self.assertEqual(allowance.consume(100), 2.5)
+        with mock.patch('wordsearch.throttling.time.time', return_value=1006.0):
+            self.assertEqual(allowance.consume(100), 0.0)
+
+
+def level_answers(level):
+    """Return the ``found`` payload of a full solution of ``level``."""
+    return json.dumps([
+        {'word': item['word'], 'start': [item['positions'][0]['row'], item['positions'][0]['col']],
+         'end': [item['positions'][-1]['row'], item['positions'][-1]['col']]}
+        for item in generate_random_puzzle(level)['placed_words']
+    ])
+
+
+class CompleteLevelTests(TestCase):
+    """A completion counts once, and the leaderboard only hears of committed ones."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret')
+        self.client.login(username='player', password='secret')
+
+    def complete(self, level):
+        return self.client.post(reverse('wordsearch:complete_level'),
+                                {'level': level, 'found': level_answers(level)})
+
+    def test_completion_counts_once(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.complete(1).json(), {'success': True, 'next_level': 2})
+        entry = LeaderboardEntry.objects.get(user=self.user)
+        self.assertEqual((entry.highest_level, entry.completed_count), (1, 1))
+        self.assertTrue(get_progress(self.user).has_completed(1))
+
+    def test_leaderboard_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.complete(1)
+        self.assertFalse(LeaderboardEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(len(callbacks), 1)
+
+    def test_failed_progress_rolls_back_the_flip(self):
+        with mock.patch('wordsearch.views.record_level', side_effect=RuntimeError('database gone')), \
+                self.captureOnCommitCallbacks() as callbacks, self.assertRaises(RuntimeError):
+            self.complete(1)
+        self.assertEqual(callbacks, [])
+        self.assertFalse(WordSearchAttempt.objects.filter(user=self.user, is_completed=True).exists())
+
+
+class ProgressTests(TestCase):
+    """Level progress unlocks in order and stays in step with completed attempts."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('player', password='secret')
+
+    def complete_attempts(self, *levels):
+        for level in levels:
+            puzzle = WordSearchPuzzle.objects.create(
+                id=level, title=f'Level {level}', created_by=self.user, width=20, height=20,
+                grid_data=None, words_data=[]
+            )
+            WordSearchAttempt.objects.create(user=self.user, puzzle=puzzle, is_completed=True)
+
+    def test_levels_unlock_in_order(self):
+        progress = get_progress(self.user)
+        self.assertEqual([level_unlocked(progress, level) for level in (0, 1, 2)], [False, True, False])
+        self.assertTrue(record_level(progress, 1))
+        progress = get_progress(self.user)
+        self.assertEqual([level_unlocked(progress, level) for level in (2, 3)], [True, False])
+
+    def test_out_of_order_completions(self):
+        progress = get_progress(self.user)
+        for level, next_level in ((3, 1), (1, 2), (2, 4)):
+            with self.subTest(level=level):
+                self.assertTrue(record_level(progress, level))
+                self.assertEqual(get_progress(self.user).next_level, next_level)
+        self.assertFalse(record_level(progress, 2))
+        # Levels past the progress bar are kept, but not counted on it
+        self.assertTrue(record_level(progress, UserProgress.PROGRESS_LEVELS + 50))
+        progress = get_progress(self.user)
+        self.assertEqual((progress.next_level, progress.progress_count), (4, 3))
+        self.assertTrue(progress.has_completed(UserProgress.PROGRESS_LEVELS + 50))
+
+    def test_built_from_existing_attempts(self):
+        self.complete_attempts(1, 2, 4)
+        progress = get_progress(self.user)
+        self.assertEqual((progress.next_level, progress.progress_count), (3, 3))
+
+    def test_deleted_attempt_is_recounted(self):
+        self.complete_attempts(1, 2, 4)
+        get_progress(self.user)
+        recount_user(self.user.pk)
+        self.client.login(username='player', password='secret')
+        attempt = WordSearchAttempt.objects.get(user=self.user, puzzle_id=1)
+        response = self.client.delete(reverse('wordsearch:attempt-detail', args=[attempt.pk]))
+        self.assertEqual(response.status_code, 204)
+        progress = get_progress(self.user)
+        self.assertEqual((progress.next_level, progress.progress_count), (1, 2))
+        self.assertFalse(level_unlocked(progress, 2))
+        entry = LeaderboardEntry.objects.get(user=self.user)
+        self.assertEqual((entry.highest_level, entry.completed_count), (4, 2))
+
+
+class LeaderboardCacheTests(TestCase):
+    """A completion is never hidden by a leaderboard computed before it."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_computed_before_a_completion_is_not_served(self):
+        user = User.objects.create_user('ann')
+        # A reader looks the key up, then computes the (still empty) list
+        stale_key = cache_key()
+        with self.captureOnCommitCallbacks(execute=True):
+            record_completion(user.pk, 1)
+        # ...and stores it only after the completion
+        cache.set(stale_key, [], timeout=None)
+        self.assertEqual([player['username'] for player in top_players()], ['ann'])
+
+
+class KeysetPaginationTests(TestCase):
+    """Walking the cursors visits every row once, in order, both ways."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('pager')
+        WordSearchPuzzle.objects.bulk_create(
+            WordSearchPuzzle(title=f'Puzzle {number}', created_by=user) for number in range(23)
+        )
+        # Several puzzles share each timestamp, so ties are broken by id
+        now = timezone.now()
+        for number, puzzle in enumerate(WordSearchPuzzle.objects.order_by('pk')):
+            WordSearchPuzzle.objects.filter(pk=puzzle.pk).update(created_at=now - timedelta(minutes=number // 4))
+        cls.expected = list(WordSearchPuzzle.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def walk(self, cursor, direction):
+        pages = []
+        while True:
+            page = keyset_page(WordSearchPuzzle.objects.all(), 'created_at', cursor, 5)
+            pages.append([puzzle.pk for puzzle in page.items])
+            cursor = getattr(page, direction)
+            if cursor is None:
+                return pages
+
+    def test_forward_then_back(self):
+        forward = self.walk(None, 'next_cursor')
+        self.assertEqual([pk for page in forward for pk in page], self.expected)
+        self.assertEqual([len(page) for page in forward], [5, 5, 5, 5, 3])
+
+        last = keyset_page(WordSearchPuzzle.objects.all(), 'created_at', None, 5)
+        while last.next_cursor:
+            last = keyset_page(WordSearchPuzzle.objects.all(), 'created_at', last.next_cursor, 5)
+        backward = self.walk(last.previous_cursor, 'previous_cursor')
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', 'WzEsICJ4IiwgMV0'):
+            with self.subTest(cursor=cursor):
+                self.assertRaises(ValueError, keyset_page, WordSearchPuzzle.objects.all(), 'created_at', cursor, 5)
@@ -0,0 +1,124 @@
+"""Cost-aware throttling of puzzle generation.
+
+Generation time grows with grid area, word count and word length, so each
+request is charged ``generation_cost`` tokens from a per-user allowance
+kept in the Django cache, instead of counting requests. A user can make
+many small puzzles or an occasional huge one, but not keep the workers
+busy with huge ones. The allowance is a ``TokenBucket`` of
+``WORDSEARCH_THROTTLE_BURST`` tokens refilled at ``WORDSEARCH_THROTTLE_RATE``
+tokens per second. Hints are rationed per attempt by a bucket of their
+own, one token each.
+
+The buckets must be seen by every worker, so they need the shared cache
+(``REDIS_URL``, see settings); with the local-memory fallback each process
+would keep its own.
+"""
+import math
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+def generation_cost(spec):
+    """Return the tokens a job spec (see ``jobs.puzzle_spec``) costs."""
+    words = spec['words']
+    mean_length = sum(map(len, words)) / len(words) if words else 0
+    return max(math.ceil(spec['grid_size'] ** 2 * len(words) * mean_length), 1)
+
+
+class TokenBucket:
+    """A bucket of up to ``capacity`` tokens, refilled at ``rate`` tokens a second.
+
+    The bucket's level and the time it was last refilled are kept in the
+    Django cache under ``key``. A charge reads, refills and writes them back
+    holding a lock that only one ``cache.add`` can win, so concurrent
+    requests, in this process or another, can never spend the same tokens
+    twice.
+    """
+
+    # Seconds a lock outlives a holder that died before releasing it
+    LOCK_TIMEOUT = 5
+    LOCK_RETRY_SECONDS = 0.002
+
+    def __init__(self, key, capacity, rate):
+        self.key = key
+        self.capacity = capacity
+        self.rate = rate
+
+    @contextmanager
+    def locked(self):
+        lock_key = f'{self.key}:lock'
+        token = uuid.uuid4().hex
+        while not cache.add(lock_key, token, timeout=self.LOCK_TIMEOUT):
+            time.sleep(self.LOCK_RETRY_SECONDS)
+        try:
+            yield
+        finally:
+            # Only our own lock; a charge never gets near LOCK_TIMEOUT
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    def consume(self, amount):
+        """Take ``amount`` tokens if the bucket holds enough.
+
+        Returns 0 when they were taken, otherwise the seconds until it will
+        have refilled enough. Requests bigger than the whole bucket cost all
+        of it, so they are slow but never impossible.
+        """
+        amount = min(amount, self.capacity)
+        with self.locked():
+            now = time.time()
+            level, refilled = cache.get(self.key, (self.capacity, now))
+            level = min(self.capacity, level + (now - refilled) * self.rate)
+            if level < amount:
+                # Refused charges cost nothing, so nothing is written
+                return (amount - level) / self.rate
+            # Once the bucket would have refilled, a missing entry means full
+            cache.set(self.key, (level - amount, now), timeout=math.ceil(self.capacity / self.rate) + 1)
+        return 0.0
+
+
+def charge_generation(ident, spec):
+    """Charge ``ident`` (a user id or IP) for generating ``spec``.
+
+    Returns 0 if allowed, otherwise the seconds to wait before retrying.
+    """
+    allowance = TokenBucket(
+        f'wordsearch:generation:{ident}',
+        settings.WORDSEARCH_THROTTLE_BURST,
+        settings.WORDSEARCH_THROTTLE_RATE
+    )
+    return allowance.consume(generation_cost(spec))
+
+
+def charge_hint(key):
+    """Charge one hint to ``key`` (an attempt); returns as ``charge_generation``."""
+    allowance = TokenBucket(
+        f'wordsearch:hint:{key}',
+        settings.WORDSEARCH_HINT_BURST,
+        settings.WORDSEARCH_HINT_RATE
+    )
+    return allowance.consume(1)
+
+
+class GenerationCostThrottle(BaseThrottle):
+    """Throttle for API requests that queue a puzzle to be generated.
+
+    Only requests the view's ``generation_spec`` turns into a spec are
+    charged; everything else passes through.
+    """
+
+    def allow_request(self, request, view):
+        spec = view.generation_spec(request)
+        if spec is None:
+            return True
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        self.wait_seconds = charge_generation(ident, spec)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,65 @@
+"""Preview images for the puzzle list.
+
+A thumbnail is the top-left corner of a puzzle's grid, drawn from the same
+glyph atlas as printed pages. It is made when a puzzle's grid is saved and
+stored under ``MEDIA_ROOT/thumbnails``, named by a hash of the pixels it
+shows, so the file behind a name never changes and ``puzzle_thumbnail``
+serves it as immutable. The model keeps only that hash, so the list page
+links to previews without loading any grids. Puzzles saved without a
+thumbnail (bulk inserts, older rows) are filled in by
+``build_thumbnails``; ``thumbnail_for`` never touches the ORM, so it can
+run in a process pool.
+"""
+import hashlib
+import io
+import json
+import os
+
+from .recipes import rebuild_puzzle
+from .render import compose_grid, write_cached
+
+
+# Bump whenever the thumbnail layout changes, so thumbnails are redrawn
+THUMBNAIL_VERSION = 1
+# Cells shown along each side, and their size in pixels
+THUMBNAIL_CELLS = 15
+THUMBNAIL_CELL_SIZE = 16
+THUMBNAIL_DIR = 'thumbnails'
+# Thumbnails never change once written, so browsers may keep them a year
+THUMBNAIL_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def thumbnail_rows(grid):
+    """Return the rows of ``grid`` (strings or lists of letters) a thumbnail shows."""
+    return [''.join(row[:THUMBNAIL_CELLS]) for row in list(grid)[:THUMBNAIL_CELLS]]
+
+
+def thumbnail_digest(rows):
+    payload = json.dumps([THUMBNAIL_VERSION, THUMBNAIL_CELL_SIZE, rows])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def thumbnail_path(media_root, digest):
+    return os.path.join(media_root, THUMBNAIL_DIR, digest[:2], f'{digest}.png')
+
+
+def write_thumbnail(grid, media_root):
+    """Write the thumbnail for ``grid`` unless it exists; return its digest."""
+    rows = thumbnail_rows(grid)
+    digest = thumbnail_digest(rows)
+    path = thumbnail_path(media_root, digest)
+    if not os.path.exists(path):
+        buffer = io.BytesIO()
+        compose_grid(rows, THUMBNAIL_CELL_SIZE).save(buffer, 'PNG', optimize=True)
+        write_cached(path, buffer.getvalue())
+    return digest
+
+
+def thumbnail_for(grid, recipe, media_root):
+    """Write the thumbnail for ``grid``, or the grid rebuilt from ``recipe``.
+
+    Returns its digest, or ``''`` for a puzzle with no grid.
+    """
+    if not grid and recipe:
+        grid = rebuild_puzzle(recipe)['grid_data']
+    return write_thumbnail(grid, media_root) if grid else ''
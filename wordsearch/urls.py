@@ -7,6 +7,7 @@ router = DefaultRouter()
 router.register(r'puzzles', views.WordSearchPuzzleViewSet)
 router.register(r'attempts', views.WordSearchAttemptViewSet, basename='attempt')
 router.register(r'ratings', views.PuzzleRatingViewSet, basename='rating')
+router.register(r'jobs', views.PuzzleJobViewSet, basename='job')
 
 app_name = 'wordsearch'
 
@@ -14,9 +15,13 @@ urlpatterns = [
     # Web views
     path('', views.home, name='home'),
     path('complete-level/', views.complete_level, name='complete_level'),
+    path('levels/<int:level>/hint/', views.level_hint, name='level_hint'),
     path('puzzles/', views.puzzle_list, name='puzzle_list'),
     path('puzzles/<int:pk>/', views.puzzle_detail, name='puzzle_detail'),
+    path('puzzles/<int:pk>/print.<str:fmt>', views.puzzle_print, name='puzzle_print'),
+    path('puzzles/thumbnails/<str:digest>.png', views.puzzle_thumbnail, name='puzzle_thumbnail'),
     path('puzzles/create/', views.puzzle_create, name='puzzle_create'),
+    path('puzzles/jobs/<int:pk>/', views.puzzle_job, name='puzzle_job'),
     
     # API endpoints
     path('api/', include(router.urls)),
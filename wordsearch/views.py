@@ -1,23 +1,61 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
+from django.conf import settings
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db import models
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.db import models, transaction
 from django.views.decorators.http import require_http_methods
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled, ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 import json
+import math
+import os
 import random
+import re
 import string
-from .models import WordSearchPuzzle, WordSearchAttempt, PuzzleRating
+import time
+from functools import partial
+from .engine import generator_stats
+from .hints import found_words, level_hint_index, puzzle_hint_index
+from .jobs import SpecError, enqueue_puzzle, puzzle_spec, run_job
+from .leaderboard import record_completion, recount_user, top_players
+from .levels import (
+    get_level_puzzle,
+    get_static_level_url,
+    level_grid_size,
+    parse_found_words,
+    verify_solution,
+)
+from .models import (
+    LISTING_DEFERRED_FIELDS, PuzzleJob, WordSearchPuzzle, WordSearchAttempt, PuzzleRating, UserProgress,
+    word_total
+)
+from .pagination import AttemptPagination, KeysetPagination, keyset_page
+from .playcount import pending_plays
+from .progress import get_progress, level_unlocked, recount_progress, record_level
+from .render import FORMATS, print_data, render_to_cache
 from .serializers import (
+    PuzzleJobSerializer,
+    PuzzleRequestSerializer,
     WordSearchPuzzleSerializer,
+    WordSearchPuzzleListSerializer,
     WordSearchAttemptSerializer,
+    WordSearchAttemptListSerializer,
     PuzzleRatingSerializer
 )
+from .throttling import GenerationCostThrottle, charge_generation, charge_hint
+from .thumbnails import THUMBNAIL_MAX_AGE, thumbnail_path
+
+# Grids wider than this are drawn on a canvas instead of one element per cell
+CANVAS_GRID_SIZE = 30
+
+# Puzzle cards per page of the public list
+PUZZLE_LIST_PAGE_SIZE = 24
 
 
 def generate_word_search_grid(words, grid_size):
@@ -79,15 +117,21 @@ def generate_word_search_grid(words, grid_size):
             
             attempts += 1
         
+        generator_stats.attempts += attempts
         if not placed:
             # If we couldn't place the word, skip it for now
+            generator_stats.failures += 1
             continue
     
     # Fill remaining cells with random letters
+    fill_started = time.perf_counter()
     for i in range(grid_size):
         for j in range(grid_size):
             if grid[i][j] == '':
                 grid[i][j] = random.choice(string.ascii_uppercase)
+    generator_stats.fill_seconds += time.perf_counter() - fill_started
+    generator_stats.grids += 1
+    generator_stats.words += len(words)
     
     return {
         'grid': grid,
@@ -97,112 +141,34 @@ def generate_word_search_grid(words, grid_size):
 
 
 # Traditional Django views
-def generate_random_puzzle(level):
-    """Generate a random word search puzzle for a given level."""
-    import random
-    
-    # Use level as seed for consistent puzzles per level
-    random.seed(level)
-    
-    # Common word lists for random selection
-    word_lists = [
-        ['PYTHON', 'DJANGO', 'CODE', 'WEB', 'APP', 'DATA', 'API', 'JSON', 'HTML', 'CSS'],
-        ['OCEAN', 'MOUNTAIN', 'FOREST', 'RIVER', 'BEACH', 'VALLEY', 'DESERT', 'LAKE', 'HILL', 'CAVE'],
-        ['MUSIC', 'GUITAR', 'PIANO', 'DRUMS', 'VIOLIN', 'SONG', 'RHYTHM', 'MELODY', 'HARMONY', 'BEAT'],
-        ['SCIENCE', 'ATOM', 'MOLECULE', 'ENERGY', 'FORCE', 'GRAVITY', 'LIGHT', 'MATTER', 'SPACE', 'TIME'],
-        ['FOOD', 'PIZZA', 'PASTA', 'BURGER', 'SALAD', 'SOUP', 'BREAD', 'CHEESE', 'FRUIT', 'MEAT'],
-        ['SPORT', 'SOCCER', 'TENNIS', 'BASKETBALL', 'FOOTBALL', 'BASEBALL', 'HOCKEY', 'GOLF', 'SWIM', 'RUN'],
-        ['ANIMAL', 'LION', 'TIGER', 'ELEPHANT', 'GIRAFFE', 'ZEBRA', 'MONKEY', 'BEAR', 'WOLF', 'EAGLE'],
-        ['COLOR', 'RED', 'BLUE', 'GREEN', 'YELLOW', 'PURPLE', 'ORANGE', 'BLACK', 'WHITE', 'PINK', 'BROWN'],
-        ['WEATHER', 'SUNNY', 'RAINY', 'CLOUDY', 'WINDY', 'STORMY', 'FOGGY', 'SNOWY', 'HOT', 'COLD', 'WARM'],
-        ['TRAVEL', 'PLANE', 'TRAIN', 'CAR', 'BOAT', 'BIKE', 'WALK', 'HOTEL', 'BEACH', 'CITY', 'COUNTRY']
-    ]
-    
-    # Select random word list
-    words = random.choice(word_lists).copy()
-    
-    # Adjust difficulty based on level
-    if level <= 5:
-        num_words = min(6, len(words))
-    elif level <= 10:
-        num_words = min(8, len(words))
-    elif level <= 15:
-        num_words = min(10, len(words))
-    else:
-        num_words = len(words)
-    
-    # Select random words
-    selected_words = random.sample(words, num_words)
-    
-    # Generate grid
-    grid_result = generate_word_search_grid(selected_words, 20)
-    
-    # Create puzzle data structure
-    puzzle_data = {
-        'id': level,
-        'title': f'Level {level}',
-        'description': f'Find {num_words} hidden words',
-        'difficulty': 'easy' if level <= 5 else 'medium' if level <= 15 else 'hard',
-        'grid_data': grid_result['grid'],
-        'words_data': [
-            {
-                'word': word,
-                'found': False
-            } for word in grid_result['words']
-        ],
-        'grid_size': 20,
-        'words_list': grid_result['words']
-    }
-    
-    return puzzle_data
-
-
 def home(request):
     """Home page with the current puzzle to solve."""
     context = {}
     
-    # Get leaderboard data - top 10 players by highest level reached
-    from django.db.models import Max
-    leaderboard = User.objects.annotate(
-        highest_level=Max('puzzle_attempts__puzzle__id', 
-                         filter=models.Q(puzzle_attempts__is_completed=True))
-    ).exclude(
-        highest_level__isnull=True
-    ).order_by('-highest_level')[:10]
-    
-    context['leaderboard'] = leaderboard
+    # Top players by highest level reached, kept up to date as levels are completed
+    context['leaderboard'] = top_players()
     
     if request.user.is_authenticated:
-        # Get the next level the user hasn't completed
-        completed_levels = set(WordSearchAttempt.objects.filter(
-            user=request.user, 
-            is_completed=True
-        ).values_list('puzzle_id', flat=True))
-        
-        # Find next uncompleted level (starting from 1)
-        current_level = 1
-        while current_level in completed_levels:
-            current_level += 1
-        
-        # Generate current puzzle
-        current_puzzle_data = generate_random_puzzle(current_level)
-        
-        # Convert to object-like structure for template compatibility
-        class PuzzleObject:
-            def __init__(self, data):
-                for key, value in data.items():
-                    setattr(self, key, value)
+        # The next level the user hasn't completed
+        progress = get_progress(request.user)
+        current_level = progress.next_level
         
-        current_puzzle = PuzzleObject(current_puzzle_data)
+        # Exported levels are fetched by the page straight from static
+        # files; anything else is rendered from the level cache
+        level_url = get_static_level_url(current_level)
+        current_puzzle = None if level_url else get_level_puzzle(current_level)
         
         # Calculate progress (show progress for first 100 levels)
-        max_display_level = 100
-        completed_count = len([l for l in completed_levels if l <= max_display_level])
-        total_levels = max_display_level
+        completed_count = progress.progress_count
+        total_levels = UserProgress.PROGRESS_LEVELS
         progress_percentage = int((completed_count / total_levels) * 100)
         
+        grid_size = level_grid_size(current_level)
         context.update({
             'current_puzzle': current_puzzle,
+            'level_url': level_url,
+            'grid_size': grid_size,
+            'use_canvas': grid_size > CANVAS_GRID_SIZE,
             'completed_count': completed_count,
             'total_puzzles': f'{completed_count + 1}+',  # Show as "5+" for example
             'progress_percentage': min(progress_percentage, 100),
@@ -211,17 +177,15 @@ def home(request):
         
     else:
         # For anonymous users, show level 1
-        current_puzzle_data = generate_random_puzzle(1)
-        
-        class PuzzleObject:
-            def __init__(self, data):
-                for key, value in data.items():
-                    setattr(self, key, value)
-        
-        current_puzzle = PuzzleObject(current_puzzle_data)
+        level_url = get_static_level_url(1)
+        current_puzzle = None if level_url else get_level_puzzle(1)
+        grid_size = level_grid_size(1)
         
         context.update({
             'current_puzzle': current_puzzle,
+            'level_url': level_url,
+            'grid_size': grid_size,
+            'use_canvas': grid_size > CANVAS_GRID_SIZE,
             'show_login_prompt': True,
             'completed_count': 0,
             'total_puzzles': '∞',
@@ -234,54 +198,111 @@ def home(request):
 
 @login_required
 def complete_level(request):
-    """Mark a level as completed for the current user."""
+    """Mark a level as completed for the current user.
+
+    The page posts the cells of every word it found (see
+    ``parse_found_words``); the level only counts if they match its
+    placements.
+    """
     if request.method == 'POST':
         level = request.POST.get('level')
         if level:
             try:
                 level = int(level)
-                # Create or get a puzzle record for this level
-                puzzle, created = WordSearchPuzzle.objects.get_or_create(
-                    id=level,
-                    defaults={
-                        'title': f'Level {level}',
-                        'description': f'Randomly generated puzzle for level {level}',
-                        'created_by': request.user,
-                        'width': 20,
-                        'height': 20,
-                        'grid_data': {},  # We don't need to store the grid
-                        'words_data': [],
-                        'is_public': True
-                    }
-                )
-                
-                # Mark as completed
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'Invalid level'})
+            try:
+                found = parse_found_words(json.loads(request.POST.get('found') or '[]'))
+            except ValueError:
+                return JsonResponse({'success': False, 'error': 'Malformed found words'}, status=400)
+            
+            progress = get_progress(request.user)
+            if not level_unlocked(progress, level):
+                return JsonResponse({'success': False, 'error': 'Level is locked'})
+            if not verify_solution(level, found):
+                return JsonResponse({'success': False, 'error': 'Not every word was found'})
+            
+            # Create or get a puzzle record for this level
+            puzzle, created = WordSearchPuzzle.objects.get_or_create(
+                id=level,
+                defaults={
+                    'title': f'Level {level}',
+                    'description': f'Randomly generated puzzle for level {level}',
+                    'created_by': request.user,
+                    'width': level_grid_size(level),
+                    'height': level_grid_size(level),
+                    'grid_data': None,  # We don't need to store the grid
+                    'words_data': [],
+                    'is_public': True
+                }
+            )
+            
+            # Mark as completed; only the request that flips it counts it.
+            # Progress counts the same completions as the leaderboard, so the
+            # flip and the progress bit commit together, and the leaderboard
+            # (which also clears cached boards) only hears of committed ones
+            with transaction.atomic():
                 attempt, created = WordSearchAttempt.objects.get_or_create(
                     user=request.user,
                     puzzle=puzzle,
                     defaults={'is_completed': True}
                 )
-                
-                if not attempt.is_completed:
-                    attempt.is_completed = True
-                    attempt.save()
-                
-                return JsonResponse({'success': True, 'next_level': level + 1})
-            except ValueError:
-                return JsonResponse({'success': False, 'error': 'Invalid level'})
+                if created or WordSearchAttempt.objects.filter(pk=attempt.pk, is_completed=False).update(
+                    is_completed=True
+                ):
+                    transaction.on_commit(partial(record_completion, request.user.pk, puzzle.pk))
+                record_level(progress, level)
+            
+            return JsonResponse({'success': True, 'next_level': level + 1})
     
     return JsonResponse({'success': False, 'error': 'Invalid request'})
 
 
+@login_required
+@require_http_methods(["POST"])
+def level_hint(request, level):
+    """Return the first cell of a word of ``level`` not in the posted ``found`` list."""
+    if not level_unlocked(get_progress(request.user), level):
+        return JsonResponse({'error': 'Level is locked'}, status=403)
+    try:
+        found = found_words(json.loads(request.POST.get('found') or '[]'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid found words'}, status=400)
+    # Levels have no attempt row until they are completed
+    return hint_response(level_hint_index(level), found, f'level:{request.user.pk}:{level}')
+
+
+def hint_response(index, found, key):
+    """Answer a hint request from ``index``, charging ``key`` for the hint."""
+    hint = index.hint(found)
+    if hint is None:
+        return JsonResponse({'word': None})
+    wait = charge_hint(key)
+    if wait:
+        response = JsonResponse({'error': 'Too many hints; try again later.'}, status=429)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
+    word, (row, col) = hint
+    return JsonResponse({'word': word, 'row': row, 'col': col})
+
+
 def puzzle_list(request):
     """List all public puzzles."""
-    puzzles = WordSearchPuzzle.objects.filter(is_public=True)
+    # Cards show the thumbnail and word count, never the grid or words themselves
+    puzzles = WordSearchPuzzle.objects.filter(is_public=True).defer(*LISTING_DEFERRED_FIELDS).annotate(
+        word_total=word_total()
+    ).select_related('created_by')
     difficulty = request.GET.get('difficulty')
     if difficulty:
         puzzles = puzzles.filter(difficulty=difficulty)
+    try:
+        page = keyset_page(puzzles, 'created_at', request.GET.get('cursor'), PUZZLE_LIST_PAGE_SIZE)
+    except ValueError:
+        raise Http404('Invalid page.')
 
     context = {
-        'puzzles': puzzles,
+        'puzzles': page.items,
+        'page': page,
         'difficulty_choices': WordSearchPuzzle.DIFFICULTY_CHOICES,
         'selected_difficulty': difficulty,
     }
@@ -303,10 +324,44 @@ def puzzle_detail(request, pk):
     context = {
         'puzzle': puzzle,
         'user_attempt': user_attempt,
+        'use_canvas': puzzle.grid_size > CANVAS_GRID_SIZE,
     }
     return render(request, 'wordsearch/puzzle_detail.html', context)
 
 
+def puzzle_print(request, pk, fmt):
+    """Serve a printable PNG or PDF page; ``?answers=1`` adds the answer key.
+
+    Only the puzzle's creator and staff may print the answer key.
+    """
+    if fmt not in FORMATS:
+        raise Http404('Unknown print format.')
+    puzzle = get_object_or_404(WordSearchPuzzle, pk=pk, is_public=True)
+    answers = request.GET.get('answers') == '1'
+    if answers and not (request.user.is_staff or request.user.pk == puzzle.created_by_id):
+        raise PermissionDenied("Only the puzzle's creator can print its answers.")
+
+    path, digest = render_to_cache(print_data(puzzle), fmt, answers, settings.WORDSEARCH_RENDER_CACHE_DIR)
+    etag = f'"{digest}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    filename = f'puzzle-{puzzle.pk}{"-answers" if answers else ""}.{fmt}'
+    response = FileResponse(open(path, 'rb'), content_type=FORMATS[fmt], filename=filename)
+    response['ETag'] = etag
+    return response
+
+
+def puzzle_thumbnail(request, digest):
+    """Serve a list thumbnail; its name is its content hash, so it never changes."""
+    path = thumbnail_path(settings.MEDIA_ROOT, digest)
+    if not re.fullmatch(r'[0-9a-f]{64}', digest) or not os.path.exists(path):
+        raise Http404('No such thumbnail.')
+    response = FileResponse(open(path, 'rb'), content_type='image/png')
+    patch_cache_control(response, public=True, max_age=THUMBNAIL_MAX_AGE, immutable=True)
+    return response
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def puzzle_create(request):
@@ -314,59 +369,42 @@ def puzzle_create(request):
     if request.method == 'POST':
         try:
             # Get form data
-            title = request.POST.get('title', '').strip()
-            category = request.POST.get('category', '').strip()
-            difficulty = request.POST.get('difficulty', '').strip()
-            description = request.POST.get('description', '').strip()
             words = [word.strip().upper() for word in request.POST.getlist('words[]') if word.strip()]
+            grid_size = None
+            if request.POST.get('grid_size'):
+                try:
+                    grid_size = int(request.POST['grid_size'])
+                except ValueError:
+                    grid_size = 0
             
-            # Validation
-            if not title:
-                messages.error(request, 'Title is required.')
-                return render(request, 'wordsearch/puzzle_create.html')
-            
-            if not difficulty:
-                messages.error(request, 'Difficulty level is required.')
-                return render(request, 'wordsearch/puzzle_create.html')
-            
-            if len(words) < 3:
-                messages.error(request, 'At least 3 words are required.')
-                return render(request, 'wordsearch/puzzle_create.html')
-            
-            # Validate words
-            for word in words:
-                if not word.isalpha() or len(word) < 3 or len(word) > 12:
-                    messages.error(request, f'Word "{word}" must be 3-12 letters only.')
-                    return render(request, 'wordsearch/puzzle_create.html')
-            
-            # Check for duplicates
-            if len(words) != len(set(words)):
-                messages.error(request, 'Duplicate words are not allowed.')
+            try:
+                spec = puzzle_spec(
+                    request.POST.get('title', '').strip(),
+                    request.POST.get('difficulty', '').strip(),
+                    words,
+                    description=request.POST.get('description', '').strip(),
+                    grid_size=grid_size
+                )
+            except SpecError as e:
+                messages.error(request, str(e))
                 return render(request, 'wordsearch/puzzle_create.html')
             
-            # Set grid size based on difficulty
-            grid_sizes = {'easy': 8, 'medium': 12, 'hard': 16, 'extreme': 20}
-            grid_size = grid_sizes.get(difficulty, 12)
-            
-            # Generate the puzzle grid
-            puzzle_data = generate_word_search_grid(words, grid_size)
-            
-            # Create the puzzle
-            puzzle = WordSearchPuzzle.objects.create(
-                title=title,
-                category=category,
-                difficulty=difficulty,
-                description=description,
-                grid_size=grid_size,
-                grid_data=puzzle_data['grid'],
-                words=puzzle_data['words'],
-                solution_data=puzzle_data['placed_words'],
-                created_by=request.user,
-                is_public=True
-            )
+            wait = charge_generation(request.user.pk, spec)
+            if wait:
+                messages.error(
+                    request,
+                    f'You are creating puzzles too fast; try again in {math.ceil(wait)} seconds.'
+                )
+                response = render(request, 'wordsearch/puzzle_create.html', status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
             
-            messages.success(request, f'Puzzle "{title}" created successfully!')
-            return redirect('wordsearch:puzzle_detail', pk=puzzle.pk)
+            # Generation runs on the worker (run_puzzle_worker); the job page
+            # polls until the puzzle is ready, then redirects to it
+            job = enqueue_puzzle(request.user, spec)
+            if not settings.WORDSEARCH_QUEUE_GENERATION:
+                run_job(job)
+            return puzzle_job_response(request, job)
             
         except Exception as e:
             messages.error(request, f'Error creating puzzle: {str(e)}')
@@ -375,6 +413,33 @@ def puzzle_create(request):
     return render(request, 'wordsearch/puzzle_create.html')
 
 
+@login_required
+def puzzle_job(request, pk):
+    """Wait for a queued puzzle, then redirect to it."""
+    job = get_object_or_404(PuzzleJob, pk=pk, created_by=request.user)
+    return puzzle_job_response(request, job)
+
+
+def puzzle_job_response(request, job):
+    """Redirect to a finished job's puzzle, or render the 202 waiting page."""
+    if job.status == PuzzleJob.DONE and job.puzzle_id:
+        messages.success(request, f'Puzzle "{job.spec["title"]}" created successfully!')
+        if job.unplaced:
+            grid_size = job.spec['grid_size']
+            messages.warning(
+                request,
+                f'These words did not fit in a {grid_size}x{grid_size} grid '
+                f'and were left out: {", ".join(job.unplaced)}'
+            )
+        return redirect('wordsearch:puzzle_detail', pk=job.puzzle_id)
+    
+    if job.is_finished:
+        messages.error(request, f'Error creating puzzle: {job.error or "the puzzle was deleted"}')
+        return redirect('wordsearch:puzzle_create')
+    
+    return render(request, 'wordsearch/puzzle_job.html', {'job': job}, status=status.HTTP_202_ACCEPTED)
+
+
 # API ViewSets for REST API
 class WordSearchPuzzleViewSet(viewsets.ModelViewSet):
     """ViewSet for WordSearch puzzles."""
@@ -382,14 +447,53 @@ class WordSearchPuzzleViewSet(viewsets.ModelViewSet):
     queryset = WordSearchPuzzle.objects.filter(is_public=True)
     serializer_class = WordSearchPuzzleSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_classes = [GenerationCostThrottle]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
         difficulty = self.request.query_params.get('difficulty')
         if difficulty:
             queryset = queryset.filter(difficulty=difficulty)
+        if self.action == 'list':
+            queryset = queryset.defer(*LISTING_DEFERRED_FIELDS).annotate(
+                word_total=word_total()
+            ).select_related('created_by')
         return queryset
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return WordSearchPuzzleListSerializer
+        return super().get_serializer_class()
+
+    def create(self, request, *args, **kwargs):
+        """Save a submitted grid, or queue one to be generated from ``words``.
+        
+        A generation request answers 202 with the job; poll its
+        ``/api/jobs/<id>/`` until ``status`` is ``done`` and ``puzzle`` is set.
+        """
+        if not self.is_generation_request(request):
+            return super().create(request, *args, **kwargs)
+        
+        serializer = PuzzleRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue_puzzle(request.user, serializer.validated_data)
+        if not settings.WORDSEARCH_QUEUE_GENERATION:
+            run_job(job)
+        data = PuzzleJobSerializer(job, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+
+    def is_generation_request(self, request):
+        return self.action == 'create' and 'words' in request.data and 'grid_data' not in request.data
+
+    def generation_spec(self, request):
+        """Return the job spec this request would queue, for GenerationCostThrottle."""
+        if not self.is_generation_request(request):
+            return None
+        serializer = PuzzleRequestSerializer(data=request.data)
+        # Invalid requests are rejected by create without generating anything
+        return serializer.validated_data if serializer.is_valid() else None
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
@@ -409,7 +513,7 @@ class WordSearchPuzzleViewSet(viewsets.ModelViewSet):
         avg_rating = puzzle.ratings.aggregate(avg=models.Avg('rating'))['avg']
 
         return Response({
-            'play_count': puzzle.play_count,
+            'play_count': puzzle.play_count + pending_plays(puzzle.pk),
             'attempts': attempts,
             'completions': completions,
             'completion_rate': (completions / attempts * 100) if attempts > 0 else 0,
@@ -421,18 +525,77 @@ class WordSearchAttemptViewSet(viewsets.ModelViewSet):
     """ViewSet for puzzle attempts."""
 
     serializer_class = WordSearchAttemptSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = AttemptPagination
 
     def get_queryset(self):
-        return WordSearchAttempt.objects.filter(user=self.request.user)
+        queryset = WordSearchAttempt.objects.filter(user=self.request.user)
+        if self.action == 'list':
+            # One query for the page's puzzles, annotated so their JSON stays in the database
+            puzzles = WordSearchPuzzle.objects.defer(*LISTING_DEFERRED_FIELDS).annotate(
+                word_total=word_total()
+            ).select_related('created_by')
+            queryset = queryset.select_related('user').prefetch_related(models.Prefetch('puzzle', queryset=puzzles))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return WordSearchAttemptListSerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
+        # Completion is read-only here (see complete_level), so nothing to count
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        was_completed = instance.is_completed
+        instance.delete()
+        if was_completed:
+            # Keep the level bitmap in step with the leaderboard
+            recount_user(self.request.user.pk)
+            recount_progress(self.request.user.pk)
+
+    @action(detail=True, methods=['post'])
+    def hint(self, request, pk=None):
+        """Return the first cell of a word not yet found in this attempt.
+        
+        Words in the attempt's ``words_found`` or the posted ``found`` list
+        count as found. Hints are rationed per attempt (429 when used up).
+        """
+        attempt = get_object_or_404(
+            self.get_queryset().select_related('puzzle').only('words_found', 'puzzle__updated_at'),
+            pk=pk
+        )
+        try:
+            found = found_words(request.data.get('found', [])) | found_words(attempt.words_found)
+        except ValueError as e:
+            raise ValidationError({'found': str(e)})
+        
+        hint = puzzle_hint_index(attempt.puzzle).hint(found)
+        if hint is None:
+            return Response({'word': None})
+        wait = charge_hint(f'attempt:{attempt.pk}')
+        if wait:
+            raise Throttled(wait)
+        word, (row, col) = hint
+        return Response({'word': word, 'row': row, 'col': col})
+
+
+class PuzzleJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for the user's queued puzzle generations."""
+
+    serializer_class = PuzzleJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return PuzzleJob.objects.filter(created_by=self.request.user)
+
 
 class PuzzleRatingViewSet(viewsets.ModelViewSet):
     """ViewSet for puzzle ratings."""
 
     serializer_class = PuzzleRatingSerializer
+    permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return PuzzleRating.objects.filter(user=self.request.user)
@@ -18,6 +18,15 @@ DATABASES = {
     )
 }
 
+# Shared cache for throttles and the leaderboard, seen by every dyno
+# (the Heroku Redis add-on provides REDIS_URL)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+    }
+}
+
 # Static files configuration for Heroku
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
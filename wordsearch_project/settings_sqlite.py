@@ -111,6 +111,26 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache
+# Throttles, hint allowances and the leaderboard live in the cache and must
+# be shared by every web and worker process, so production sets REDIS_URL.
+# Without it each process keeps its own local-memory cache, which is only
+# right for a single development server.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -128,6 +148,49 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Puzzle generation
+# Wall-clock seconds the backtracking placer may spend before giving up on
+# the remaining words
+WORDSEARCH_PLACEMENT_TIME_BUDGET = config('WORDSEARCH_PLACEMENT_TIME_BUDGET', default=0.5, cast=float)
+
+# Candidate grids built for a new puzzle; the one whose difficulty score is
+# closest to the chosen difficulty is kept (see wordsearch.metrics)
+WORDSEARCH_DIFFICULTY_CANDIDATES = config('WORDSEARCH_DIFFICULTY_CANDIDATES', default=4, cast=int)
+
+# How new puzzles are stored: 'full' keeps the grid and placements as
+# JSON, 'recipe' only the seed and spec, rebuilding the grid on read (see
+# wordsearch.recipes)
+WORDSEARCH_PUZZLE_STORAGE = config('WORDSEARCH_PUZZLE_STORAGE', default='full')
+
+# Generate new puzzles on the run_puzzle_worker queue instead of inside the
+# request; with this off, queued jobs run in the web process straight away
+WORDSEARCH_QUEUE_GENERATION = config('WORDSEARCH_QUEUE_GENERATION', default=True, cast=bool)
+
+# Per-user generation budget (see wordsearch.throttling): a puzzle costs
+# grid area x word count x mean word length tokens, from a bucket of BURST
+# tokens that refills at RATE tokens per second
+WORDSEARCH_THROTTLE_BURST = config('WORDSEARCH_THROTTLE_BURST', default=20_000_000, cast=int)
+WORDSEARCH_THROTTLE_RATE = config('WORDSEARCH_THROTTLE_RATE', default=200_000, cast=float)
+
+# Hints per attempt (see wordsearch.hints): a player can take BURST hints
+# at once, and one more every 1 / RATE seconds
+WORDSEARCH_HINT_BURST = config('WORDSEARCH_HINT_BURST', default=3, cast=int)
+WORDSEARCH_HINT_RATE = config('WORDSEARCH_HINT_RATE', default=1 / 30, cast=float)
+
+# Seconds a play may sit in a process's play count buffer before it is
+# written (see wordsearch.playcount); 0 writes every play straight away
+WORDSEARCH_PLAY_COUNT_MAX_STALENESS = config('WORDSEARCH_PLAY_COUNT_MAX_STALENESS', default=10, cast=float)
+
+# Printable puzzle pages (see wordsearch.render), named by content hash
+WORDSEARCH_RENDER_CACHE_DIR = config('WORDSEARCH_RENDER_CACHE_DIR', default=str(BASE_DIR / 'data' / 'renders'))
+
+# Pre-generated level pack shared by all workers (see build_level_pack)
+WORDSEARCH_LEVEL_PACK_PATH = config('WORDSEARCH_LEVEL_PACK_PATH', default=str(BASE_DIR / 'data' / 'levels.pack'))
+
+# Indexed word dictionary (see build_dictionary); when present, words for
+# new puzzles must be in it
+WORDSEARCH_DICTIONARY_PATH = config('WORDSEARCH_DICTIONARY_PATH', default=str(BASE_DIR / 'data' / 'dictionary.idx'))
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000').split(',')
 